@@ -0,0 +1,161 @@
+"""
+Throughput benchmark for MPIQueue.
+
+Sweeps task duration and payload size, and for every configuration records
+tasks/sec, manager CPU utilization and the mean worker idle fraction. Rank
+count is taken from the launcher, so run the script once per rank count and
+append to the same output file:
+
+    mpirun -n 2 python benchmarks/bench_queue.py --output bench.json
+    mpirun -n 4 python benchmarks/bench_queue.py --output bench.json
+    mpirun -n 8 python benchmarks/bench_queue.py --output bench.json
+
+Results are written as JSON, one record per (ranks, duration, payload) point,
+so two files produced by different versions can be compared directly.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import time
+from importlib import metadata
+
+import numpy as np
+from mpi4py import MPI
+
+from mpitools import setup_mpi
+from mpitools.queue import MPIQueue, Task
+
+DEFAULT_DURATIONS = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0]
+DEFAULT_PAYLOADS = [0, 1024, 1024**2]
+
+comm, rank, size = setup_mpi()
+
+
+class SpinTask(Task):
+    """Task that busy-waits for a fixed duration and returns a payload."""
+
+    def __init__(self, task_id: str, duration: float, payload: np.ndarray):
+        super().__init__(task_id)
+        self.duration = duration
+        self.payload = payload
+
+    def execute(self):
+        end = time.perf_counter() + self.duration
+        while time.perf_counter() < end:
+            pass
+        return self.payload
+
+
+def _num_tasks(duration: float, budget: float, workers: int, min_tasks: int, max_tasks: int) -> int:
+    """Number of tasks that keeps one configuration close to the time budget."""
+    n = int(budget * workers / max(duration, 1e-6))
+    return max(min_tasks, min(max_tasks, n))
+
+
+def run_point(duration: float, payload_bytes: int, num_tasks: int) -> dict | None:
+    """Run one benchmark configuration. Returns the record on rank 0, None elsewhere."""
+    queue = MPIQueue()
+    if rank == 0:
+        payload = np.zeros(payload_bytes, dtype=np.uint8)
+        queue.add_tasks([SpinTask(f"task_{i}", duration, payload) for i in range(num_tasks)])
+
+    comm.Barrier()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    results = queue.run()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    # Workers report how long they spent inside run(); busy time comes from the results
+    walls = comm.gather(wall, root=0)
+    if rank != 0:
+        return None
+
+    workers = max(size - 1, 1)
+    busy = np.bincount(results.worker_rank, weights=results.execution_time, minlength=size)
+
+    if size == 1:
+        idle = [0.0]
+    else:
+        idle = [max(0.0, 1.0 - busy[r] / walls[r]) for r in range(1, size)]
+
+    return {
+        "ranks": size,
+        "workers": workers,
+        "task_duration_s": duration,
+        "payload_bytes": payload_bytes,
+        "num_tasks": num_tasks,
+        "completed_tasks": len(results),
+        "wall_time_s": wall,
+        "tasks_per_sec": len(results) / wall if wall > 0 else float("inf"),
+        "ideal_tasks_per_sec": workers / duration,
+        "manager_cpu_utilization": cpu / wall if wall > 0 else 0.0,
+        "worker_idle_fraction_mean": float(np.mean(idle)),
+        "worker_idle_fraction_max": float(np.max(idle)),
+    }
+
+
+def _metadata() -> dict:
+    try:
+        version = metadata.version("mpi4pytools")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {
+        "mpitools_version": version,
+        "mpi4py_version": metadata.version("mpi4py"),
+        "numpy_version": np.__version__,
+        "mpi_library": MPI.Get_library_version().strip().splitlines()[0],
+        "python_version": platform.python_version(),
+        "host": platform.node(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def _write(path: str, records: list[dict]):
+    """Append records to the JSON file at path, creating it if needed."""
+    data = {"meta": _metadata(), "results": []}
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        data["meta"] = _metadata()
+    data["results"].extend(records)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=DEFAULT_DURATIONS,
+                        help="Task durations in seconds.")
+    parser.add_argument("--payloads", type=int, nargs="+", default=DEFAULT_PAYLOADS,
+                        help="Task payload sizes in bytes (sent with the task and returned as the result).")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="Approximate wall time per configuration in seconds.")
+    parser.add_argument("--min-tasks", type=int, default=20)
+    parser.add_argument("--max-tasks", type=int, default=20000)
+    parser.add_argument("--output", default="bench_queue.json",
+                        help="JSON file to append results to.")
+    args = parser.parse_args()
+
+    records = []
+    for duration in args.durations:
+        for payload in args.payloads:
+            num_tasks = _num_tasks(duration, args.budget, max(size - 1, 1), args.min_tasks, args.max_tasks)
+            record = run_point(duration, payload, num_tasks)
+            if rank == 0:
+                records.append(record)
+                print(f"ranks={size} duration={duration:g}s payload={payload}B "
+                      f"tasks/sec={record['tasks_per_sec']:.1f} "
+                      f"manager_cpu={record['manager_cpu_utilization']:.2f} "
+                      f"worker_idle={record['worker_idle_fraction_mean']:.2f}", flush=True)
+
+    if rank == 0:
+        _write(args.output, records)
+        print(f"Wrote {len(records)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@ from .divide_work import (
     eval_on_main,
     eval_on_workers,
     eval_on_single,
-    eval_on_select
+    eval_on_select,
+    parallel_for
 )
 
 __all__ = [
@@ -13,4 +14,5 @@ __all__ = [
     'eval_on_workers',
     'eval_on_single',
     'eval_on_select',
+    'parallel_for',
 ]
@@ -1,19 +1,29 @@
+from __future__ import annotations
+
 from mpi4py.MPI import Comm, COMM_WORLD
 import sys
 from collections.abc import Callable
 from functools import wraps
 import traceback
 
-def setup_mpi() -> tuple[Comm, int, int]:
+def setup_mpi(hierarchical: bool = False) -> tuple[Comm, int, int]:
     """
     Initialize MPI and return the communicator, rank, and size.
     
+    Args:
+        hierarchical: Also build and cache the per-node and node-leader
+            communicators used by hierarchical=True decorators (collective).
+            Otherwise they are built on the first hierarchical call.
+    
     Returns:
         tuple: A tuple containing the MPI communicator, rank, and size.
     """
     comm = COMM_WORLD
     rank = comm.Get_rank()
     size = comm.Get_size()
+    if hierarchical:
+        from mpitools.comms.hierarchical import hierarchy
+        hierarchy(comm)
     return comm, rank, size
 
 def abort_on_error(exception_type: Exception = Exception, comm: Comm = COMM_WORLD) -> Callable:
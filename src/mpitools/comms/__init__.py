@@ -13,6 +13,11 @@ from .reduction import (
     reduce_to_process,
     reduce_to_all 
 )
+from .tree_reduction import (
+    reduce_with,
+    allreduce_with,
+)
+from .sparse_reduction import sparse_reduce_to_all
 from .buffered_collective import (
     buffered_broadcast_from_main,
     buffered_broadcast_from_process,
@@ -28,6 +33,11 @@ from .buffered_reduction import (
     buffered_reduce_to_process,
     buffered_reduce_to_all
 )
+from .shared_collective import (
+    SharedArray,
+    shared_broadcast_from_main,
+    shared_broadcast_from_process,
+)
 from .variable_collective import (
     variable_scatter_from_main,
     variable_scatter_from_process,
@@ -36,6 +46,42 @@ from .variable_collective import (
     variable_gather_to_all,
     variable_all_to_all,
 )
+from .compression import Compression
+from .utils import register_op
+from .buffer_pool import BufferPool, shared_pool
+from .futures import CommFuture, wait_all
+from .nonblocking_collective import (
+    ibroadcast_from_main,
+    ibroadcast_from_process,
+    iscatter_from_main,
+    iscatter_from_process,
+    igather_to_main,
+    igather_to_process,
+    igather_to_all,
+    iall_to_all,
+    ibuffered_broadcast_from_main,
+    ibuffered_broadcast_from_process,
+    ibuffered_scatter_from_main,
+    ibuffered_scatter_from_process,
+    ibuffered_gather_to_main,
+    ibuffered_gather_to_process,
+    ibuffered_gather_to_all,
+    ibuffered_all_to_all,
+    ivariable_scatter_from_main,
+    ivariable_scatter_from_process,
+    ivariable_gather_to_main,
+    ivariable_gather_to_process,
+    ivariable_gather_to_all,
+    ivariable_all_to_all,
+)
+from .nonblocking_reduction import (
+    ireduce_to_main,
+    ireduce_to_process,
+    ireduce_to_all,
+    ibuffered_reduce_to_main,
+    ibuffered_reduce_to_process,
+    ibuffered_reduce_to_all,
+)
 
 __all__ = [
     'broadcast_from_main',
@@ -49,6 +95,12 @@ __all__ = [
     'reduce_to_main',
     'reduce_to_process',
     'reduce_to_all',
+    'reduce_with',
+    'allreduce_with',
+    'sparse_reduce_to_all',
+    'SharedArray',
+    'shared_broadcast_from_main',
+    'shared_broadcast_from_process',
     'buffered_broadcast_from_main',
     'buffered_broadcast_from_process',
     'buffered_scatter_from_main',
@@ -66,4 +118,38 @@ __all__ = [
     'variable_gather_to_process',
     'variable_gather_to_all',
     'variable_all_to_all',
+    'Compression',
+    'register_op',
+    'BufferPool',
+    'shared_pool',
+    'CommFuture',
+    'wait_all',
+    'ibroadcast_from_main',
+    'ibroadcast_from_process',
+    'iscatter_from_main',
+    'iscatter_from_process',
+    'igather_to_main',
+    'igather_to_process',
+    'igather_to_all',
+    'iall_to_all',
+    'ibuffered_broadcast_from_main',
+    'ibuffered_broadcast_from_process',
+    'ibuffered_scatter_from_main',
+    'ibuffered_scatter_from_process',
+    'ibuffered_gather_to_main',
+    'ibuffered_gather_to_process',
+    'ibuffered_gather_to_all',
+    'ibuffered_all_to_all',
+    'ivariable_scatter_from_main',
+    'ivariable_scatter_from_process',
+    'ivariable_gather_to_main',
+    'ivariable_gather_to_process',
+    'ivariable_gather_to_all',
+    'ivariable_all_to_all',
+    'ireduce_to_main',
+    'ireduce_to_process',
+    'ireduce_to_all',
+    'ibuffered_reduce_to_main',
+    'ibuffered_reduce_to_process',
+    'ibuffered_reduce_to_all',
 ]
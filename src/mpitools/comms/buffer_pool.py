@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import weakref
+import numpy as np
+from typing import Optional, Tuple
+from mpitools.comms.utils import build_buffer
+
+# Smallest size class in bytes
+_MIN_CLASS = 64
+
+def _size_class(nbytes: int) -> int:
+    """Smallest power of two holding nbytes"""
+    return max(_MIN_CLASS, 1 << (max(nbytes, 1) - 1).bit_length())
+
+
+class BufferPool:
+    """
+    Pool of receive buffers grouped in power-of-two size classes.
+
+    Buffers are taken with acquire and given back with release, after which
+    they are handed out again by later acquires of the same size class. Idle
+    buffers are kept up to max_bytes in total; buffers released beyond that
+    are left to the garbage collector.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Upper bound on the memory held by idle buffers. Defaults to 1 GiB.
+    """
+
+    def __init__(self, max_bytes: int = 1024**3):
+        self.max_bytes = max_bytes
+        self._idle = {}  # size class -> list of uint8 blocks
+        self._idle_bytes = 0
+        self._leased = weakref.WeakValueDictionary()  # id -> block handed out
+        self._lock = threading.Lock()
+
+    @property
+    def idle_bytes(self) -> int:
+        """Memory held by idle buffers."""
+        return self._idle_bytes
+
+    def acquire(self, shape: int | Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Array of the given shape and dtype backed by a pooled buffer."""
+        dtype = np.dtype(dtype)
+        if isinstance(shape, int):
+            shape = (shape,)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        size_class = _size_class(nbytes)
+        with self._lock:
+            idle = self._idle.get(size_class)
+            if idle:
+                block = idle.pop()
+                self._idle_bytes -= size_class
+            else:
+                block = np.empty(size_class, dtype=np.uint8)
+            self._leased[id(block)] = block
+        return block[:nbytes].view(dtype).reshape(shape)
+
+    def release(self, array: np.ndarray):
+        """Give the buffer behind an array returned by acquire back to the pool."""
+        block = array
+        while isinstance(block.base, np.ndarray):
+            block = block.base
+        with self._lock:
+            if self._leased.get(id(block)) is not block:
+                raise ValueError("Array was not acquired from this pool or was already released")
+            del self._leased[id(block)]
+            if self._idle_bytes + block.size <= self.max_bytes:
+                self._idle.setdefault(block.size, []).append(block)
+                self._idle_bytes += block.size
+
+    def clear(self):
+        """Drop all idle buffers."""
+        with self._lock:
+            self._idle.clear()
+            self._idle_bytes = 0
+
+    def __repr__(self):
+        return f"BufferPool(max_bytes={self.max_bytes}, idle_bytes={self._idle_bytes})"
+
+
+# Pool used by decorators created with pool=True
+shared_pool = BufferPool()
+
+
+class ReceiveBuffers:
+    """
+    Receive buffers of one decorated function: the caller's out= array, a
+    buffer reused across calls, a pooled buffer or a new array. Persistent
+    collectives always reuse their buffer.
+    """
+
+    def __init__(self, dtype: np.dtype, reuse: bool = False, pool: Optional[BufferPool | bool] = None,
+                 persistent: bool = False):
+        if (reuse or persistent) and pool:
+            raise ValueError("pool cannot be combined with reuse or persistent")
+        self.dtype = np.dtype(dtype)
+        self.reuse = reuse or persistent
+        self.persistent = persistent
+        self.pool = shared_pool if pool is True else (pool or None)
+        self._buffer = None
+
+    def get(self, shape: int | Tuple[int, ...], out: Optional[np.ndarray] = None) -> np.ndarray:
+        if isinstance(shape, int):
+            shape = (shape,)
+        if out is not None:
+            if self.persistent:
+                raise ValueError("out= cannot be used with persistent collectives, whose buffers are fixed")
+            if out.shape != shape or out.dtype != self.dtype or not out.flags.c_contiguous:
+                raise ValueError(f"out must be a C-contiguous array of shape {shape} and dtype {self.dtype}, "
+                                 f"got shape {out.shape} and dtype {out.dtype}")
+            return out
+        if self.reuse:
+            if self._buffer is None or self._buffer.shape != shape:
+                self._buffer = build_buffer(shape, self.dtype)
+            return self._buffer
+        if self.pool is not None:
+            return self.pool.acquire(shape, self.dtype)
+        return build_buffer(shape, self.dtype)
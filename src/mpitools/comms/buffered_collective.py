@@ -1,13 +1,30 @@
+from __future__ import annotations
+
 import numpy as np
 from mpi4py import MPI
 from mpi4py.MPI import Comm, COMM_WORLD
 from collections.abc import Callable
 from functools import wraps
-from typing import Tuple
-from mpitools.comms.utils import to_mpi_dtype, build_buffer
+from typing import Optional, Tuple
+from mpitools.comms.utils import to_mpi_dtype
+from mpitools.comms.buffer_pool import BufferPool, ReceiveBuffers
+from mpitools.comms.persistent import PersistentCollective
+from mpitools.comms.hierarchical import hierarchy, hierarchical_bcast, hierarchical_gather
+from mpitools.comms.segmented import segment_bytes, as_bytes, pipelined_bcast, pipelined_blocks
+from mpitools.comms.views import buffer_spec
+
+# Helper function to choose the buffer a broadcasting process sends from
+def _root_buffer(result, buffers: ReceiveBuffers, shape: Tuple[int, ...], out: Optional[np.ndarray], persistent: bool) -> np.ndarray:
+    """The result itself when it is an array of the broadcast shape and dtype, else a copy in a receive buffer."""
+    if (not persistent and out is None and buffers.pool is None and isinstance(result, np.ndarray)
+            and result.shape == shape and result.dtype == buffers.dtype):
+        return result
+    buff = buffers.get(shape, out)
+    buff[...] = result
+    return buff
 
 # Buffered broadcast decorators
-def buffered_broadcast_from_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_broadcast_from_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on rank 0 and broadcasts result to all processes.
     
@@ -19,6 +36,28 @@ def buffered_broadcast_from_main(shape: int | Tuple[int, ...], dtype: np.dtype,
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    hierarchical : bool, optional
+        Run the collective in two levels: within every node (through shared
+        memory) and among one leader process per node. Falls back to the flat
+        collective on a single node or with one process per node. Cannot be
+        combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -31,39 +70,58 @@ def buffered_broadcast_from_main(shape: int | Tuple[int, ...], dtype: np.dtype,
     
     Decorated Function Returns
     --------------------------
-    Buffer containing the broadcast data on all processes.
+    Buffer containing the broadcast data on all processes. The broadcasting
+    process gets its own result back when it is an array of the specified
+    shape and dtype, which is sent without a copy even if it is a strided view.
 
     Notes
     -----
     Decorated function only runs on the main process.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     if isinstance(shape, int):
         shape = (shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Bcast') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Allocate buffer on all processes
-            buff = build_buffer(shape, dtype)
-            
+            out = kwargs.pop('out', None)
             if rank == 0:
-                # Execute function and get result
+                # Execute function and send straight from its result
                 result = func(*args, **kwargs)
-                
-                # Copy to buffer
-                buff[:] = result
+                buff = _root_buffer(result, buffers, shape, out, persistent)
+            else:
+                # Allocate receive buffer
+                buff = buffers.get(shape, out)
             
             # Broadcast buffer from rank 0
-            comm.Bcast([buff, mpi_dtype], root=0)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_bcast(comm, buff, mpi_dtype, 0, segment)
+            elif buff.nbytes > segment:
+                pipelined_bcast(comm, buff, mpi_dtype, 0, segment)
+            elif persistent:
+                collective.run([buff, mpi_dtype], root=0)
+            else:
+                comm.Bcast(buffer_spec(buff, mpi_dtype), root=0)
             
             return buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
-def buffered_broadcast_from_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_broadcast_from_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on specified rank and broadcasts result to all processes.
     
@@ -77,6 +135,28 @@ def buffered_broadcast_from_process(process_rank: int, shape: int | Tuple[int, .
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    hierarchical : bool, optional
+        Run the collective in two levels: within every node (through shared
+        memory) and among one leader process per node. Falls back to the flat
+        collective on a single node or with one process per node. Cannot be
+        combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -89,34 +169,55 @@ def buffered_broadcast_from_process(process_rank: int, shape: int | Tuple[int, .
     
     Decorated Function Returns
     --------------------------
-    Buffer containing the broadcast data on all processes.
+    Buffer containing the broadcast data on all processes. The broadcasting
+    process gets its own result back when it is an array of the specified
+    shape and dtype, which is sent without a copy even if it is a strided view.
 
     Notes
     -----
     Decorated function only runs on the specified process.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     if isinstance(shape, int):
         shape = (shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Bcast') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            buff = build_buffer(shape, dtype)
-            
+            out = kwargs.pop('out', None)
             if rank == process_rank:
                 result = func(*args, **kwargs)
-                buff[:] = result
+                buff = _root_buffer(result, buffers, shape, out, persistent)
+            else:
+                buff = buffers.get(shape, out)
             
-            comm.Bcast([buff, mpi_dtype], root=process_rank)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_bcast(comm, buff, mpi_dtype, process_rank, segment)
+            elif buff.nbytes > segment:
+                pipelined_bcast(comm, buff, mpi_dtype, process_rank, segment)
+            elif persistent:
+                collective.run([buff, mpi_dtype], root=process_rank)
+            else:
+                comm.Bcast(buffer_spec(buff, mpi_dtype), root=process_rank)
             return buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
 # Buffered scatter decorator
-def buffered_scatter_from_main(chunk_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_scatter_from_main(chunk_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False) -> Callable:
     """
     Decorator that executes function on rank 0 and scatters results to all processes.
     
@@ -128,6 +229,23 @@ def buffered_scatter_from_main(chunk_shape: int | Tuple[int, ...], dtype: np.dty
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
     
     Returns
     -------
@@ -145,35 +263,51 @@ def buffered_scatter_from_main(chunk_shape: int | Tuple[int, ...], dtype: np.dty
     Notes
     -----
     Decorated function only runs on the main process.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
+    size = comm.Get_size()
     
     if isinstance(chunk_shape, int):
         chunk_shape = (chunk_shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    block = int(np.prod(chunk_shape, dtype=np.int64)) * np.dtype(dtype).itemsize
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Scatter') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Allocate receive buffer on all processes
-            recv_buff = build_buffer(chunk_shape, dtype)
+            recv_buff = buffers.get(chunk_shape, out)
             
             if rank == 0:
                 # Execute function and prepare send buffer
                 result = func(*args, **kwargs)
-                send_buff = result
+                send_buff = collective.stage(result) if persistent else result
             else:
                 send_buff = None
             
             # Scatter data
-            comm.Scatter([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=0)
+            if size * block > segment:
+                pipelined_blocks(comm, 'scatter', as_bytes(send_buff), as_bytes(recv_buff), block, segment, root=0)
+            elif persistent:
+                collective.run([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=0)
+            else:
+                comm.Scatter(buffer_spec(send_buff, mpi_dtype, size), [recv_buff, mpi_dtype], root=0)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
-def buffered_scatter_from_process(process_rank: int, chunk_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_scatter_from_process(process_rank: int, chunk_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False) -> Callable:
     """
     Decorator that executes function on specified rank and scatters results to all processes.
     
@@ -187,6 +321,23 @@ def buffered_scatter_from_process(process_rank: int, chunk_shape: int | Tuple[in
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
     
     Returns
     -------
@@ -204,36 +355,52 @@ def buffered_scatter_from_process(process_rank: int, chunk_shape: int | Tuple[in
     Notes
     -----
     Decorated function only runs on the specified process.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
+    size = comm.Get_size()
     
     if isinstance(chunk_shape, int):
         chunk_shape = (chunk_shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    block = int(np.prod(chunk_shape, dtype=np.int64)) * np.dtype(dtype).itemsize
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Scatter') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Allocate receive buffer on all processes
-            recv_buff = build_buffer(chunk_shape, dtype)
+            recv_buff = buffers.get(chunk_shape, out)
             
             if rank == process_rank:
                 # Execute function and prepare send buffer
                 result = func(*args, **kwargs)
-                send_buff = result
+                send_buff = collective.stage(result) if persistent else result
             else:
                 send_buff = None
             
             # Scatter data
-            comm.Scatter([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
+            if size * block > segment:
+                pipelined_blocks(comm, 'scatter', as_bytes(send_buff), as_bytes(recv_buff), block, segment, root=process_rank)
+            elif persistent:
+                collective.run([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
+            else:
+                comm.Scatter(buffer_spec(send_buff, mpi_dtype, size), [recv_buff, mpi_dtype], root=process_rank)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
 # Buffered gather decorators
-def buffered_gather_to_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_gather_to_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and gathers results to specified rank.
     
@@ -247,6 +414,28 @@ def buffered_gather_to_process(process_rank: int, shape: int | Tuple[int, ...],
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    hierarchical : bool, optional
+        Run the collective in two levels: within every node (through shared
+        memory) and among one leader process per node. Falls back to the flat
+        collective on a single node or with one process per node. Cannot be
+        combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -265,6 +454,8 @@ def buffered_gather_to_process(process_rank: int, shape: int | Tuple[int, ...],
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
@@ -273,29 +464,47 @@ def buffered_gather_to_process(process_rank: int, shape: int | Tuple[int, ...],
         shape = (shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    block = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Gather') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
+            send_buff = collective.stage(result) if persistent else result
             
             # Prepare receive buffer only on specified rank
             if rank == process_rank:
-                recv_buff = build_buffer((size,) + shape, dtype)
+                recv_buff = buffers.get((size,) + shape, out)
             else:
                 recv_buff = None
             
             # Gather data to specified rank
-            comm.Gather([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_gather(comm, send_buff, recv_buff, dtype, mpi_dtype, process_rank)
+            elif size * block > segment:
+                pipelined_blocks(comm, 'gather', as_bytes(send_buff), as_bytes(recv_buff), block, segment, root=process_rank)
+            elif persistent:
+                collective.run([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
+            else:
+                comm.Gather(buffer_spec(send_buff, mpi_dtype), [recv_buff, mpi_dtype], root=process_rank)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
-def buffered_gather_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_gather_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and gathers results to all processes.
     
@@ -307,6 +516,28 @@ def buffered_gather_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, comm:
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    hierarchical : bool, optional
+        Run the collective in two levels: within every node (through shared
+        memory) and among one leader process per node. Falls back to the flat
+        collective on a single node or with one process per node. Cannot be
+        combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -324,6 +555,8 @@ def buffered_gather_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, comm:
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     size = comm.Get_size()
     
@@ -331,25 +564,43 @@ def buffered_gather_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, comm:
         shape = (shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    block = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Allgather') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
-            recv_buff = build_buffer((size,) + shape, dtype)
+            send_buff = collective.stage(result) if persistent else result
+            recv_buff = buffers.get((size,) + shape, out)
             
             # Gather data to all processes
-            comm.Allgather([send_buff, mpi_dtype], [recv_buff, mpi_dtype])
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_gather(comm, send_buff, recv_buff, dtype, mpi_dtype, None)
+            elif size * block > segment:
+                pipelined_blocks(comm, 'allgather', as_bytes(send_buff), as_bytes(recv_buff), block, segment)
+            elif persistent:
+                collective.run([send_buff, mpi_dtype], [recv_buff, mpi_dtype])
+            else:
+                comm.Allgather(buffer_spec(send_buff, mpi_dtype), [recv_buff, mpi_dtype])
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
 # Buffered gather decorator
-def buffered_gather_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_gather_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and gathers results to rank 0.
     
@@ -361,6 +612,28 @@ def buffered_gather_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm:
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    hierarchical : bool, optional
+        Run the collective in two levels: within every node (through shared
+        memory) and among one leader process per node. Falls back to the flat
+        collective on a single node or with one process per node. Cannot be
+        combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -379,6 +652,8 @@ def buffered_gather_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm:
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
@@ -387,30 +662,48 @@ def buffered_gather_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm:
         shape = (shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    block = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+    
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Gather') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
+            send_buff = collective.stage(result) if persistent else result
             
             # Prepare receive buffer only on rank 0
             if rank == 0:
-                recv_buff = build_buffer((size,) + shape, dtype)
+                recv_buff = buffers.get((size,) + shape, out)
             else:
                 recv_buff = None
             
             # Gather data to rank 0
-            comm.Gather([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=0)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_gather(comm, send_buff, recv_buff, dtype, mpi_dtype, 0)
+            elif size * block > segment:
+                pipelined_blocks(comm, 'gather', as_bytes(send_buff), as_bytes(recv_buff), block, segment, root=0)
+            elif persistent:
+                collective.run([send_buff, mpi_dtype], [recv_buff, mpi_dtype], root=0)
+            else:
+                comm.Gather(buffer_spec(send_buff, mpi_dtype), [recv_buff, mpi_dtype], root=0)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
 # All to all decorator
-def buffered_all_to_all(element_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def buffered_all_to_all(element_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and exchanges results between all processes.
     
@@ -422,6 +715,23 @@ def buffered_all_to_all(element_shape: int | Tuple[int, ...], dtype: np.dtype, c
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
     
     Returns
     -------
@@ -439,6 +749,8 @@ def buffered_all_to_all(element_shape: int | Tuple[int, ...], dtype: np.dtype, c
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     size = comm.Get_size()
     
@@ -446,20 +758,33 @@ def buffered_all_to_all(element_shape: int | Tuple[int, ...], dtype: np.dtype, c
         element_shape = (element_shape,)
     
     mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+    block = int(np.prod(element_shape, dtype=np.int64)) * np.dtype(dtype).itemsize
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Alltoall') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
-            recv_buff = build_buffer((size,) + element_shape, dtype)
+            send_buff = collective.stage(result) if persistent else result
+            recv_buff = buffers.get((size,) + element_shape, out)
             
             # All-to-all exchange
-            comm.Alltoall([send_buff, mpi_dtype], [recv_buff, mpi_dtype])
+            if size * block > segment:
+                pipelined_blocks(comm, 'alltoall', as_bytes(send_buff), as_bytes(recv_buff), block, segment)
+            elif persistent:
+                collective.run([send_buff, mpi_dtype], [recv_buff, mpi_dtype])
+            else:
+                comm.Alltoall(buffer_spec(send_buff, mpi_dtype, size), [recv_buff, mpi_dtype])
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
@@ -1,13 +1,28 @@
+from __future__ import annotations
+
 import numpy as np
 from mpi4py import MPI
 from mpi4py.MPI import Comm, COMM_WORLD, Op
 from collections.abc import Callable
 from functools import wraps
-from typing import Tuple
-from mpitools.comms.utils import to_mpi_dtype, build_buffer, to_mpi_op
+from typing import Optional, Tuple
+from mpitools.comms.utils import reduction_dtype, reduction_op, to_mpi_op
+from mpitools.comms.buffer_pool import BufferPool, ReceiveBuffers
+from mpitools.comms.persistent import PersistentCollective
+from mpitools.comms.hierarchical import hierarchy, hierarchical_reduce
+
+# Helper function to check in-place reduction buffers
+def _inplace_buffer(result: np.ndarray, shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    """Result array that an in-place reduction writes into."""
+    if (not isinstance(result, np.ndarray) or result.shape != shape or result.dtype != np.dtype(dtype)
+            or not result.flags.c_contiguous or not result.flags.writeable):
+        raise ValueError(f"inplace reductions need a writable C-contiguous array of shape {shape} "
+                         f"and dtype {np.dtype(dtype)}, got {type(result).__name__} "
+                         f"of shape {np.shape(result)}")
+    return result
 
 # Buffered reduce decorators
-def buffered_reduce_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+def buffered_reduce_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD, *, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, inplace: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and reduces results to rank 0.
     
@@ -23,6 +38,28 @@ def buffered_reduce_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, op: s
         'lxor', 'bxor', 'maxloc', 'minloc'.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    inplace : bool, optional
+        Reduce into the decorated function's own result array with MPI.IN_PLACE
+        instead of a separate receive buffer, which must then be a writable
+        C-contiguous array of the given shape and dtype. Defaults to False.
+    hierarchical : bool, optional
+        Reduce in two levels: within every node (through shared memory) and
+        among one leader process per node. Only used for commutative operations,
+        and falls back to the flat collective on a single node or with one
+        process per node. Cannot be combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -41,38 +78,60 @@ def buffered_reduce_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, op: s
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     
     if isinstance(shape, int):
         shape = (shape,)
     
-    op = to_mpi_op(op)
+    op = reduction_op(to_mpi_op(op), dtype)
+    
+    mpi_dtype = reduction_dtype(op, dtype, shape)
     
-    mpi_dtype = to_mpi_dtype(dtype)
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
+    hierarchical = hierarchical and op.Is_commutative()
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Reduce') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
+            send_buff = collective.stage(result) if persistent else result
+            send_spec = [np.ascontiguousarray(send_buff), mpi_dtype]
             
             # Prepare receive buffer only on rank 0
-            if rank == 0:
-                recv_buff = build_buffer(shape, dtype)
+            if rank == 0 and inplace:
+                # Reduce into the function's own result array
+                recv_buff = _inplace_buffer(send_buff, shape, dtype)
+                send_spec = MPI.IN_PLACE
+            elif rank == 0:
+                recv_buff = buffers.get(shape, out)
             else:
                 recv_buff = None
             
             # Reduce data to rank 0
-            comm.Reduce([send_buff, mpi_dtype], [recv_buff, mpi_dtype], op=op, root=0)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_reduce(comm, send_buff, recv_buff, mpi_dtype, op, 0)
+            elif persistent:
+                collective.run(send_spec, [recv_buff, mpi_dtype], op=op, root=0)
+            else:
+                comm.Reduce(send_spec, [recv_buff, mpi_dtype], op=op, root=0)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
-def buffered_reduce_to_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+def buffered_reduce_to_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD, *, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, inplace: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and reduces results to specified rank.
     
@@ -90,6 +149,28 @@ def buffered_reduce_to_process(process_rank: int, shape: int | Tuple[int, ...],
         'lxor', 'bxor', 'maxloc', 'minloc'.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    inplace : bool, optional
+        Reduce into the decorated function's own result array with MPI.IN_PLACE
+        instead of a separate receive buffer, which must then be a writable
+        C-contiguous array of the given shape and dtype. Defaults to False.
+    hierarchical : bool, optional
+        Reduce in two levels: within every node (through shared memory) and
+        among one leader process per node. Only used for commutative operations,
+        and falls back to the flat collective on a single node or with one
+        process per node. Cannot be combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -108,38 +189,60 @@ def buffered_reduce_to_process(process_rank: int, shape: int | Tuple[int, ...],
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     
     if isinstance(shape, int):
         shape = (shape,)
     
-    op = to_mpi_op(op)
+    op = reduction_op(to_mpi_op(op), dtype)
+    
+    mpi_dtype = reduction_dtype(op, dtype, shape)
     
-    mpi_dtype = to_mpi_dtype(dtype)
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
+    hierarchical = hierarchical and op.Is_commutative()
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Reduce') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
+            send_buff = collective.stage(result) if persistent else result
+            send_spec = [np.ascontiguousarray(send_buff), mpi_dtype]
             
             # Prepare receive buffer only on specified rank
-            if rank == process_rank:
-                recv_buff = build_buffer(shape, dtype)
+            if rank == process_rank and inplace:
+                # Reduce into the function's own result array
+                recv_buff = _inplace_buffer(send_buff, shape, dtype)
+                send_spec = MPI.IN_PLACE
+            elif rank == process_rank:
+                recv_buff = buffers.get(shape, out)
             else:
                 recv_buff = None
             
             # Reduce data to specified rank
-            comm.Reduce([send_buff, mpi_dtype], [recv_buff, mpi_dtype], op=op, root=process_rank)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_reduce(comm, send_buff, recv_buff, mpi_dtype, op, process_rank)
+            elif persistent:
+                collective.run(send_spec, [recv_buff, mpi_dtype], op=op, root=process_rank)
+            else:
+                comm.Reduce(send_spec, [recv_buff, mpi_dtype], op=op, root=process_rank)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
-def buffered_reduce_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+def buffered_reduce_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD, *, reuse: bool = False, pool: Optional[BufferPool | bool] = None, persistent: bool = False, inplace: bool = False, hierarchical: bool = False) -> Callable:
     """
     Decorator that executes function on all processes and reduces results to all processes.
     
@@ -155,6 +258,28 @@ def buffered_reduce_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, op: st
         'lxor', 'bxor', 'maxloc', 'minloc'.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
+    persistent : bool, optional
+        Set the collective up once as an MPI-4 persistent request over fixed buffers
+        and only start it on later calls, falling back to the blocking collective on
+        the same buffers when the MPI library predates MPI-4. Results are then only
+        valid until the next call. The decorated function gets a close() method
+        that releases the request, which otherwise happens at exit. Defaults to False.
+    inplace : bool, optional
+        Reduce into the decorated function's own result array with MPI.IN_PLACE
+        instead of a separate receive buffer, which must then be a writable
+        C-contiguous array of the given shape and dtype. Defaults to False.
+    hierarchical : bool, optional
+        Reduce in two levels: within every node (through shared memory) and
+        among one leader process per node. Only used for commutative operations,
+        and falls back to the flat collective on a single node or with one
+        process per node. Cannot be combined with persistent. Defaults to False.
     
     Returns
     -------
@@ -172,27 +297,50 @@ def buffered_reduce_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, op: st
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     if isinstance(shape, int):
         shape = (shape,)
     
-    op = to_mpi_op(op)
+    op = reduction_op(to_mpi_op(op), dtype)
+    
+    mpi_dtype = reduction_dtype(op, dtype, shape)
     
-    mpi_dtype = to_mpi_dtype(dtype)
+    if hierarchical and persistent:
+        raise ValueError("hierarchical cannot be combined with persistent")
+    hierarchical = hierarchical and op.Is_commutative()
     
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool, persistent)
+        collective = PersistentCollective(comm, 'Allreduce') if persistent else None
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
-            recv_buff = build_buffer(shape, dtype)
+            send_buff = collective.stage(result) if persistent else result
+            if inplace:
+                # Reduce into the function's own result array
+                recv_buff = _inplace_buffer(send_buff, shape, dtype)
+                send_spec = MPI.IN_PLACE
+            else:
+                recv_buff = buffers.get(shape, out)
+                send_spec = [np.ascontiguousarray(send_buff), mpi_dtype]
             
             # Reduce data to all processes
-            comm.Allreduce([send_buff, mpi_dtype], [recv_buff, mpi_dtype], op=op)
+            if hierarchical and not hierarchy(comm).flat:
+                hierarchical_reduce(comm, send_buff, recv_buff, mpi_dtype, op, None)
+            elif persistent:
+                collective.run(send_spec, [recv_buff, mpi_dtype], op=op)
+            else:
+                comm.Allreduce(send_spec, [recv_buff, mpi_dtype], op=op)
             
             return recv_buff
+        if persistent:
+            wrapper.close = collective.free
         return wrapper
     return decorator
 
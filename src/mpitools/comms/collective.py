@@ -1,9 +1,20 @@
+from __future__ import annotations
+
 from mpi4py.MPI import Comm, COMM_WORLD
 from collections.abc import Callable
 from functools import wraps 
+from mpitools.comms.compression import Compression, to_compression
+from mpitools.comms.object_transport import (
+    LayoutCache,
+    bcast_object,
+    scatter_object,
+    gather_object,
+    allgather_object,
+    alltoall_object
+)
   
 # Broadcast decorators
-def broadcast_from_main(comm: Comm = COMM_WORLD) -> Callable:
+def broadcast_from_main(comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on rank 0 and broadcasts result to all processes.
     
@@ -11,6 +22,16 @@ def broadcast_from_main(comm: Comm = COMM_WORLD) -> Callable:
     ----------
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -28,19 +49,22 @@ def broadcast_from_main(comm: Comm = COMM_WORLD) -> Callable:
     Notes
     -----
     Decorated function only runs on the main process.
+    A NumPy array result is sent as raw bytes with Bcast after a small
+    pickled header describing its shape and dtype.
     """
     rank = comm.Get_rank()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = None
             if rank == 0:
                 result = func(*args, **kwargs)
-            return comm.bcast(result, root=0)
+            return bcast_object(comm, result, root=0, oob=oob, compression=compression)
         return wrapper
     return decorator
 
-def broadcast_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
+def broadcast_from_process(process_rank: int, comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on specified rank and broadcasts result to all processes.
     
@@ -50,6 +74,16 @@ def broadcast_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callab
         Rank of the process that should execute the function and broadcast result.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -67,20 +101,23 @@ def broadcast_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callab
     Notes
     -----
     Decorated function only runs on the specified process.
+    A NumPy array result is sent as raw bytes with Bcast after a small
+    pickled header describing its shape and dtype.
     """
     rank = comm.Get_rank()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = None
             if rank == process_rank:
                 result = func(*args, **kwargs)
-            return comm.bcast(result, root=process_rank)
+            return bcast_object(comm, result, root=process_rank, oob=oob, compression=compression)
         return wrapper
     return decorator
 
 # Scatter decorators
-def scatter_from_main(comm: Comm = COMM_WORLD) -> Callable:
+def scatter_from_main(comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on rank 0 and scatters results to all processes.
     
@@ -88,6 +125,16 @@ def scatter_from_main(comm: Comm = COMM_WORLD) -> Callable:
     ----------
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -105,19 +152,22 @@ def scatter_from_main(comm: Comm = COMM_WORLD) -> Callable:
     Notes
     -----
     Decorated function only runs on the main process.
+    A NumPy array result with one row per process is sent as raw bytes
+    with Scatter after a small pickled header describing the row shape and dtype.
     """
     rank = comm.Get_rank()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = None
             if rank == 0:
                 result = func(*args, **kwargs)
-            return comm.scatter(result, root=0)
+            return scatter_object(comm, result, root=0, oob=oob, compression=compression)
         return wrapper
     return decorator
 
-def scatter_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
+def scatter_from_process(process_rank: int, comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on specified rank and scatters results to all processes.
     
@@ -127,6 +177,16 @@ def scatter_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable
         Rank of the process that should execute the function and scatter results.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -144,20 +204,23 @@ def scatter_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable
     Notes
     -----
     Decorated function only runs on the specified process.
+    A NumPy array result with one row per process is sent as raw bytes
+    with Scatter after a small pickled header describing the row shape and dtype.
     """
     rank = comm.Get_rank()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = None
             if rank == process_rank:
                 result = func(*args, **kwargs)
-            return comm.scatter(result, root=process_rank)
+            return scatter_object(comm, result, root=process_rank, oob=oob, compression=compression)
         return wrapper
     return decorator
 
 # Gather decorators
-def gather_to_main(comm: Comm = COMM_WORLD) -> Callable:
+def gather_to_main(comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on all processes and gathers results to rank 0.
     
@@ -165,6 +228,16 @@ def gather_to_main(comm: Comm = COMM_WORLD) -> Callable:
     ----------
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -183,16 +256,21 @@ def gather_to_main(comm: Comm = COMM_WORLD) -> Callable:
     Notes
     -----
     Decorated function runs on all processes.
+    When every process returns a NumPy array, shapes and dtypes are negotiated
+    with a small Allgather (and only re-sent when they change) and the arrays
+    are sent as raw bytes with Gatherv.
     """
+    cache = LayoutCache()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            return comm.gather(result, root=0)
+            return gather_object(comm, result, 0, cache, oob=oob, compression=compression)
         return wrapper
     return decorator
 
-def gather_to_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
+def gather_to_process(process_rank: int, comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on all processes and gathers results to specified rank.
     
@@ -202,6 +280,16 @@ def gather_to_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
         Rank of the process that should receive gathered results.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -220,16 +308,21 @@ def gather_to_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
     Notes
     -----
     Decorated function runs on all processes.
+    When every process returns a NumPy array, shapes and dtypes are negotiated
+    with a small Allgather (and only re-sent when they change) and the arrays
+    are sent as raw bytes with Gatherv.
     """
+    cache = LayoutCache()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            return comm.gather(result, root=process_rank)
+            return gather_object(comm, result, process_rank, cache, oob=oob, compression=compression)
         return wrapper
     return decorator
 
-def gather_to_all(comm: Comm = COMM_WORLD) -> Callable:
+def gather_to_all(comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on all processes and gathers results to all processes.
     
@@ -237,6 +330,16 @@ def gather_to_all(comm: Comm = COMM_WORLD) -> Callable:
     ----------
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns
     -------
@@ -254,17 +357,22 @@ def gather_to_all(comm: Comm = COMM_WORLD) -> Callable:
     Notes
     -----
     Decorated function runs on all processes.
+    When every process returns a NumPy array, shapes and dtypes are negotiated
+    with a small Allgather (and only re-sent when they change) and the arrays
+    are sent as raw bytes with Allgatherv.
     """
+    cache = LayoutCache()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            return comm.allgather(result)
+            return allgather_object(comm, result, cache, oob=oob, compression=compression)
         return wrapper
     return decorator
 
 # All to all decorator 
-def all_to_all(comm: Comm = COMM_WORLD) -> Callable:
+def all_to_all(comm: Comm = COMM_WORLD, *, oob: bool = False, compress: bool | str | Compression | None = None) -> Callable:
     """
     Decorator that executes function on all processes and exchanges results between all processes.
     
@@ -272,6 +380,16 @@ def all_to_all(comm: Comm = COMM_WORLD) -> Callable:
     ----------
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    oob : bool, optional
+        Serialize with pickle protocol 5 and send the buffers the pickle references
+        (e.g. the data of nested NumPy arrays) as separate raw MPI messages, which
+        receivers unpickle without copying. Defaults to False.
+    compress : bool, str or Compression, optional
+        Compress the pickled result before sending it: True or 'zlib' for zlib,
+        'lzma' for lzma, 'auto' to measure the link bandwidth and compress only
+        when that is faster than sending raw, or a Compression for full control.
+        Results below 64 KiB are sent uncompressed. Takes precedence over oob.
+        Defaults to None (no compression).
     
     Returns 
     -------
@@ -289,11 +407,16 @@ def all_to_all(comm: Comm = COMM_WORLD) -> Callable:
     Notes
     -----
     Decorated function runs on all processes.
+    When every process returns a NumPy array with one row per process, row
+    shapes and dtypes are negotiated with a small Allgather (and only re-sent
+    when they change) and the rows are sent as raw bytes with Alltoallv.
     """
+    cache = LayoutCache()
+    compression = to_compression(compress)
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            return comm.alltoall(result)
+            return alltoall_object(comm, result, cache, oob=oob, compression=compression)
         return wrapper
     return decorator
\ No newline at end of file
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import lzma
+import os
+import time
+import zlib
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from mpitools.comms.utils import node_comms
+
+# Frame flags, stored in the first byte of every frame
+_RAW = 0
+_CODEC_IDS = {'zlib': 1, 'lzma': 2}
+_DECOMPRESS = {'zlib': zlib.decompress, 'lzma': lzma.decompress}
+
+# Bytes broadcast, and how often, to measure the bandwidth of a communicator
+_PROBE_BYTES = 4 * 1024**2
+_PROBE_REPEATS = 3
+
+_link_bandwidths = {}
+
+def _cpu_share(comm: Comm) -> int:
+    """
+    CPUs this process may use, split evenly between the processes of comm on
+    its node. The first call per communicator is collective.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, cpus // node_comms(comm)[0].Get_size())
+
+def link_bandwidth(comm: Comm) -> float:
+    """
+    Measured broadcast bandwidth of comm in bytes per second.
+
+    Times a few broadcasts of a probe buffer and keeps the slowest rank's time.
+    Results are cached per communicator, so only the first call is collective.
+    """
+    key = comm.py2f()
+    if key not in _link_bandwidths:
+        if comm.Get_size() == 1:
+            _link_bandwidths[key] = float('inf')
+        else:
+            probe = np.zeros(_PROBE_BYTES, dtype=np.uint8)
+            comm.Bcast([probe, MPI.BYTE], root=0)  # warm up connections
+            comm.Barrier()
+            start = time.perf_counter()
+            for _ in range(_PROBE_REPEATS):
+                comm.Bcast([probe, MPI.BYTE], root=0)
+            elapsed = comm.allreduce((time.perf_counter() - start) / _PROBE_REPEATS, op=MPI.MAX)
+            _link_bandwidths[key] = _PROBE_BYTES / max(elapsed, 1e-9)
+    return _link_bandwidths[key]
+
+
+class Compression:
+    """
+    Compression settings for the object collectives.
+
+    Payloads are split into blocks that are compressed in parallel threads
+    (zlib and lzma release the GIL) and framed with their codec, so receivers
+    decode any frame without knowing how the sender chose to encode it.
+
+    Parameters
+    ----------
+    codec : str, optional
+        'zlib' or 'lzma'. Defaults to 'zlib'.
+    level : int, optional
+        Compression level of the codec. Defaults to 1 for zlib, the fastest
+        level, and 6 for lzma.
+    threshold : int, optional
+        Payloads smaller than this many bytes are sent uncompressed. Defaults to 64 KiB.
+    calibrate : bool, optional
+        Measure the link bandwidth of the communicator on first use and only
+        compress a payload when compressing, sending the smaller payload and
+        decompressing is estimated to be faster than sending it raw. The
+        estimate compresses the first block of each payload. Defaults to False.
+    block_size : int, optional
+        Size in bytes of the blocks compressed in parallel. Defaults to 1 MiB.
+    threads : int, optional
+        Number of compression threads per process. Defaults to the CPUs this
+        process may use divided by the number of processes of the communicator
+        on its node (at least 1), determined on first use by a collective.
+
+    Notes
+    -----
+    Threads are started on first use. Call close() to shut them down once the
+    settings are no longer used.
+    """
+
+    def __init__(self, codec: str = 'zlib', level: Optional[int] = None, threshold: int = 64 * 1024,
+                 calibrate: bool = False, block_size: int = 1024**2, threads: Optional[int] = None):
+        if codec not in _CODEC_IDS:
+            raise ValueError(f"Invalid codec: {codec}. Supported codecs: {list(_CODEC_IDS.keys())}")
+        if block_size <= 0:
+            raise ValueError(f"block_size must be positive, got {block_size}")
+        self.codec = codec
+        self.level = level if level is not None else (1 if codec == 'zlib' else 6)
+        self.threshold = threshold
+        self.calibrate = calibrate
+        self.block_size = block_size
+        self.threads = threads
+        self._executor = None
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Shut down the compression threads. They are started again if the settings are used later."""
+        executor, self._executor = getattr(self, '_executor', None), None
+        if executor is not None:
+            executor.shutdown()
+
+    def __repr__(self):
+        return (f"Compression(codec={self.codec!r}, level={self.level}, threshold={self.threshold}, "
+                f"calibrate={self.calibrate})")
+
+    def prepare(self, comm: Comm):
+        """
+        Size the thread pool from the processes sharing the node and measure the
+        link bandwidth if calibrating (collective on the first call per communicator).
+        """
+        if self.threads is None:
+            self.threads = _cpu_share(comm)
+        if self.calibrate:
+            link_bandwidth(comm)
+
+    def encode(self, data: bytes, comm: Optional[Comm] = None) -> np.ndarray:
+        """Frame a payload, compressed when it is large enough and compression pays off."""
+        view = memoryview(data).cast('B')
+        n = view.nbytes
+        if n < self.threshold:
+            return _raw_frame(view)
+
+        first = None
+        if self.calibrate:
+            first, worth = self._estimate(view, link_bandwidth(comm))
+            if not worth:
+                return _raw_frame(view)
+
+        blocks = [view[a:a + self.block_size] for a in range(0, n, self.block_size)]
+        rest = blocks[1:] if first is not None else blocks
+        compressed = ([first] if first is not None else []) + self._map(self._compress, rest)
+        lengths = np.array([len(block) for block in compressed], dtype=np.int64)
+        if lengths.sum() >= n:
+            return _raw_frame(view)
+
+        header = np.concatenate([np.array([_CODEC_IDS[self.codec]], dtype=np.uint8),
+                                 np.array([len(lengths)], dtype=np.int64).view(np.uint8),
+                                 lengths.view(np.uint8)])
+        return np.concatenate([header] + [np.frombuffer(block, dtype=np.uint8) for block in compressed])
+
+    def decode(self, frame: np.ndarray) -> memoryview:
+        """Payload stored in a frame produced by encode."""
+        frame = memoryview(frame).cast('B')
+        flag = frame[0]
+        if flag == _RAW:
+            return frame[1:]
+        count = int(np.frombuffer(frame[1:9], dtype=np.int64)[0])
+        lengths = np.frombuffer(frame[9:9 + 8 * count], dtype=np.int64)
+        offsets = 9 + 8 * count + np.concatenate([[0], np.cumsum(lengths)])
+        blocks = [frame[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        return memoryview(b''.join(self._map(_DECOMPRESS[_codec_name(flag)], blocks)))
+
+    def _compress(self, block: memoryview) -> bytes:
+        if self.codec == 'zlib':
+            return zlib.compress(block, self.level)
+        return lzma.compress(block, preset=self.level)
+
+    def _map(self, fn, blocks: List[memoryview]) -> List[bytes]:
+        if len(blocks) <= 1 or (self.threads or 1) == 1:
+            return [fn(block) for block in blocks]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        return list(self._executor.map(fn, blocks))
+
+    def _estimate(self, view: memoryview, bandwidth: float) -> Tuple[bytes, bool]:
+        """
+        Compress the first block and extrapolate whether compressing the whole
+        payload beats sending it raw at the given bandwidth.
+        """
+        sample = view[:self.block_size]
+        start = time.perf_counter()
+        compressed = self._compress(sample)
+        middle = time.perf_counter()
+        _DECOMPRESS[self.codec](compressed)
+        end = time.perf_counter()
+
+        n = view.nbytes
+        parallel = min(self.threads or 1, -(-n // self.block_size))
+        ratio = len(compressed) / sample.nbytes
+        scale = n / sample.nbytes
+        compressed_cost = scale * (middle - start) / parallel + ratio * n / bandwidth + scale * (end - middle) / parallel
+        return compressed, compressed_cost < n / bandwidth
+
+
+def to_compression(compress: bool | str | Compression | None) -> Optional[Compression]:
+    """
+    Compression settings of a compress= decorator option.
+
+    None or False disable compression, True and codec names select that codec
+    ('zlib' for True), 'auto' selects zlib with bandwidth calibration.
+    """
+    if compress is None or compress is False:
+        return None
+    if isinstance(compress, Compression):
+        return compress
+    if compress is True:
+        return Compression()
+    if compress == 'auto':
+        return Compression(calibrate=True)
+    if isinstance(compress, str):
+        return Compression(compress)
+    raise TypeError(f"compress must be a bool, a codec name, 'auto' or a Compression, got {compress!r}")
+
+
+def _raw_frame(view: memoryview) -> np.ndarray:
+    frame = np.empty(view.nbytes + 1, dtype=np.uint8)
+    frame[0] = _RAW
+    frame[1:] = np.frombuffer(view, dtype=np.uint8)
+    return frame
+
+
+def _codec_name(flag: int) -> str:
+    for name, codec_id in _CODEC_IDS.items():
+        if codec_id == flag:
+            return name
+    raise ValueError(f"Unknown compression flag: {flag}")
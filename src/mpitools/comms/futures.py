@@ -0,0 +1,135 @@
+from mpi4py import MPI
+from mpi4py.MPI import Comm
+from collections.abc import Callable
+from typing import Any, Iterable, List, Optional, Tuple
+
+_stage_comms = {}  # comm handle -> private duplicate running second stages
+_unstaged = {}  # duplicate handle -> futures whose second stage is not started yet, in creation order
+
+def stage_comm(comm: Comm) -> Comm:
+    """
+    Private duplicate of comm for the second stages of two-stage futures, so
+    starting them late never interleaves with collectives run on comm in the
+    meantime. Cached per communicator; the first call is collective.
+    """
+    key = comm.py2f()
+    if key not in _stage_comms:
+        _stage_comms[key] = comm.Dup()
+        _unstaged[_stage_comms[key].py2f()] = []
+    return _stage_comms[key]
+
+
+class CommFuture:
+    """
+    Handle to a nonblocking collective started by one of the i-decorators.
+
+    Parameters
+    ----------
+    request : MPI.Request
+        Request of the nonblocking collective.
+    buffer : Any
+        Buffer the collective writes into, None on processes that receive nothing.
+    finalize : callable, optional
+        Converts the completed buffer into the result, e.g. by unpickling it.
+        Defaults to returning the buffer itself.
+    keep : tuple, optional
+        Objects (send buffers) that must stay alive until the collective completes.
+    then : callable, optional
+        Starts a second collective on stage once request completes, e.g. the
+        payload transfer sized by a nonblocking exchange of counts, and returns
+        its (request, buffer). Defaults to None.
+    stage : MPI.Comm, optional
+        Communicator from stage_comm() the second collective runs on. Required with then.
+
+    Notes
+    -----
+    The buffer must not be read before the future is done, and send buffers
+    must not be modified until then. Second stages are started by test(),
+    wait() or wait_all(), in creation order on every process: starting one
+    first completes and starts those of earlier futures on the same stage.
+    """
+
+    def __init__(self, request: MPI.Request, buffer: Any, finalize: Optional[Callable[[Any], Any]] = None,
+                 keep: tuple = (), then: Optional[Callable[[], Tuple[MPI.Request, Any]]] = None,
+                 stage: Optional[Comm] = None):
+        self.request = request
+        self.buffer = buffer
+        self._finalize = finalize
+        self._keep = keep
+        self._then = then
+        self._stage = stage
+        self._done = False
+        self._result = None
+        if then is not None:
+            _unstaged[stage.py2f()].append(self)
+
+    def test(self) -> bool:
+        """Return True if the collective has completed, without blocking."""
+        while not self._done and self.request.Test():
+            self._step()
+        return self._done
+
+    def wait(self) -> Any:
+        """Block until the collective completes and return its result."""
+        while not self._done:
+            self.request.Wait()
+            self._step()
+        return self._result
+
+    def done(self) -> bool:
+        """Return True if the result is available."""
+        return self._done
+
+    @property
+    def result(self) -> Any:
+        """Result of the collective, waiting for it if needed."""
+        return self.wait()
+
+    def _step(self):
+        """Start the second stage once the first has completed, or complete."""
+        if self._then is None:
+            self._complete()
+            return
+        queue = _unstaged[self._stage.py2f()]
+        while queue[0] is not self:
+            queue[0].request.Wait()
+            queue[0]._step()
+        queue.pop(0)
+        then, self._then = self._then, None
+        self.request, self.buffer = then()
+
+    def _complete(self):
+        self._done = True
+        self._keep = ()
+        self._result = self.buffer if self._finalize is None else self._finalize(self.buffer)
+
+    def __repr__(self):
+        return f"CommFuture(done={self._done})"
+
+
+def wait_all(futures: Iterable[CommFuture]) -> List[Any]:
+    """
+    Wait for several nonblocking collectives and return their results in order.
+
+    Parameters
+    ----------
+    futures : iterable of CommFuture
+        Futures returned by i-decorated functions.
+
+    Returns
+    -------
+    list
+        Result of each future.
+    """
+    futures = list(futures)
+    pending = [future for future in futures if not future.done()]
+    while pending:
+        requests = [future.request for future in pending]
+        MPI.Request.Waitall(requests)
+        for future, request in zip(pending, requests):
+            # Skip futures whose second stage was already started for a later one
+            if future.request is request:
+                future._step()
+        pending = [future for future in pending if not future.done()]
+    return [future.result for future in futures]
+
@@ -0,0 +1,160 @@
+"""
+Two-level (node, then node leaders) collectives over NumPy buffers.
+
+Only the buffered broadcast, gather and reduction decorators take the
+hierarchical option. The object collectives (broadcast_from_main,
+reduce_to_main, gather_to_main and their variants) always run flat: their
+payloads are pickled, so a two-level path would pickle twice, and large
+payloads that benefit from it belong in the buffered decorators.
+"""
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm
+from typing import Optional
+from mpitools.comms.utils import node_comms
+from mpitools.comms.segmented import pipelined_bcast
+from mpitools.comms.views import buffer_spec
+
+_hierarchies = {}
+
+class Hierarchy:
+    """
+    Two-level layout of a communicator: one communicator per node and one of
+    node leaders (node rank 0), plus where every rank of comm sits in them.
+
+    Attributes
+    ----------
+    node_comm, leader_comm : MPI.Comm
+        Communicators of node_comms. leader_comm is MPI.COMM_NULL on non-leaders.
+    node_of : numpy.ndarray
+        Node (rank in leader_comm of its leader) of every rank of comm.
+    local_of : numpy.ndarray
+        Rank in its node_comm of every rank of comm.
+    order : numpy.ndarray
+        Ranks of comm grouped by node, in node-local order: the order in which
+        node-wise gathers deliver blocks.
+    flat : bool
+        Whether two levels bring nothing, with a single node or a single rank per node.
+    """
+
+    def __init__(self, comm: Comm):
+        self.node_comm, self.leader_comm = node_comms(comm)
+        is_leader = self.leader_comm != MPI.COMM_NULL
+        node = self.node_comm.bcast(self.leader_comm.Get_rank() if is_leader else None, root=0)
+        layout = np.empty((comm.Get_size(), 2), dtype=np.int64)
+        comm.Allgather([np.array([node, self.node_comm.Get_rank()], dtype=np.int64), MPI.INT64_T], [layout, MPI.INT64_T])
+        self.node_of = layout[:, 0]
+        self.local_of = layout[:, 1]
+        self.node_sizes = np.bincount(self.node_of)
+        self.order = np.lexsort((self.local_of, self.node_of))
+        self.flat = len(self.node_sizes) in (1, comm.Get_size())
+
+    @property
+    def is_leader(self) -> bool:
+        return self.leader_comm != MPI.COMM_NULL
+
+
+def hierarchy(comm: Comm) -> Hierarchy:
+    """
+    Two-level layout of comm, cached per communicator. The first call is collective.
+    """
+    key = comm.py2f()
+    if key not in _hierarchies:
+        _hierarchies[key] = Hierarchy(comm)
+    return _hierarchies[key]
+
+# Helper function to broadcast within one level
+def _bcast(comm: Comm, buff: np.ndarray, mpi_dtype: MPI.Datatype, root: int, segment_size: int):
+    if buff.nbytes > segment_size:
+        pipelined_bcast(comm, buff, mpi_dtype, root, segment_size)
+    else:
+        comm.Bcast(buffer_spec(buff, mpi_dtype), root=root)
+
+def hierarchical_bcast(comm: Comm, buff: np.ndarray, mpi_dtype: MPI.Datatype, root: int, segment_size: int):
+    """
+    Broadcast in two levels: within the root's node from the root, among node
+    leaders, then within every other node from its leader. Every process takes
+    part in exactly one node-level broadcast.
+    """
+    h = hierarchy(comm)
+    node, root_node = h.node_of[comm.Get_rank()], h.node_of[root]
+    if node == root_node:
+        _bcast(h.node_comm, buff, mpi_dtype, int(h.local_of[root]), segment_size)
+    if h.is_leader:
+        _bcast(h.leader_comm, buff, mpi_dtype, int(root_node), segment_size)
+    if node != root_node:
+        _bcast(h.node_comm, buff, mpi_dtype, 0, segment_size)
+
+def hierarchical_reduce(comm: Comm, send: np.ndarray, recv: Optional[np.ndarray], mpi_dtype: MPI.Datatype, op: MPI.Op,
+                        root: Optional[int]):
+    """
+    Reduce (root given) or allreduce (root None) in two levels: within every
+    node to its leader, among node leaders, then to the root (or back to every
+    process of the node). The operation must be commutative, since nodes need
+    not hold consecutive ranks.
+    """
+    h = hierarchy(comm)
+    rank = comm.Get_rank()
+    send = np.ascontiguousarray(send)
+    partial = np.empty_like(send) if h.is_leader else None
+    h.node_comm.Reduce([send, mpi_dtype], [partial, mpi_dtype] if h.is_leader else None, op=op, root=0)
+
+    if root is None:
+        if h.is_leader:
+            h.leader_comm.Allreduce(MPI.IN_PLACE, [partial, mpi_dtype], op=op)
+            recv[...] = partial
+        h.node_comm.Bcast([recv, mpi_dtype], root=0)
+        return
+
+    root_node, root_local = int(h.node_of[root]), int(h.local_of[root])
+    if h.is_leader:
+        is_root_leader = h.leader_comm.Get_rank() == root_node
+        h.leader_comm.Reduce(MPI.IN_PLACE if is_root_leader else [partial, mpi_dtype], [partial, mpi_dtype], op=op, root=root_node)
+    if root_local == 0:
+        if rank == root:
+            recv[...] = partial
+    elif h.node_of[rank] == root_node:
+        if h.is_leader:
+            h.node_comm.Send([partial, mpi_dtype], dest=root_local)
+        elif rank == root:
+            h.node_comm.Recv([recv, mpi_dtype], source=0)
+
+def hierarchical_gather(comm: Comm, send: np.ndarray, recv: Optional[np.ndarray], dtype: np.dtype,
+                        mpi_dtype: MPI.Datatype, root: Optional[int]):
+    """
+    Gather (root given) or allgather (root None) of equal blocks in two levels:
+    within every node to its leader, then among node leaders. Blocks arrive
+    grouped by node and are put back in rank order on the receivers.
+    """
+    h = hierarchy(comm)
+    rank = comm.Get_rank()
+    block_shape = np.shape(send)
+    elements = int(np.prod(block_shape, dtype=np.int64))
+    node_block = np.empty((h.node_comm.Get_size(),) + block_shape, dtype=dtype) if h.is_leader else None
+    h.node_comm.Gather(buffer_spec(send, mpi_dtype), [node_block, mpi_dtype] if h.is_leader else None, root=0)
+
+    counts = h.node_sizes * elements
+    displs = np.zeros_like(counts)
+    np.cumsum(counts[:-1], out=displs[1:])
+    staging = None
+    if root is None:
+        staging = np.empty((comm.Get_size(),) + block_shape, dtype=dtype)
+        if h.is_leader:
+            h.leader_comm.Allgatherv([node_block, mpi_dtype], [staging, counts, displs, mpi_dtype])
+        h.node_comm.Bcast([staging, mpi_dtype], root=0)
+    else:
+        root_node, root_local = int(h.node_of[root]), int(h.local_of[root])
+        if h.is_leader:
+            is_root_leader = h.leader_comm.Get_rank() == root_node
+            if is_root_leader:
+                staging = np.empty((comm.Get_size(),) + block_shape, dtype=dtype)
+            h.leader_comm.Gatherv([node_block, mpi_dtype], [staging, counts, displs, mpi_dtype] if is_root_leader else None,
+                                  root=root_node)
+            if is_root_leader and root_local != 0:
+                h.node_comm.Send([staging, mpi_dtype], dest=root_local)
+        elif rank == root:
+            staging = np.empty((comm.Get_size(),) + block_shape, dtype=dtype)
+            h.node_comm.Recv([staging, mpi_dtype], source=0)
+        if rank != root:
+            return
+    recv[h.order] = staging
@@ -0,0 +1,1051 @@
+from __future__ import annotations
+
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD
+from collections.abc import Callable
+from functools import wraps
+from typing import Any, List, Sequence, Tuple
+from mpitools.comms.utils import to_mpi_dtype, build_buffer
+from mpitools.comms.views import buffer_spec
+from mpitools.comms.futures import CommFuture, stage_comm
+
+# Helpers for pickled payloads
+def _dumps(obj: Any) -> np.ndarray:
+    """Pickle an object into a uint8 array."""
+    return np.frombuffer(MPI.pickle.dumps(obj), dtype=np.uint8)
+
+def _loads(buff: np.ndarray) -> Any:
+    """Unpickle an object from a uint8 array."""
+    return MPI.pickle.loads(buff)
+
+def _displacements(counts: np.ndarray) -> np.ndarray:
+    """Displacements of consecutive blocks with the given counts."""
+    displs = np.zeros(len(counts), dtype=counts.dtype)
+    np.cumsum(counts[:-1], out=displs[1:])
+    return displs
+
+def _split_loads(buff: np.ndarray, counts: np.ndarray) -> List[Any]:
+    """Unpickle consecutive objects from a uint8 array."""
+    displs = _displacements(counts)
+    return [_loads(buff[d:d + c]) for d, c in zip(displs, counts)]
+
+def _pack(objs: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pickle a sequence of objects into one uint8 array and per-object byte counts."""
+    parts = [_dumps(obj) for obj in objs]
+    counts = np.array([part.size for part in parts], dtype=np.int64)
+    data = np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+    return data, counts
+
+# Nonblocking object broadcast decorators
+def ibroadcast_from_main(comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on rank 0 and starts a nonblocking broadcast of the result.
+
+    Parameters
+    ----------
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the broadcast result on all processes.
+
+    Notes
+    -----
+    Decorated function only runs on the main process. The size of the pickled
+    result is broadcast with a nonblocking collective, and test() or wait() start
+    the payload transfer once it has arrived, so the call returns without waiting
+    for other processes.
+    """
+    return ibroadcast_from_process(0, comm)
+
+def ibroadcast_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on specified rank and starts a nonblocking broadcast of the result.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should execute the function and broadcast result.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the broadcast result on all processes.
+
+    Notes
+    -----
+    Decorated function only runs on the specified process. The size of the pickled
+    result is broadcast with a nonblocking collective, and test() or wait() start
+    the payload transfer once it has arrived, so the call returns without waiting
+    for other processes.
+    """
+    rank = comm.Get_rank()
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            stage = stage_comm(comm)
+            nbytes = np.zeros(1, dtype=np.int64)
+            if rank == process_rank:
+                result = func(*args, **kwargs)
+                data = _dumps(result)
+                nbytes[0] = data.size
+            request = comm.Ibcast([nbytes, MPI.INT64_T], root=process_rank)
+
+            if rank == process_rank:
+                then = lambda: (stage.Ibcast([data, MPI.BYTE], root=process_rank), result)
+                return CommFuture(request, None, keep=(nbytes, data), then=then, stage=stage)
+            def then():
+                buff = build_buffer(int(nbytes[0]), np.uint8)
+                return stage.Ibcast([buff, MPI.BYTE], root=process_rank), buff
+            return CommFuture(request, None, _loads, keep=(nbytes,), then=then, stage=stage)
+        return wrapper
+    return decorator
+
+# Nonblocking object scatter decorators
+def iscatter_from_main(comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on rank 0 and starts a nonblocking scatter of the results.
+
+    Parameters
+    ----------
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a sequence of pickle-able objects with length equal to the number of processes.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the element of the sequence assigned to each process.
+
+    Notes
+    -----
+    Decorated function only runs on the main process. The pickled sizes are
+    scattered with a nonblocking collective, and test() or wait() start the
+    payload transfer once they have arrived, so the call returns without
+    waiting for other processes.
+    """
+    return iscatter_from_process(0, comm)
+
+def iscatter_from_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on specified rank and starts a nonblocking scatter of the results.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should execute the function and scatter results.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a sequence of pickle-able objects with length equal to the number of processes.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the element of the sequence assigned to each process.
+
+    Notes
+    -----
+    Decorated function only runs on the specified process. The pickled sizes are
+    scattered with a nonblocking collective, and test() or wait() start the
+    payload transfer once they have arrived, so the call returns without
+    waiting for other processes.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            data = counts = None
+            if rank == process_rank:
+                result = func(*args, **kwargs)
+                if len(result) != size:
+                    raise ValueError(f"Result length {len(result)} must equal number of processes {size}")
+                data, counts = _pack(result)
+            stage = stage_comm(comm)
+            nbytes = np.zeros(1, dtype=np.int64)
+            request = comm.Iscatter([counts, MPI.INT64_T], [nbytes, MPI.INT64_T], root=process_rank)
+
+            def then():
+                buff = build_buffer(int(nbytes[0]), np.uint8)
+                if rank == process_rank:
+                    send = [data, counts, _displacements(counts), MPI.BYTE]
+                else:
+                    send = None
+                return stage.Iscatterv(send, [buff, MPI.BYTE], root=process_rank), buff
+            return CommFuture(request, None, _loads, keep=(data, counts, nbytes), then=then, stage=stage)
+        return wrapper
+    return decorator
+
+# Nonblocking object gather decorators
+def igather_to_main(comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of the results to rank 0.
+
+    Parameters
+    ----------
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on rank 0, a list of results from all processes and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are gathered
+    with a nonblocking collective, and test() or wait() start the payload
+    transfer once they have arrived, so the call returns without waiting for
+    other processes.
+    """
+    return igather_to_process(0, comm)
+
+def igather_to_process(process_rank: int, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of the results to specified rank.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should receive gathered results.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on the specified rank, a list of results from all processes and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are gathered
+    with a nonblocking collective, and test() or wait() start the payload
+    transfer once they have arrived, so the call returns without waiting for
+    other processes.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            data = _dumps(result)
+
+            stage = stage_comm(comm)
+            nbytes = np.array([data.size], dtype=np.int64)
+            counts = build_buffer(size, np.int64) if rank == process_rank else None
+            request = comm.Igather([nbytes, MPI.INT64_T], [counts, MPI.INT64_T], root=process_rank)
+
+            if rank != process_rank:
+                then = lambda: (stage.Igatherv([data, MPI.BYTE], None, root=process_rank), None)
+                return CommFuture(request, None, keep=(data, nbytes), then=then, stage=stage)
+            def then():
+                buff = build_buffer(int(counts.sum()), np.uint8)
+                return stage.Igatherv([data, MPI.BYTE], [buff, counts, _displacements(counts), MPI.BYTE],
+                                      root=process_rank), buff
+            return CommFuture(request, None, lambda buff: _split_loads(buff, counts), keep=(data, nbytes, counts),
+                              then=then, stage=stage)
+        return wrapper
+    return decorator
+
+def igather_to_all(comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of the results to all processes.
+
+    Parameters
+    ----------
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns a list of results from all processes, available on all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are exchanged
+    with a nonblocking collective, and test() or wait() start the payload
+    transfer once they have arrived, so the call returns without waiting for
+    other processes.
+    """
+    size = comm.Get_size()
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            data = _dumps(result)
+
+            stage = stage_comm(comm)
+            nbytes = np.array([data.size], dtype=np.int64)
+            counts = build_buffer(size, np.int64)
+            request = comm.Iallgather([nbytes, MPI.INT64_T], [counts, MPI.INT64_T])
+
+            def then():
+                buff = build_buffer(int(counts.sum()), np.uint8)
+                return stage.Iallgatherv([data, MPI.BYTE], [buff, counts, _displacements(counts), MPI.BYTE]), buff
+            return CommFuture(request, None, lambda buff: _split_loads(buff, counts), keep=(data, nbytes, counts),
+                              then=then, stage=stage)
+        return wrapper
+    return decorator
+
+# Nonblocking object all to all decorator
+def iall_to_all(comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking all-to-all exchange of the results.
+
+    Parameters
+    ----------
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a sequence of pickle-able objects with length equal to the number of processes.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns a list of objects received from all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are exchanged
+    with a nonblocking collective, and test() or wait() start the payload
+    transfer once they have arrived, so the call returns without waiting for
+    other processes.
+    """
+    size = comm.Get_size()
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if len(result) != size:
+                raise ValueError(f"Result length {len(result)} must equal number of processes {size}")
+            data, send_counts = _pack(result)
+
+            stage = stage_comm(comm)
+            recv_counts = build_buffer(size, np.int64)
+            request = comm.Ialltoall([send_counts, MPI.INT64_T], [recv_counts, MPI.INT64_T])
+
+            def then():
+                buff = build_buffer(int(recv_counts.sum()), np.uint8)
+                return stage.Ialltoallv([data, send_counts, _displacements(send_counts), MPI.BYTE],
+                                        [buff, recv_counts, _displacements(recv_counts), MPI.BYTE]), buff
+            return CommFuture(request, None, lambda buff: _split_loads(buff, recv_counts),
+                              keep=(data, send_counts, recv_counts), then=then, stage=stage)
+        return wrapper
+    return decorator
+
+# Nonblocking buffered broadcast decorators
+def ibuffered_broadcast_from_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on rank 0 and starts a nonblocking broadcast of the result buffer.
+
+    Parameters
+    ----------
+    shape : int or tuple of ints
+        Shape of the data buffer to broadcast.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the broadcast data on all processes.
+
+    Notes
+    -----
+    Decorated function only runs on the main process.
+    """
+    return ibuffered_broadcast_from_process(0, shape, dtype, comm)
+
+def ibuffered_broadcast_from_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on specified rank and starts a nonblocking broadcast of the result buffer.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should execute the function and broadcast result.
+    shape : int or tuple of ints
+        Shape of the data buffer to broadcast.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the broadcast data on all processes.
+
+    Notes
+    -----
+    Decorated function only runs on the specified process.
+    """
+    rank = comm.Get_rank()
+    if isinstance(shape, int):
+        shape = (shape,)
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            buff = build_buffer(shape, dtype)
+
+            if rank == process_rank:
+                result = func(*args, **kwargs)
+                buff[:] = result
+
+            request = comm.Ibcast([buff, mpi_dtype], root=process_rank)
+            return CommFuture(request, buff)
+        return wrapper
+    return decorator
+
+# Nonblocking buffered scatter decorators
+def ibuffered_scatter_from_main(chunk_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on rank 0 and starts a nonblocking scatter of the result buffer.
+
+    Parameters
+    ----------
+    chunk_shape : int or tuple of ints
+        Shape of each chunk to be scattered to each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with shape (num_processes, *chunk_shape) and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the chunk assigned to each process.
+
+    Notes
+    -----
+    Decorated function only runs on the main process.
+    """
+    return ibuffered_scatter_from_process(0, chunk_shape, dtype, comm)
+
+def ibuffered_scatter_from_process(process_rank: int, chunk_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on specified rank and starts a nonblocking scatter of the result buffer.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should execute the function and scatter results.
+    chunk_shape : int or tuple of ints
+        Shape of each chunk to be scattered to each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with shape (num_processes, *chunk_shape) and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the chunk assigned to each process.
+
+    Notes
+    -----
+    Decorated function only runs on the specified process.
+    """
+    rank = comm.Get_rank()
+    if isinstance(chunk_shape, int):
+        chunk_shape = (chunk_shape,)
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            recv_buff = build_buffer(chunk_shape, dtype)
+
+            if rank == process_rank:
+                send_buff = func(*args, **kwargs)
+            else:
+                send_buff = None
+
+            request = comm.Iscatter(buffer_spec(send_buff, mpi_dtype, comm.Get_size()), [recv_buff, mpi_dtype], root=process_rank)
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+# Nonblocking buffered gather decorators
+def ibuffered_gather_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of the result buffers to rank 0.
+
+    Parameters
+    ----------
+    shape : int or tuple of ints
+        Shape of data from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on rank 0, a buffer of shape (num_processes, *shape) and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    return ibuffered_gather_to_process(0, shape, dtype, comm)
+
+def ibuffered_gather_to_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of the result buffers to specified rank.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should receive gathered results.
+    shape : int or tuple of ints
+        Shape of data from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on the specified rank, a buffer of shape (num_processes, *shape) and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if isinstance(shape, int):
+        shape = (shape,)
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = func(*args, **kwargs)
+
+            if rank == process_rank:
+                recv_buff = build_buffer((size,) + shape, dtype)
+            else:
+                recv_buff = None
+
+            request = comm.Igather(buffer_spec(send_buff, mpi_dtype), [recv_buff, mpi_dtype], root=process_rank)
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+def ibuffered_gather_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of the result buffers to all processes.
+
+    Parameters
+    ----------
+    shape : int or tuple of ints
+        Shape of data from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns a buffer of shape (num_processes, *shape) on all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    size = comm.Get_size()
+    if isinstance(shape, int):
+        shape = (shape,)
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = func(*args, **kwargs)
+            recv_buff = build_buffer((size,) + shape, dtype)
+
+            request = comm.Iallgather(buffer_spec(send_buff, mpi_dtype), [recv_buff, mpi_dtype])
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+# Nonblocking buffered all to all decorator
+def ibuffered_all_to_all(element_shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking all-to-all exchange of the result buffers.
+
+    Parameters
+    ----------
+    element_shape : int or tuple of ints
+        Shape of data element being sent to each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with shape (num_processes, *element_shape) and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns a buffer of shape (num_processes, *element_shape) with the data received from each process.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    size = comm.Get_size()
+    if isinstance(element_shape, int):
+        element_shape = (element_shape,)
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = func(*args, **kwargs)
+            recv_buff = build_buffer((size,) + element_shape, dtype)
+
+            request = comm.Ialltoall(buffer_spec(send_buff, mpi_dtype, size), [recv_buff, mpi_dtype])
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+# Nonblocking variable scatter decorators
+def ivariable_scatter_from_main(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on rank 0 and starts a nonblocking scatter of variable-sized results.
+
+    Parameters
+    ----------
+    counts : sequence of ints
+        Number of elements to send to each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a 1D numpy array with size sum(counts) and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the chunk assigned to each process based on counts array.
+
+    Notes
+    -----
+    Decorated function only runs on the main process.
+    """
+    return ivariable_scatter_from_process(0, counts, dtype, comm)
+
+def ivariable_scatter_from_process(process_rank: int, counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on specified rank and starts a nonblocking scatter of variable-sized results.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should execute the function and scatter results.
+    counts : sequence of ints
+        Number of elements to send to each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a 1D numpy array with size sum(counts) and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the chunk assigned to each process based on counts array.
+
+    Notes
+    -----
+    Decorated function only runs on the specified process.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    counts = list(counts)
+    if len(counts) != size:
+        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
+
+    # Calculate displacements
+    displs = _displacements(np.asarray(counts, dtype=np.int64))
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            recv_buff = build_buffer((counts[rank],), dtype)
+
+            if rank == process_rank:
+                send_buff = np.ascontiguousarray(func(*args, **kwargs))
+            else:
+                send_buff = None
+
+            request = comm.Iscatterv([send_buff, counts, displs, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+# Nonblocking variable gather decorators
+def ivariable_gather_to_main(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of variable-sized results to rank 0.
+
+    Parameters
+    ----------
+    counts : sequence of ints
+        Number of elements to receive from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a 1D numpy array with size counts[rank] and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on rank 0, a buffer containing the concatenated data from all processes and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    return ivariable_gather_to_process(0, counts, dtype, comm)
+
+def ivariable_gather_to_process(process_rank: int, counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of variable-sized results to specified rank.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should receive gathered results.
+    counts : sequence of ints
+        Number of elements to receive from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a 1D numpy array with size counts[rank] and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on the specified rank, a buffer containing the concatenated data from all processes and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    counts = list(counts)
+    if len(counts) != size:
+        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
+
+    # Calculate displacements
+    displs = _displacements(np.asarray(counts, dtype=np.int64))
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = func(*args, **kwargs)
+
+            if rank == process_rank:
+                recv_buff = build_buffer((sum(counts),), dtype)
+            else:
+                recv_buff = None
+
+            request = comm.Igatherv(buffer_spec(send_buff, mpi_dtype), [recv_buff, counts, displs, mpi_dtype], root=process_rank)
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+def ivariable_gather_to_all(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking gather of variable-sized results to all processes.
+
+    Parameters
+    ----------
+    counts : sequence of ints
+        Number of elements to receive from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a 1D numpy array with size counts[rank] and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns a buffer containing the concatenated data from all processes on all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    size = comm.Get_size()
+
+    counts = list(counts)
+    if len(counts) != size:
+        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
+
+    # Calculate displacements
+    displs = _displacements(np.asarray(counts, dtype=np.int64))
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = func(*args, **kwargs)
+            recv_buff = build_buffer((sum(counts),), dtype)
+
+            request = comm.Iallgatherv(buffer_spec(send_buff, mpi_dtype), [recv_buff, counts, displs, mpi_dtype])
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+# Nonblocking variable all to all decorator
+def ivariable_all_to_all(send_counts: Sequence[int], recv_counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking exchange of variable-sized results between all processes.
+
+    Parameters
+    ----------
+    send_counts : sequence of ints
+        Number of elements to send to each process.
+    recv_counts : sequence of ints
+        Number of elements to receive from each process.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a 1D numpy array with size sum(send_counts) and the specified dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns a buffer containing the data received from all processes based on recv_counts array.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    size = comm.Get_size()
+
+    send_counts = list(send_counts)
+    recv_counts = list(recv_counts)
+
+    if len(send_counts) != size:
+        raise ValueError(f"send_counts length {len(send_counts)} must equal number of processes {size}")
+    if len(recv_counts) != size:
+        raise ValueError(f"recv_counts length {len(recv_counts)} must equal number of processes {size}")
+
+    # Calculate displacements
+    send_displs = _displacements(np.asarray(send_counts, dtype=np.int64))
+    recv_displs = _displacements(np.asarray(recv_counts, dtype=np.int64))
+
+    mpi_dtype = to_mpi_dtype(dtype)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = np.ascontiguousarray(func(*args, **kwargs))
+            recv_buff = build_buffer((sum(recv_counts),), dtype)
+
+            request = comm.Ialltoallv([send_buff, send_counts, send_displs, mpi_dtype],
+                                      [recv_buff, recv_counts, recv_displs, mpi_dtype])
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
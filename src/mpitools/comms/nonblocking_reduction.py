@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD, Op
+from collections.abc import Callable
+from functools import reduce, wraps
+from typing import Tuple
+from mpitools.comms.utils import reduction_dtype, reduction_op, build_buffer, to_mpi_op
+from mpitools.comms.futures import CommFuture, stage_comm
+from mpitools.comms.nonblocking_collective import _dumps, _displacements, _split_loads
+
+# Nonblocking object reduce decorators
+def ireduce_to_main(op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking reduction of the results to rank 0.
+
+    Parameters
+    ----------
+    op : str or MPI.Op, optional
+        Reduction operation to apply. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min', 'land', 'band', 'lor', 'bor',
+        'lxor', 'bxor', 'maxloc', 'minloc'.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return data compatible with the specified reduction operation.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on rank 0, the reduced result from all processes and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are gathered
+    with a nonblocking collective, test() or wait() then start a nonblocking
+    Igatherv of the pickled results, and wait() combines them in rank order.
+    The call returns without waiting for other processes.
+    """
+    return ireduce_to_process(0, op, comm)
+
+def ireduce_to_process(process_rank: int, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking reduction of the results to specified rank.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should receive the reduced result.
+    op : str or MPI.Op, optional
+        Reduction operation to apply. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min', 'land', 'band', 'lor', 'bor',
+        'lxor', 'bxor', 'maxloc', 'minloc'.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return data compatible with the specified reduction operation.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on the specified rank, the reduced result from all processes and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are gathered
+    with a nonblocking collective, test() or wait() then start a nonblocking
+    Igatherv of the pickled results, and wait() combines them in rank order.
+    The call returns without waiting for other processes.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    op = to_mpi_op(op)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            data = _dumps(result)
+
+            stage = stage_comm(comm)
+            nbytes = np.array([data.size], dtype=np.int64)
+            counts = build_buffer(size, np.int64) if rank == process_rank else None
+            request = comm.Igather([nbytes, MPI.INT64_T], [counts, MPI.INT64_T], root=process_rank)
+
+            if rank != process_rank:
+                then = lambda: (stage.Igatherv([data, MPI.BYTE], None, root=process_rank), None)
+                return CommFuture(request, None, keep=(data, nbytes), then=then, stage=stage)
+            def then():
+                buff = build_buffer(int(counts.sum()), np.uint8)
+                return stage.Igatherv([data, MPI.BYTE], [buff, counts, _displacements(counts), MPI.BYTE],
+                                      root=process_rank), buff
+            return CommFuture(request, None, lambda buff: reduce(op, _split_loads(buff, counts)),
+                              keep=(data, nbytes, counts), then=then, stage=stage)
+        return wrapper
+    return decorator
+
+def ireduce_to_all(op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking reduction of the results to all processes.
+
+    Parameters
+    ----------
+    op : str or MPI.Op, optional
+        Reduction operation to apply. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min', 'land', 'band', 'lor', 'bor',
+        'lxor', 'bxor', 'maxloc', 'minloc'.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return data compatible with the specified reduction operation.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the reduced result from all processes, available on all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The pickled sizes are exchanged
+    with a nonblocking collective, test() or wait() then start a nonblocking
+    Iallgatherv of the pickled results, and wait() combines them in rank order.
+    The call returns without waiting for other processes. For NumPy arrays of a
+    known shape, ibuffered_reduce_to_all reduces inside MPI instead.
+    """
+    size = comm.Get_size()
+    op = to_mpi_op(op)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            data = _dumps(result)
+
+            stage = stage_comm(comm)
+            nbytes = np.array([data.size], dtype=np.int64)
+            counts = build_buffer(size, np.int64)
+            request = comm.Iallgather([nbytes, MPI.INT64_T], [counts, MPI.INT64_T])
+
+            def then():
+                buff = build_buffer(int(counts.sum()), np.uint8)
+                return stage.Iallgatherv([data, MPI.BYTE], [buff, counts, _displacements(counts), MPI.BYTE]), buff
+            return CommFuture(request, None, lambda buff: reduce(op, _split_loads(buff, counts)),
+                              keep=(data, nbytes, counts), then=then, stage=stage)
+        return wrapper
+    return decorator
+
+# Nonblocking buffered reduce decorators
+def ibuffered_reduce_to_main(shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking reduction of the result buffers to rank 0.
+
+    Parameters
+    ----------
+    shape : int or tuple of ints
+        Shape of the data buffer for reduction.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    op : str or MPI.Op, optional
+        Reduction operation to apply. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min', 'land', 'band', 'lor', 'bor',
+        'lxor', 'bxor', 'maxloc', 'minloc'.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on rank 0, the buffer containing the reduced result and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    return ibuffered_reduce_to_process(0, shape, dtype, op, comm)
+
+def ibuffered_reduce_to_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking reduction of the result buffers to specified rank.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that should receive the reduced result.
+    shape : int or tuple of ints
+        Shape of the data buffer for reduction.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    op : str or MPI.Op, optional
+        Reduction operation to apply. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min', 'land', 'band', 'lor', 'bor',
+        'lxor', 'bxor', 'maxloc', 'minloc'.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns, on the specified rank, the buffer containing the reduced result and None on other ranks.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    rank = comm.Get_rank()
+    if isinstance(shape, int):
+        shape = (shape,)
+
+    op = reduction_op(to_mpi_op(op), dtype)
+
+    mpi_dtype = reduction_dtype(op, dtype, shape)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = np.ascontiguousarray(func(*args, **kwargs))
+
+            if rank == process_rank:
+                recv_buff = build_buffer(shape, dtype)
+            else:
+                recv_buff = None
+
+            request = comm.Ireduce([send_buff, mpi_dtype], [recv_buff, mpi_dtype], op=op, root=process_rank)
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
+
+def ibuffered_reduce_to_all(shape: int | Tuple[int, ...], dtype: np.dtype, op: str | Op = 'sum', comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and starts a nonblocking reduction of the result buffers to all processes.
+
+    Parameters
+    ----------
+    shape : int or tuple of ints
+        Shape of the data buffer for reduction.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    op : str or MPI.Op, optional
+        Reduction operation to apply. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min', 'land', 'band', 'lor', 'bor',
+        'lxor', 'bxor', 'maxloc', 'minloc'.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    CommFuture whose wait() returns the buffer containing the reduced result on all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    if isinstance(shape, int):
+        shape = (shape,)
+
+    op = reduction_op(to_mpi_op(op), dtype)
+
+    mpi_dtype = reduction_dtype(op, dtype, shape)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            send_buff = np.ascontiguousarray(func(*args, **kwargs))
+            recv_buff = build_buffer(shape, dtype)
+
+            request = comm.Iallreduce([send_buff, mpi_dtype], [recv_buff, mpi_dtype], op=op)
+            return CommFuture(request, recv_buff, keep=(send_buff,))
+        return wrapper
+    return decorator
@@ -0,0 +1,432 @@
+import hashlib
+import pickle
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm
+from typing import Any, List, Optional, Sequence, Tuple
+from mpitools.comms.compression import Compression
+
+# Receive blocks are aligned so the returned arrays are aligned for any dtype
+_ALIGNMENT = 64
+
+_transport_comms = {}
+
+class _ArrayHeader:
+    """Shape and dtype of an array that follows as raw bytes"""
+    __slots__ = ('shape', 'dtype')
+
+    def __init__(self, shape: Tuple[int, ...], dtype: np.dtype):
+        self.shape = shape
+        self.dtype = dtype
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * self.dtype.itemsize
+
+
+class LayoutCache:
+    """
+    Layouts negotiated by one decorator. The layout of every rank is only
+    exchanged again when one of them changes.
+    """
+
+    def __init__(self):
+        self.codes = None  # per-rank layout codes of the cached layouts
+        self.layouts = None  # per-rank _ArrayHeader
+
+
+def is_buffer_array(obj: Any) -> bool:
+    """
+    Whether obj can be sent as raw bytes. Subclasses such as masked arrays
+    and recarrays go through pickle, which keeps their extra state.
+    """
+    return type(obj) is np.ndarray and not obj.dtype.hasobject
+
+
+def _as_bytes(array: np.ndarray) -> np.ndarray:
+    """Contiguous uint8 view of an array"""
+    return np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+
+
+def _layout_code(header: Optional[_ArrayHeader]) -> int:
+    """Deterministic 63-bit code of a layout, identical on every process"""
+    if header is None:
+        return 0
+    digest = hashlib.blake2b(repr((header.shape, header.dtype.str)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') >> 1 | 1
+
+
+def _aligned_displacements(counts: Sequence[int]) -> np.ndarray:
+    """Displacements of consecutive blocks, each starting on an aligned offset"""
+    padded = (np.asarray(counts, dtype=np.int64) + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+    displs = np.zeros(len(padded), dtype=np.int64)
+    np.cumsum(padded[:-1], out=displs[1:])
+    return displs
+
+
+def _unpack(buff: np.ndarray, headers: Sequence[_ArrayHeader], displs: Sequence[int]) -> List[np.ndarray]:
+    """Views of the arrays stored in a receive buffer"""
+    return [buff[d:d + h.nbytes].view(h.dtype).reshape(h.shape) for h, d in zip(headers, displs)]
+
+
+def _transport_comm(comm: Comm) -> Comm:
+    """
+    Private duplicate of comm for the point-to-point messages of the transport,
+    so they never match user messages. Created on first use, which is collective.
+    """
+    key = comm.py2f()
+    if key not in _transport_comms:
+        _transport_comms[key] = comm.Dup()
+    return _transport_comms[key]
+
+
+def _dumps_oob(obj: Any) -> Tuple[bytes, List[memoryview]]:
+    """Pickle with protocol 5, keeping contiguous buffers (e.g. array data) out of band"""
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return data, [buffer.raw() for buffer in buffers]
+
+
+def _loads_oob(data: bytes, buffers: Sequence[Any]) -> Any:
+    """Unpickle with the out-of-band buffers, which arrays reference without copying"""
+    return pickle.loads(data, buffers=buffers)
+
+
+def _copy_oob(data: bytes, buffers: Sequence[memoryview]) -> Any:
+    """Unpickle a local object into fresh memory, like a pickled round trip would"""
+    return _loads_oob(data, [bytearray(buffer) for buffer in buffers])
+
+
+def _recv_buffers(comm: Comm, sizes: Sequence[int], source: int, requests: List[MPI.Request]) -> List[np.ndarray]:
+    """Post receives for the out-of-band buffers sent by source"""
+    buffers = [np.empty(n, dtype=np.uint8) for n in sizes]
+    requests.extend(comm.Irecv([buffer, MPI.BYTE], source=source, tag=i) for i, buffer in enumerate(buffers))
+    return buffers
+
+
+def _send_buffers(comm: Comm, buffers: Sequence[memoryview], dest: int, requests: List[MPI.Request]):
+    """Send out-of-band buffers to dest, one message per buffer"""
+    requests.extend(comm.Isend([buffer, MPI.BYTE], dest=dest, tag=i) for i, buffer in enumerate(buffers))
+
+
+def negotiate(comm: Comm, local: Optional[_ArrayHeader], cache: LayoutCache) -> Optional[List[_ArrayHeader]]:
+    """
+    Exchange the layouts of the local results (collective).
+
+    Every rank contributes a fixed-size code of its layout with one small Allgather.
+    Returns the layout of every rank, or None when any rank's result is not an
+    array. Layouts are only sent in full when the codes differ from the cached ones.
+    """
+    codes = np.empty(comm.Get_size(), dtype=np.int64)
+    comm.Allgather([np.array([_layout_code(local)], dtype=np.int64), MPI.INT64_T], [codes, MPI.INT64_T])
+    if not codes.all():
+        return None
+    if cache.codes is None or not np.array_equal(codes, cache.codes):
+        cache.layouts = comm.allgather(local)
+        cache.codes = codes
+    return cache.layouts
+
+
+def bcast_object(comm: Comm, obj: Any, root: int, oob: bool = False,
+                 compression: Optional[Compression] = None) -> Any:
+    """Broadcast an object, sending arrays as raw bytes after a pickled header"""
+    if compression is not None:
+        return _bcast_compressed(comm, obj, root, compression)
+    if oob:
+        return _bcast_oob(comm, obj, root)
+    rank = comm.Get_rank()
+    header = _ArrayHeader(obj.shape, obj.dtype) if rank == root and is_buffer_array(obj) else obj
+    header = comm.bcast(header, root=root)
+    if not isinstance(header, _ArrayHeader):
+        return header
+
+    if rank == root:
+        comm.Bcast([_as_bytes(obj), MPI.BYTE], root=root)
+        return obj
+    buff = np.empty(header.nbytes, dtype=np.uint8)
+    comm.Bcast([buff, MPI.BYTE], root=root)
+    return _unpack(buff, [header], [0])[0]
+
+
+def scatter_object(comm: Comm, objs: Any, root: int, oob: bool = False,
+                   compression: Optional[Compression] = None) -> Any:
+    """Scatter a sequence, sending the rows of an array as raw bytes after a pickled header"""
+    if compression is not None:
+        return _scatter_compressed(comm, objs, root, compression)
+    if oob:
+        return _scatter_oob(comm, objs, root)
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    send = objs
+    if rank == root and is_buffer_array(objs) and objs.ndim > 0 and objs.shape[0] == size:
+        send = [_ArrayHeader(objs.shape[1:], objs.dtype)] * size
+    header = comm.scatter(send, root=root)
+    if not isinstance(header, _ArrayHeader):
+        return header
+
+    buff = np.empty(header.nbytes, dtype=np.uint8)
+    comm.Scatter([_as_bytes(objs) if rank == root else None, MPI.BYTE], [buff, MPI.BYTE], root=root)
+    return _unpack(buff, [header], [0])[0]
+
+
+def gather_object(comm: Comm, obj: Any, root: int, cache: LayoutCache, oob: bool = False,
+                  compression: Optional[Compression] = None) -> Optional[List[Any]]:
+    """Gather objects to root, with Gatherv of raw bytes when every rank returns an array"""
+    if compression is not None:
+        return _gather_compressed(comm, obj, root, compression)
+    if oob:
+        return _gather_oob(comm, obj, root)
+    local = _ArrayHeader(obj.shape, obj.dtype) if is_buffer_array(obj) else None
+    headers = negotiate(comm, local, cache)
+    if headers is None:
+        return comm.gather(obj, root=root)
+
+    if comm.Get_rank() != root:
+        comm.Gatherv([_as_bytes(obj), MPI.BYTE], None, root=root)
+        return None
+    counts = [h.nbytes for h in headers]
+    displs = _aligned_displacements(counts)
+    buff = np.empty(int(displs[-1]) + counts[-1], dtype=np.uint8)
+    comm.Gatherv([_as_bytes(obj), MPI.BYTE], [buff, counts, displs, MPI.BYTE], root=root)
+    return _unpack(buff, headers, displs)
+
+
+def allgather_object(comm: Comm, obj: Any, cache: LayoutCache, oob: bool = False,
+                     compression: Optional[Compression] = None) -> List[Any]:
+    """Gather objects to all ranks, with Allgatherv of raw bytes when every rank returns an array"""
+    if compression is not None:
+        return _gather_compressed(comm, obj, None, compression)
+    if oob:
+        return _allgather_oob(comm, obj)
+    local = _ArrayHeader(obj.shape, obj.dtype) if is_buffer_array(obj) else None
+    headers = negotiate(comm, local, cache)
+    if headers is None:
+        return comm.allgather(obj)
+
+    counts = [h.nbytes for h in headers]
+    displs = _aligned_displacements(counts)
+    buff = np.empty(int(displs[-1]) + counts[-1], dtype=np.uint8)
+    comm.Allgatherv([_as_bytes(obj), MPI.BYTE], [buff, counts, displs, MPI.BYTE])
+    return _unpack(buff, headers, displs)
+
+
+def alltoall_object(comm: Comm, objs: Any, cache: LayoutCache, oob: bool = False,
+                    compression: Optional[Compression] = None) -> List[Any]:
+    """
+    Exchange sequences between all ranks, with Alltoallv of raw bytes when every
+    rank returns an array with one row per rank
+    """
+    if compression is not None:
+        return _alltoall_compressed(comm, objs, compression)
+    if oob:
+        return _alltoall_oob(comm, objs)
+    size = comm.Get_size()
+    local = None
+    if is_buffer_array(objs) and objs.ndim > 0 and objs.shape[0] == size:
+        local = _ArrayHeader(objs.shape[1:], objs.dtype)
+    headers = negotiate(comm, local, cache)
+    if headers is None:
+        return comm.alltoall(objs)
+
+    send_counts = [local.nbytes] * size
+    send_displs = [i * local.nbytes for i in range(size)]
+    recv_counts = [h.nbytes for h in headers]
+    recv_displs = _aligned_displacements(recv_counts)
+    buff = np.empty(int(recv_displs[-1]) + recv_counts[-1], dtype=np.uint8)
+    comm.Alltoallv([_as_bytes(objs), send_counts, send_displs, MPI.BYTE],
+                   [buff, recv_counts, recv_displs, MPI.BYTE])
+    return _unpack(buff, headers, recv_displs)
+
+
+# Pickle protocol 5 transport: the pickle stream travels through the lowercase
+# collective, the out-of-band buffers it references follow as raw messages and
+# the receivers unpickle straight from the receive buffers.
+def _bcast_oob(comm: Comm, obj: Any, root: int) -> Any:
+    if comm.Get_rank() == root:
+        data, buffers = _dumps_oob(obj)
+        comm.bcast((data, [buffer.nbytes for buffer in buffers]), root=root)
+    else:
+        data, sizes = comm.bcast(None, root=root)
+        buffers = [np.empty(n, dtype=np.uint8) for n in sizes]
+    for buffer in buffers:
+        comm.Bcast([buffer, MPI.BYTE], root=root)
+    return obj if comm.Get_rank() == root else _loads_oob(data, buffers)
+
+
+def _scatter_oob(comm: Comm, objs: Any, root: int) -> Any:
+    rank = comm.Get_rank()
+    p2p = _transport_comm(comm)
+    requests = []
+    if rank == root:
+        if len(objs) != comm.Get_size():
+            raise ValueError(f"Result length {len(objs)} must equal number of processes {comm.Get_size()}")
+        pickled = [_dumps_oob(obj) for obj in objs]
+        comm.scatter([(data, [b.nbytes for b in buffers]) for data, buffers in pickled], root=root)
+        for dest, (_, buffers) in enumerate(pickled):
+            if dest != root:
+                _send_buffers(p2p, buffers, dest, requests)
+        MPI.Request.Waitall(requests)
+        return _copy_oob(*pickled[root])
+
+    data, sizes = comm.scatter(None, root=root)
+    buffers = _recv_buffers(p2p, sizes, root, requests)
+    MPI.Request.Waitall(requests)
+    return _loads_oob(data, buffers)
+
+
+def _gather_oob(comm: Comm, obj: Any, root: int) -> Optional[List[Any]]:
+    rank = comm.Get_rank()
+    p2p = _transport_comm(comm)
+    data, buffers = _dumps_oob(obj)
+    headers = comm.gather((data, [buffer.nbytes for buffer in buffers]), root=root)
+    requests = []
+    if rank != root:
+        _send_buffers(p2p, buffers, root, requests)
+        MPI.Request.Waitall(requests)
+        return None
+
+    received = [None if source == root else _recv_buffers(p2p, sizes, source, requests)
+                for source, (_, sizes) in enumerate(headers)]
+    MPI.Request.Waitall(requests)
+    return [_copy_oob(data, buffers) if source == root else _loads_oob(headers[source][0], received[source])
+            for source in range(len(headers))]
+
+
+def _allgather_oob(comm: Comm, obj: Any) -> List[Any]:
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    p2p = _transport_comm(comm)
+    data, buffers = _dumps_oob(obj)
+    headers = comm.allgather((data, [buffer.nbytes for buffer in buffers]))
+    requests = []
+    received = [None if source == rank else _recv_buffers(p2p, sizes, source, requests)
+                for source, (_, sizes) in enumerate(headers)]
+    for dest in range(size):
+        if dest != rank:
+            _send_buffers(p2p, buffers, dest, requests)
+    MPI.Request.Waitall(requests)
+    return [_copy_oob(data, buffers) if source == rank else _loads_oob(headers[source][0], received[source])
+            for source in range(size)]
+
+
+def _alltoall_oob(comm: Comm, objs: Any) -> List[Any]:
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if len(objs) != size:
+        raise ValueError(f"Result length {len(objs)} must equal number of processes {size}")
+    p2p = _transport_comm(comm)
+    pickled = [_dumps_oob(obj) for obj in objs]
+    headers = comm.alltoall([(data, [b.nbytes for b in buffers]) for data, buffers in pickled])
+    requests = []
+    received = [None if source == rank else _recv_buffers(p2p, sizes, source, requests)
+                for source, (_, sizes) in enumerate(headers)]
+    for dest, (_, buffers) in enumerate(pickled):
+        if dest != rank:
+            _send_buffers(p2p, buffers, dest, requests)
+    MPI.Request.Waitall(requests)
+    return [_copy_oob(*pickled[rank]) if source == rank else _loads_oob(headers[source][0], received[source])
+            for source in range(size)]
+
+
+# Compressed transport: every object is pickled (arrays included), framed by the
+# codec and exchanged as raw bytes after the frame sizes. Each sender decides on
+# its own whether to compress, since frames record how they were encoded.
+def _encode(compression: Compression, obj: Any, comm: Comm) -> np.ndarray:
+    return compression.encode(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL), comm)
+
+
+def _decode(compression: Compression, frame: np.ndarray) -> Any:
+    return pickle.loads(compression.decode(frame))
+
+
+def _copy(obj: Any) -> Any:
+    """Pickled round trip of a local object, which the caller gets instead of decoding its own frame"""
+    return pickle.loads(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _frames(compression: Compression, buff: np.ndarray, counts: np.ndarray, displs: np.ndarray,
+            skip: int, local: Any) -> List[Any]:
+    """Decode consecutive frames, using a copy of the local object for the caller's own block"""
+    return [_copy(local) if i == skip else _decode(compression, buff[d:d + c])
+            for i, (d, c) in enumerate(zip(displs, counts))]
+
+
+def _packed_displacements(counts: np.ndarray) -> np.ndarray:
+    displs = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=displs[1:])
+    return displs
+
+
+def _bcast_compressed(comm: Comm, obj: Any, root: int, compression: Compression) -> Any:
+    compression.prepare(comm)
+    if comm.Get_rank() == root:
+        frame = _encode(compression, obj, comm)
+        comm.bcast(frame.size, root=root)
+        comm.Bcast([frame, MPI.BYTE], root=root)
+        return obj
+    frame = np.empty(comm.bcast(None, root=root), dtype=np.uint8)
+    comm.Bcast([frame, MPI.BYTE], root=root)
+    return _decode(compression, frame)
+
+
+def _scatter_compressed(comm: Comm, objs: Any, root: int, compression: Compression) -> Any:
+    compression.prepare(comm)
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if rank != root:
+        frame = np.empty(comm.scatter(None, root=root), dtype=np.uint8)
+        comm.Scatterv(None, [frame, MPI.BYTE], root=root)
+        return _decode(compression, frame)
+
+    if len(objs) != size:
+        raise ValueError(f"Result length {len(objs)} must equal number of processes {size}")
+    frames = [np.zeros(0, dtype=np.uint8) if dest == root else _encode(compression, obj, comm)
+              for dest, obj in enumerate(objs)]
+    counts = np.array([frame.size for frame in frames], dtype=np.int64)
+    comm.scatter(counts.tolist(), root=root)
+    comm.Scatterv([np.concatenate(frames), counts, _packed_displacements(counts), MPI.BYTE],
+                  [np.zeros(0, dtype=np.uint8), MPI.BYTE], root=root)
+    return _copy(objs[root])
+
+
+def _gather_compressed(comm: Comm, obj: Any, root: Optional[int], compression: Compression) -> Optional[List[Any]]:
+    """Gather to root, or to all ranks when root is None"""
+    compression.prepare(comm)
+    rank = comm.Get_rank()
+    frame = _encode(compression, obj, comm)
+    if root is None:
+        counts = np.empty(comm.Get_size(), dtype=np.int64)
+        comm.Allgather([np.array([frame.size], dtype=np.int64), MPI.INT64_T], [counts, MPI.INT64_T])
+    else:
+        counts = comm.gather(frame.size, root=root)
+        if rank != root:
+            comm.Gatherv([frame, MPI.BYTE], None, root=root)
+            return None
+        counts = np.array(counts, dtype=np.int64)
+
+    displs = _packed_displacements(counts)
+    buff = np.empty(int(counts.sum()), dtype=np.uint8)
+    if root is None:
+        comm.Allgatherv([frame, MPI.BYTE], [buff, counts, displs, MPI.BYTE])
+    else:
+        comm.Gatherv([frame, MPI.BYTE], [buff, counts, displs, MPI.BYTE], root=root)
+    return _frames(compression, buff, counts, displs, rank, obj)
+
+
+def _alltoall_compressed(comm: Comm, objs: Any, compression: Compression) -> List[Any]:
+    compression.prepare(comm)
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    if len(objs) != size:
+        raise ValueError(f"Result length {len(objs)} must equal number of processes {size}")
+    frames = [np.zeros(0, dtype=np.uint8) if dest == rank else _encode(compression, obj, comm)
+              for dest, obj in enumerate(objs)]
+    send_counts = np.array([frame.size for frame in frames], dtype=np.int64)
+    recv_counts = np.empty(size, dtype=np.int64)
+    comm.Alltoall([send_counts, MPI.INT64_T], [recv_counts, MPI.INT64_T])
+
+    recv_displs = _packed_displacements(recv_counts)
+    buff = np.empty(int(recv_counts.sum()), dtype=np.uint8)
+    comm.Alltoallv([np.concatenate(frames), send_counts, _packed_displacements(send_counts), MPI.BYTE],
+                   [buff, recv_counts, recv_displs, MPI.BYTE])
+    return _frames(compression, buff, recv_counts, recv_displs, rank, objs[rank])
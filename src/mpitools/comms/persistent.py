@@ -0,0 +1,64 @@
+import atexit
+import weakref
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm
+from typing import Optional
+
+_live = weakref.WeakSet()  # collectives currently holding a persistent request
+
+class PersistentCollective:
+    """
+    One collective of a decorated function, run over the same buffers on every call.
+
+    The first call creates an MPI-4 persistent request with the ``<name>_init``
+    method of the communicator (e.g. Allreduce_init); later calls only Start and
+    Wait it. When the MPI library predates MPI-4, every call runs the blocking
+    collective instead. Results are only valid until the next call.
+
+    The request is released by free(), exposed as close() on the decorated
+    function, and otherwise at interpreter exit before MPI is finalized.
+    """
+
+    def __init__(self, comm: Comm, name: str):
+        self.comm = comm
+        self.name = name
+        self.request = MPI.REQUEST_NULL
+        self.supported = True
+        self._send = None
+
+    def stage(self, result: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Copy a result into the fixed send buffer the request was created with."""
+        if result is None:
+            return None
+        if self._send is None:
+            self._send = np.empty_like(result, order='C')
+        self._send[...] = result
+        return self._send
+
+    def run(self, *args, **kwargs):
+        """Run the collective; the buffers must be the same on every call."""
+        if self.request == MPI.REQUEST_NULL and self.supported:
+            try:
+                self.request = getattr(self.comm, f'{self.name}_init')(*args, **kwargs)
+                _live.add(self)
+            except NotImplementedError:
+                self.supported = False
+        if self.request != MPI.REQUEST_NULL:
+            self.request.Start()
+            self.request.Wait()
+        else:
+            getattr(self.comm, self.name)(*args, **kwargs)
+
+    def free(self):
+        """Release the persistent request; a later call sets it up again."""
+        if self.request != MPI.REQUEST_NULL:
+            self.request.Free()
+        _live.discard(self)
+
+# Persistent requests must be released before MPI is finalized
+@atexit.register
+def _free_all():
+    if MPI.Is_initialized() and not MPI.Is_finalized():
+        for collective in list(_live):
+            collective.free()
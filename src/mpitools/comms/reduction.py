@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from mpi4py.MPI import Comm, COMM_WORLD, Op
 from collections.abc import Callable
 from functools import wraps
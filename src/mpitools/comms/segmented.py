@@ -0,0 +1,199 @@
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm
+from typing import List, Optional, Sequence, Tuple
+from mpitools.comms.views import buffer_spec
+
+# Messages larger than this many bytes are split into segments of this size
+DEFAULT_SEGMENT_SIZE = 256 * 1024**2
+
+# Number of segment collectives kept in flight at once
+PIPELINE_DEPTH = 4
+
+def segment_bytes(segment_size: Optional[int]) -> int:
+    """Segment size in bytes, limited so every segment count fits in a C int."""
+    if segment_size is None:
+        segment_size = DEFAULT_SEGMENT_SIZE
+    if segment_size <= 0:
+        raise ValueError(f"segment_size must be positive, got {segment_size}")
+    return min(int(segment_size), 2**31 - 1)
+
+def as_bytes(array: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Flat uint8 view of a contiguous array."""
+    if array is None:
+        return None
+    return np.ascontiguousarray(array).reshape(-1).view(np.uint8)
+
+def _windows(n: int, segment: int) -> List[Tuple[int, int]]:
+    return [(a, min(a + segment, n)) for a in range(0, n, segment)]
+
+class _Pipeline:
+    """Keeps at most PIPELINE_DEPTH segment collectives in flight."""
+
+    def __init__(self):
+        self.inflight = []  # (request, on_complete, buffers kept alive until completion)
+
+    def add(self, request: MPI.Request, on_complete=None, keep=None):
+        if len(self.inflight) == PIPELINE_DEPTH:
+            self._complete(0)
+        self.inflight.append((request, on_complete, keep))
+
+    def finish(self):
+        while self.inflight:
+            self._complete(0)
+
+    def _complete(self, i: int):
+        request, on_complete, _ = self.inflight.pop(i)
+        request.Wait()
+        if on_complete is not None:
+            on_complete()
+
+# Fixed-size blocks: every rank owns a block of the same number of bytes
+def pipelined_bcast(comm: Comm, buff: np.ndarray, mpi_dtype: MPI.Datatype, root: int, segment_size: int):
+    """
+    Broadcast an array as pipelined segment Ibcasts of consecutive rows (of
+    elements for 1-D arrays). The root may send from a strided view. Rows
+    larger than a segment are split into byte segments instead, for which a
+    strided root view is copied first.
+    """
+    if buff.ndim == 0:
+        buff = buff.reshape(1)
+    row_bytes = max(1, buff[:1].nbytes)
+    pipeline = _Pipeline()
+    if row_bytes > segment_size:
+        # Receive buffers are contiguous, so only the root may get a copy here
+        data = as_bytes(buff)
+        for a, b in _windows(len(data), segment_size):
+            pipeline.add(comm.Ibcast([data[a:b], MPI.BYTE], root=root))
+        pipeline.finish()
+        return
+    for a, b in _windows(len(buff), segment_size // row_bytes):
+        spec = buffer_spec(buff[a:b], mpi_dtype)
+        pipeline.add(comm.Ibcast(spec, root=root), keep=spec)
+    pipeline.finish()
+
+def pipelined_blocks(comm: Comm, kind: str, send: Optional[np.ndarray], recv: Optional[np.ndarray],
+                     block: int, segment_size: int, root: int = 0):
+    """
+    Run a scatter, gather, allgather or alltoall of fixed-size byte blocks as
+    pipelined segment collectives.
+
+    Segment k moves bytes [a, b) of every block. The per-rank side of the segment
+    is described by a contiguous datatype of b - a bytes resized to an extent of
+    one block, so no staging copies are needed.
+    """
+    rank = comm.Get_rank()
+    pipeline = _Pipeline()
+    types = {}  # segment width -> committed datatype, all windows but the last share one
+    for a, b in _windows(block, segment_size):
+        if b - a not in types:
+            types[b - a] = _block_type(b - a, block)
+        strided = types[b - a]
+        if kind == 'scatter':
+            send_spec = [send[a:], 1, strided] if rank == root else None
+            request = comm.Iscatter(send_spec, [recv[a:b], MPI.BYTE], root=root)
+        elif kind == 'gather':
+            recv_spec = [recv[a:], 1, strided] if rank == root else None
+            request = comm.Igather([send[a:b], MPI.BYTE], recv_spec, root=root)
+        elif kind == 'allgather':
+            request = comm.Iallgather([send[a:b], MPI.BYTE], [recv[a:], 1, strided])
+        elif kind == 'alltoall':
+            request = comm.Ialltoall([send[a:], 1, strided], [recv[a:], 1, strided])
+        else:
+            raise ValueError(f"Unknown collective: {kind}")
+        pipeline.add(request)
+    pipeline.finish()
+    for strided in types.values():
+        strided.Free()
+
+# Helper function to describe width bytes at the start of each block
+def _block_type(width: int, block: int) -> MPI.Datatype:
+    contiguous = MPI.BYTE.Create_contiguous(width)
+    strided = contiguous.Create_resized(0, block).Commit()
+    contiguous.Free()
+    return strided
+
+# Variable-size blocks: segments are staged so counts and displacements stay small
+def _chunk_counts(counts: np.ndarray, offset: int, chunk: int) -> np.ndarray:
+    return np.clip(counts - offset, 0, chunk)
+
+def _displs(counts: np.ndarray) -> np.ndarray:
+    displs = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=displs[1:])
+    return displs
+
+def _variable_windows(counts: np.ndarray, segment_size: int) -> Tuple[int, List[int]]:
+    """Per-rank chunk so one staged segment holds at most segment_size bytes, and the window offsets."""
+    chunk = max(1, segment_size // len(counts))
+    return chunk, list(range(0, int(counts.max(initial=0)), chunk))
+
+def segmented_scatterv(comm: Comm, send: Optional[np.ndarray], counts: Sequence[int], displs: Sequence[int],
+                       recv: np.ndarray, segment_size: int, root: int = 0):
+    """Scatterv of byte blocks as pipelined segments staged through a packed buffer on the root."""
+    rank = comm.Get_rank()
+    counts = np.asarray(counts, dtype=np.int64)
+    displs = np.asarray(displs, dtype=np.int64)
+    chunk, offsets = _variable_windows(counts, segment_size)
+    pipeline = _Pipeline()
+    for a in offsets:
+        c = _chunk_counts(counts, a, chunk)
+        send_spec = None
+        if rank == root:
+            staging = np.concatenate([send[d + a:d + a + n] for d, n in zip(displs, c)])
+            send_spec = [staging, c, _displs(c), MPI.BYTE]
+        pipeline.add(comm.Iscatterv(send_spec, [recv[a:a + c[rank]], MPI.BYTE], root=root), keep=send_spec)
+    pipeline.finish()
+
+def segmented_gatherv(comm: Comm, send: np.ndarray, counts: Sequence[int], displs: Sequence[int],
+                      recv: Optional[np.ndarray], segment_size: int, root: Optional[int] = 0):
+    """
+    Gatherv (root given) or Allgatherv (root None) of byte blocks as pipelined
+    segments, received into a packed staging buffer and copied into place.
+    """
+    rank = comm.Get_rank()
+    counts = np.asarray(counts, dtype=np.int64)
+    displs = np.asarray(displs, dtype=np.int64)
+    chunk, offsets = _variable_windows(counts, segment_size)
+    pipeline = _Pipeline()
+    for a in offsets:
+        c = _chunk_counts(counts, a, chunk)
+        sd = _displs(c)
+        piece = [send[a:a + c[rank]], MPI.BYTE]
+        if root is not None and rank != root:
+            pipeline.add(comm.Igatherv(piece, None, root=root))
+            continue
+        staging = np.empty(int(c.sum()), dtype=np.uint8)
+        if root is None:
+            request = comm.Iallgatherv(piece, [staging, c, sd, MPI.BYTE])
+        else:
+            request = comm.Igatherv(piece, [staging, c, sd, MPI.BYTE], root=root)
+        pipeline.add(request, lambda a=a, c=c, sd=sd, staging=staging: _unstage(recv, displs + a, staging, sd, c))
+    pipeline.finish()
+
+def segmented_alltoallv(comm: Comm, send: np.ndarray, send_counts: Sequence[int], send_displs: Sequence[int],
+                        recv: np.ndarray, recv_counts: Sequence[int], recv_displs: Sequence[int], segment_size: int):
+    """Alltoallv of byte blocks as pipelined segments staged through packed buffers."""
+    send_counts = np.asarray(send_counts, dtype=np.int64)
+    send_displs = np.asarray(send_displs, dtype=np.int64)
+    recv_counts = np.asarray(recv_counts, dtype=np.int64)
+    recv_displs = np.asarray(recv_displs, dtype=np.int64)
+
+    # Every rank needs the same number of windows, so agree on the largest block
+    largest = comm.allreduce(int(max(send_counts.max(initial=0), recv_counts.max(initial=0))), op=MPI.MAX)
+    chunk = max(1, segment_size // comm.Get_size())
+    pipeline = _Pipeline()
+    for a in range(0, largest, chunk):
+        sc = _chunk_counts(send_counts, a, chunk)
+        rc = _chunk_counts(recv_counts, a, chunk)
+        staging_send = np.concatenate([send[d + a:d + a + n] for d, n in zip(send_displs, sc)])
+        staging_recv = np.empty(int(rc.sum()), dtype=np.uint8)
+        rd = _displs(rc)
+        request = comm.Ialltoallv([staging_send, sc, _displs(sc), MPI.BYTE], [staging_recv, rc, rd, MPI.BYTE])
+        pipeline.add(request, lambda a=a, rc=rc, rd=rd, staging=staging_recv:
+                     _unstage(recv, recv_displs + a, staging, rd, rc), keep=staging_send)
+    pipeline.finish()
+
+def _unstage(recv: np.ndarray, dest: np.ndarray, staging: np.ndarray, src: np.ndarray, counts: np.ndarray):
+    for d, s, n in zip(dest, src, counts):
+        if n:
+            recv[d:d + n] = staging[s:s + n]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD
+from collections.abc import Callable
+from functools import wraps
+from typing import Optional, Tuple
+from mpitools.comms.utils import allocate_shared, to_mpi_dtype
+from mpitools.comms.hierarchical import hierarchy
+from mpitools.comms.segmented import segment_bytes, pipelined_bcast
+
+
+class SharedArray:
+    """
+    Read-only array held once per node in an MPI shared-memory window, with a
+    zero-copy view on every process of the node.
+
+    Use it as a context manager, which gives the view and frees the window on
+    exit, or call free() explicitly. Freeing is collective over the node and
+    the view (and anything sliced from it) must not be used afterwards.
+    """
+
+    def __init__(self, win: MPI.Win, array: np.ndarray):
+        self._win = win
+        self._array = array
+
+    @property
+    def array(self) -> np.ndarray:
+        """Read-only view of the node copy"""
+        if self._array is None:
+            raise ValueError("Shared array has been freed")
+        return self._array
+
+    @property
+    def freed(self) -> bool:
+        return self._array is None
+
+    def free(self):
+        """Release the node copy (collective over the processes of the node)"""
+        if self._win is not None:
+            self._array = None
+            self._win.Free()
+            self._win = None
+
+    def __enter__(self) -> np.ndarray:
+        return self.array
+
+    def __exit__(self, *exc):
+        self.free()
+        return False
+
+    def __repr__(self) -> str:
+        if self.freed:
+            return "SharedArray(freed)"
+        return f"SharedArray(shape={self._array.shape}, dtype={self._array.dtype})"
+
+# Helper function to broadcast into one shared copy per node
+def _shared_bcast(comm: Comm, result, shape: Tuple[int, ...], dtype: np.dtype, mpi_dtype: MPI.Datatype, root: int,
+                  segment: int) -> SharedArray:
+    """
+    Allocate the node copies, let the root fill its node's copy directly and
+    broadcast it among node leaders, from the leader of the root's node.
+    """
+    h = hierarchy(comm)
+    win, view = allocate_shared(h.node_comm, shape, dtype)
+    if comm.Get_rank() == root:
+        view[...] = result
+    h.node_comm.Barrier()
+
+    if h.is_leader:
+        root_node = int(h.node_of[root])
+        if view.nbytes > segment:
+            pipelined_bcast(h.leader_comm, view, mpi_dtype, root_node, segment)
+        else:
+            h.leader_comm.Bcast([view, mpi_dtype], root=root_node)
+    h.node_comm.Barrier()
+
+    view.flags.writeable = False
+    return SharedArray(win, view)
+
+# Shared broadcast decorators
+def shared_broadcast_from_main(shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None) -> Callable:
+    """
+    Decorator that executes function on rank 0 and broadcasts result into one shared-memory copy per node.
+
+    Parameters
+    ----------
+    shape : int or tuple of ints
+        Shape of the data buffer to broadcast.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages between nodes larger than this many bytes are split into
+        pipelined segments, which also lifts the 2**31 limit on MPI element
+        counts. Defaults to 256 MiB.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    A SharedArray on all processes. Entering it as a context manager gives a
+    read-only view of the node copy and frees the copy on exit.
+
+    Notes
+    -----
+    Decorated function only runs on the main process.
+    The array is allocated once per node with MPI.Win.Allocate_shared and only
+    node leaders take part in the broadcast, so memory and network traffic do
+    not grow with the number of processes per node. Every call allocates a new
+    copy, which stays alive until it is freed.
+    """
+    return shared_broadcast_from_process(0, shape, dtype, comm, segment_size=segment_size)
+
+def shared_broadcast_from_process(process_rank: int, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None) -> Callable:
+    """
+    Decorator that executes function on specified rank and broadcasts result into one shared-memory copy per node.
+
+    Parameters
+    ----------
+    process_rank : int
+        Rank of the process that executes the function and broadcasts.
+    shape : int or tuple of ints
+        Shape of the data buffer to broadcast.
+    dtype : numpy.dtype
+        Data type of the buffer.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages between nodes larger than this many bytes are split into
+        pipelined segments, which also lifts the 2**31 limit on MPI element
+        counts. Defaults to 256 MiB.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a numpy array with the specified shape and dtype.
+
+    Decorated Function Returns
+    --------------------------
+    A SharedArray on all processes. Entering it as a context manager gives a
+    read-only view of the node copy and frees the copy on exit.
+
+    Notes
+    -----
+    Decorated function only runs on the specified process, which writes its
+    result straight into its node's copy.
+    """
+    rank = comm.Get_rank()
+    if isinstance(shape, int):
+        shape = (shape,)
+    dtype = np.dtype(dtype)
+    if dtype.hasobject:
+        raise TypeError("Arrays of Python objects cannot be placed in shared memory")
+    mpi_dtype = to_mpi_dtype(dtype)
+    segment = segment_bytes(segment_size)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs) if rank == process_rank else None
+            return _shared_bcast(comm, result, shape, dtype, mpi_dtype, process_rank, segment)
+        return wrapper
+    return decorator
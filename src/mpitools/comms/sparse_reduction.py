@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import numpy as np
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD
+from collections.abc import Callable, Mapping
+from functools import wraps
+from typing import Any, Optional, Tuple
+from mpitools.comms.segmented import as_bytes, segment_bytes, segmented_alltoallv, segmented_gatherv
+from mpitools.comms.variable_collective import _Layout
+
+sparse_ops = {
+    'sum': np.add,
+    'prod': np.multiply,
+    'max': np.maximum,
+    'min': np.minimum,
+}
+
+# Helper function to convert string operations to ufuncs
+def _to_ufunc(op: str | np.ufunc) -> np.ufunc:
+    if isinstance(op, str):
+        if op.lower() not in sparse_ops:
+            raise ValueError(f"Invalid sparse reduction operation: {op}. Supported operations: {list(sparse_ops.keys())}")
+        return sparse_ops[op.lower()]
+    if not isinstance(op, np.ufunc) or op.nin != 2:
+        raise TypeError(f"op must be an operation name or a binary NumPy ufunc, got {op!r}")
+    return op
+
+# Helper function to turn a dict or (keys, values) result into columns
+def _columns(result: Any) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(result, Mapping):
+        return np.array(list(result.keys())), np.array(list(result.values()))
+    if isinstance(result, tuple) and len(result) == 2:
+        keys, values = np.asarray(result[0]), np.asarray(result[1])
+        if keys.ndim != 1 or len(values) != len(keys):
+            raise ValueError(f"keys must be 1-D with one value per key, got shapes {keys.shape} and {values.shape}")
+        return keys, values
+    raise TypeError(f"Result must be a dict or a (keys, values) tuple of arrays, got {type(result).__name__}")
+
+# Helper function to combine the values of equal keys
+def _combine(keys: np.ndarray, values: np.ndarray, ufunc: np.ufunc) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted unique keys and the values of each key reduced with ufunc."""
+    if len(keys) == 0:
+        return keys, values
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], values[order]
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    return keys[starts], ufunc.reduceat(values, starts, axis=0)
+
+# Helper function to assign keys to ranks
+def _partition(keys: np.ndarray, size: int) -> np.ndarray:
+    """
+    Owner rank of every key from a hash that is identical on every process
+    (unlike hash(), which is salted per process for strings).
+    """
+    if keys.dtype.kind in 'US':
+        codes = keys.view(np.uint32 if keys.dtype.kind == 'U' else np.uint8).reshape(len(keys), -1).astype(np.uint64)
+        powers = np.cumprod(np.full(codes.shape[1], 0x100000001B3, dtype=np.uint64))
+        h = (codes * powers).sum(axis=1, dtype=np.uint64)
+    elif keys.dtype.kind in 'biu':
+        h = keys.astype(np.int64).view(np.uint64)
+    elif keys.dtype.kind == 'f':
+        h = (keys.astype(np.float64) + 0.0).view(np.uint64)  # + 0.0 maps -0.0 to 0.0
+    else:
+        raise TypeError(f"Sparse reductions support integer, float and string keys, got dtype {keys.dtype}")
+    # Finalizer of MurmurHash3, so consecutive integer keys spread evenly
+    h = h ^ (h >> np.uint64(33))
+    h = h * np.uint64(0xFF51AFD7ED558CCD)
+    h = h ^ (h >> np.uint64(33))
+    return (h % np.uint64(size)).astype(np.int64)
+
+# Helper function to pack keys and values into one record array
+def _pack(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    records = np.empty(len(keys), dtype=[('key', keys.dtype), ('value', values.dtype, values.shape[1:])])
+    records['key'] = keys
+    records['value'] = values
+    return records
+
+# Sparse reduce decorators
+def sparse_reduce_to_all(op: str | np.ufunc = 'sum', gather: bool = True, columnar: bool = False, segment_size: Optional[int] = None, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and reduces sparse key-value results to all processes.
+
+    Keys are hash-partitioned across processes: every process first combines
+    its own duplicate keys, sends each key-value pair to the process owning
+    the key with one Alltoallv of packed records, and reduces its partition
+    with vectorized NumPy. Only keys that exist are ever communicated.
+
+    Parameters
+    ----------
+    op : str or numpy.ufunc, optional
+        Reduction applied to the values of equal keys. Defaults to 'sum'.
+        String options: 'sum', 'prod', 'max', 'min'. Any binary NumPy ufunc is
+        accepted as well.
+    gather : bool, optional
+        Gather the reduced partitions back so every process gets the full result.
+        When False, each process only gets the keys it owns. Defaults to True.
+    columnar : bool, optional
+        Return a (keys, values) tuple of arrays instead of a dict. Defaults to False.
+    segment_size : int, optional
+        Exchanges larger than this many bytes are split into pipelined segments.
+        Defaults to 256 MiB.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function should return a dict (or Counter) mapping keys to
+    numeric values, or a (keys, values) tuple of arrays with one value (or
+    row of values) per key. Keys must be integers, floats or strings of the
+    same type on every process.
+
+    Decorated Function Returns
+    --------------------------
+    With gather: The reduced result of all processes, sorted by key.
+    Without gather: The reduced keys owned by this process, sorted by key.
+    A dict, or a (keys, values) tuple of arrays with columnar.
+
+    Notes
+    -----
+    Decorated function runs on all processes.
+    """
+    ufunc = _to_ufunc(op)
+    segment = segment_bytes(segment_size)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            size = comm.Get_size()
+            keys, values = _columns(result)
+
+            # Agree on the key and value dtypes, ignoring processes without keys
+            dtypes = [info for info in comm.allgather((keys.dtype, values.dtype, values.shape[1:]) if len(keys) else None) if info]
+            if not dtypes:
+                return (keys, values) if columnar else {}
+            key_dtype = np.result_type(*[info[0] for info in dtypes])
+            value_dtype = np.result_type(*[info[1] for info in dtypes])
+            values = values.astype(value_dtype, copy=False).reshape((len(keys),) + dtypes[0][2])
+            keys, values = _combine(keys.astype(key_dtype, copy=False), values, ufunc)
+
+            # Send every pair to the process owning its key
+            owners = _partition(keys, size)
+            order = np.argsort(owners, kind='stable')
+            send_buff = _pack(keys[order], values[order])
+            itemsize = send_buff.dtype.itemsize
+            send_info = np.empty((size, 2), dtype=np.int64)
+            send_info[:, 0] = np.bincount(owners, minlength=size)
+            send_info[:, 1] = len(send_buff)
+            recv_info = np.empty((size, 2), dtype=np.int64)
+            comm.Alltoall([send_info, MPI.INT64_T], [recv_info, MPI.INT64_T])
+            send = _Layout(send_info[:, 0], itemsize, segment)
+            recv = _Layout(recv_info[:, 0], itemsize, segment)
+            recv_buff = np.empty(recv.total, dtype=send_buff.dtype)
+            if int(recv_info[:, 1].max()) * itemsize > segment:
+                segmented_alltoallv(comm, as_bytes(send_buff), send.byte_counts, send.byte_displs,
+                                    as_bytes(recv_buff), recv.byte_counts, recv.byte_displs, segment)
+            else:
+                comm.Alltoallv([send_buff, send.byte_counts, send.byte_displs, MPI.BYTE],
+                               [recv_buff, recv.byte_counts, recv.byte_displs, MPI.BYTE])
+            keys, values = _combine(recv_buff['key'], recv_buff['value'], ufunc)
+
+            if gather:
+                send_buff = _pack(keys, values)
+                counts = np.empty(size, dtype=np.int64)
+                comm.Allgather([np.array([len(send_buff)], dtype=np.int64), MPI.INT64_T], [counts, MPI.INT64_T])
+                layout = _Layout(counts, itemsize, segment)
+                recv_buff = np.empty(layout.total, dtype=send_buff.dtype)
+                if layout.segmented:
+                    segmented_gatherv(comm, as_bytes(send_buff), layout.byte_counts, layout.byte_displs, as_bytes(recv_buff), segment, root=None)
+                else:
+                    comm.Allgatherv([send_buff, MPI.BYTE], [recv_buff, layout.byte_counts, layout.byte_displs, MPI.BYTE])
+                recv_buff = recv_buff[np.argsort(recv_buff['key'], kind='stable')]
+                keys, values = recv_buff['key'], recv_buff['value']
+
+            if columnar:
+                return keys, values
+            return dict(zip(keys.tolist(), values.tolist()))
+        return wrapper
+    return decorator
@@ -0,0 +1,174 @@
+from mpi4py.MPI import Comm, COMM_WORLD
+from collections.abc import Callable
+from functools import wraps
+from typing import Any, Optional
+from mpitools.comms.object_transport import _transport_comm
+
+# Tag of the point-to-point messages of the tree reductions
+_TAG = 45
+
+# Helper function to shrink a partial result before it is sent
+def _compacted(value: Any, compact: Optional[Callable]) -> Any:
+    return compact(value) if compact is not None else value
+
+# Helper function to reduce to one rank over a binomial tree
+def _tree_reduce(comm: Comm, value: Any, fn: Callable, root: int, commute: bool, compact: Optional[Callable]) -> Any:
+    """
+    Binomial-tree reduction in ceil(log2(p)) rounds. Each rank holds the
+    reduction of a contiguous range of ranks, in rank order, so fn only has to
+    be associative. Commutative reductions are rooted at root directly; others
+    are rooted at rank 0, which forwards the result to root.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    tree_root = root if commute else 0
+    vrank = (rank - tree_root) % size
+    mask = 1
+    while mask < size:
+        if vrank & mask:
+            comm.send(_compacted(value, compact), dest=(vrank - mask + tree_root) % size, tag=_TAG)
+            value = None
+            break
+        if vrank + mask < size:
+            value = fn(value, comm.recv(source=(vrank + mask + tree_root) % size, tag=_TAG))
+        mask <<= 1
+    if tree_root != root:
+        if rank == tree_root:
+            comm.send(value, dest=root, tag=_TAG)
+            value = None
+        elif rank == root:
+            value = comm.recv(source=tree_root, tag=_TAG)
+    return value
+
+# Helper function to reduce to all ranks by recursive doubling
+def _recursive_doubling(comm: Comm, value: Any, fn: Callable, compact: Optional[Callable]) -> Any:
+    """
+    Recursive-doubling allreduction in floor(log2(p)) exchange rounds, plus one
+    round before and after when p is not a power of two: the first 2r ranks,
+    where r = p - 2**floor(log2(p)), pair up and the odd rank of each pair
+    stands in for both. Partners combine in rank order, so fn only has to be
+    associative, and both compact their own value as well as the one they
+    receive, so every rank ends with the same result even if compact is lossy.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    pof2 = 1 << (size.bit_length() - 1)
+    rem = size - pof2
+
+    if rank < 2 * rem:
+        if rank % 2 == 0:
+            comm.send(_compacted(value, compact), dest=rank + 1, tag=_TAG)
+            return comm.recv(source=rank + 1, tag=_TAG)
+        value = fn(comm.recv(source=rank - 1, tag=_TAG), _compacted(value, compact))
+        vrank = rank // 2
+    else:
+        vrank = rank - rem
+
+    mask = 1
+    while mask < pof2:
+        vpartner = vrank ^ mask
+        partner = vpartner * 2 + 1 if vpartner < rem else vpartner + rem
+        # Both partners combine the same compacted operands, so they stay in agreement
+        value = _compacted(value, compact)
+        received = comm.sendrecv(value, dest=partner, sendtag=_TAG, source=partner, recvtag=_TAG)
+        value = fn(received, value) if vpartner < vrank else fn(value, received)
+        mask <<= 1
+
+    if rank < 2 * rem:
+        comm.send(value, dest=rank - 1, tag=_TAG)
+    return value
+
+# Tree reduce decorators
+def reduce_with(fn: Callable, root: int = 0, commute: bool = True, compact: Optional[Callable] = None, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and reduces the results with a Python function over a binomial tree.
+
+    Parameters
+    ----------
+    fn : callable
+        Associative function fn(a, b) combining two partial results, e.g.
+        merging dicts, adding Counters or merging sorted lists. It may update
+        and return a in place.
+    root : int, optional
+        Rank of the process that receives the reduced result. Defaults to 0.
+    commute : bool, optional
+        Whether fn is commutative. When False, results are combined in rank
+        order, at the cost of one extra message when root is not 0. Defaults to True.
+    compact : callable, optional
+        Function applied to every partial result before it is sent, e.g. to drop
+        zero counts or keep only the top entries, so messages stay small.
+        Defaults to None.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object that fn accepts.
+
+    Decorated Function Returns
+    --------------------------
+    On root: The reduced result from all processes.
+    On other ranks: None.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The reduction takes
+    ceil(log2(p)) rounds of pickled point-to-point messages on a private
+    duplicate of comm, and each rank sends at most one message.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            return _tree_reduce(_transport_comm(comm), result, fn, root, commute, compact)
+        return wrapper
+    return decorator
+
+def allreduce_with(fn: Callable, compact: Optional[Callable] = None, comm: Comm = COMM_WORLD) -> Callable:
+    """
+    Decorator that executes function on all processes and reduces the results with a Python function to all processes.
+
+    Parameters
+    ----------
+    fn : callable
+        Associative function fn(a, b) combining two partial results, e.g.
+        merging dicts, adding Counters or merging sorted lists. Results are
+        combined in rank order, so fn need not be commutative. It may update
+        and return a in place.
+    compact : callable, optional
+        Function applied to every partial result before it is sent, e.g. to drop
+        zero counts or keep only the top entries, so messages stay small.
+        Defaults to None.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+
+    Returns
+    -------
+    Callable
+        Decorator function.
+
+    Decorated Function Requirements
+    -------------------------------
+    The decorated function can return any pickle-able Python object that fn accepts.
+
+    Decorated Function Returns
+    --------------------------
+    The reduced result from all processes, available on all processes.
+
+    Notes
+    -----
+    Decorated function runs on all processes. The reduction uses recursive
+    doubling: floor(log2(p)) rounds of pairwise exchanges of pickled partial
+    results on a private duplicate of comm, plus one round before and after
+    when p is not a power of two.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            return _recursive_doubling(_transport_comm(comm), result, fn, compact)
+        return wrapper
+    return decorator
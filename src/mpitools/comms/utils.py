@@ -1,6 +1,30 @@
+from __future__ import annotations
+
 from mpi4py import MPI
+from mpi4py.util import dtlib
 import numpy as np
-from typing import Tuple
+from collections.abc import Callable
+from typing import Optional, Tuple
+
+_node_comms = {}
+_user_ops = {}  # Op handle -> _UserOp of the registered reductions
+_mpi_dtypes = {}  # NumPy dtype -> MPI datatype
+_numpy_dtypes = {}  # Handle of derived MPI datatypes -> NumPy dtype
+_fieldwise_ops = {}  # (Op handle, NumPy dtype) -> field-wise MPI.Op
+
+# NumPy ufuncs equivalent to the built-in MPI operations
+_op_ufuncs = {
+    MPI.SUM.py2f(): np.add,
+    MPI.PROD.py2f(): np.multiply,
+    MPI.MAX.py2f(): np.maximum,
+    MPI.MIN.py2f(): np.minimum,
+    MPI.LAND.py2f(): np.logical_and,
+    MPI.LOR.py2f(): np.logical_or,
+    MPI.LXOR.py2f(): np.logical_xor,
+    MPI.BAND.py2f(): np.bitwise_and,
+    MPI.BOR.py2f(): np.bitwise_or,
+    MPI.BXOR.py2f(): np.bitwise_xor,
+}
 
 reduce_ops = {
     'sum': MPI.SUM,
@@ -25,34 +49,207 @@ def to_mpi_op(op: str | MPI.Op) -> MPI.Op:
         op = reduce_ops[op.lower()]
     return op
 
+# User-defined reduction operations
+class _UserOp:
+    """
+    MPI user-defined operation callback that applies a vectorized function to
+    NumPy views of the buffers. Lowercase object reductions call it with the
+    two Python objects instead.
+    """
+
+    def __init__(self, fn: Callable, dtype: Optional[np.dtype], elementwise: bool):
+        self.fn = fn
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self.elementwise = elementwise
+
+    def __call__(self, inbuf, inoutbuf, datatype: Optional[MPI.Datatype] = None):
+        if datatype is None:
+            return self.fn(inbuf, inoutbuf)
+        dtype = self.dtype
+        if dtype is None:
+            dtype = _numpy_dtypes.get(datatype.py2f()) or dtlib.to_numpy_dtype(datatype)
+            dtype = dtype.base if dtype.subdtype else dtype
+        a = np.frombuffer(inbuf, dtype=dtype)
+        b = np.frombuffer(inoutbuf, dtype=dtype)
+        if isinstance(self.fn, np.ufunc):
+            self.fn(a, b, out=b)
+        else:
+            combined = self.fn(a, b)
+            if combined is not b:
+                b[...] = combined
+
+def register_op(name: str, fn: Callable, commute: bool = True, dtype: Optional[np.dtype] = None,
+                elementwise: bool = True) -> MPI.Op:
+    """
+    Register a vectorized reduction so it can be passed by name as op= to the reduce decorators.
+
+    Parameters
+    ----------
+    name : str
+        Name of the operation, e.g. 'logsumexp'. Built-in names cannot be replaced.
+    fn : callable
+        Binary NumPy ufunc, or vectorized function fn(a, b) returning the combination
+        of two arrays. Buffered reductions call it on views of the MPI buffers; object
+        reductions call it on the two Python objects.
+    commute : bool, optional
+        Whether fn is commutative, which lets MPI combine contributions in any order.
+        Defaults to True. fn must always be associative.
+    dtype : numpy.dtype, optional
+        Dtype to view the buffers as. Needed for dtypes MPI sends as raw bytes, such as
+        structured (value, index) pairs. Defaults to the dtype of the MPI datatype.
+    elementwise : bool, optional
+        Whether fn combines arrays element by element. Operations over whole arrays,
+        such as merging sorted arrays, set this to False so buffered reductions send
+        each buffer as a single MPI element that MPI never splits. Defaults to True.
+
+    Returns
+    -------
+    MPI.Op
+        The created operation.
+    """
+    name = name.lower()
+    if name in reduce_ops and reduce_ops[name].py2f() not in _user_ops:
+        raise ValueError(f"Cannot replace built-in reduction operation: {name}")
+    user_op = _UserOp(fn, dtype, elementwise)
+    op = MPI.Op.Create(user_op, commute=commute)
+    reduce_ops[name] = op
+    _user_ops[op.py2f()] = user_op
+    return op
+
+def reduction_dtype(op: MPI.Op, dtype: np.dtype, shape: Tuple[int, ...]) -> MPI.Datatype:
+    """
+    MPI datatype of a buffered reduction. Registered operations over whole arrays get
+    the whole buffer as one element, so MPI never splits it between two calls.
+    """
+    mpi_dtype = to_mpi_dtype(dtype)
+    user_op = _user_ops.get(op.py2f())
+    if user_op is None or user_op.elementwise:
+        return mpi_dtype
+    return mpi_dtype.Create_contiguous(int(np.prod(shape, dtype=np.int64))).Commit()
+
+# Helper function to apply a ufunc to every field of structured arrays
+def _apply_fieldwise(ufunc: np.ufunc, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if a.dtype.names is None:
+        ufunc(a, b, out=b)
+    else:
+        for name in a.dtype.names:
+            _apply_fieldwise(ufunc, a[name], b[name])
+    return b
+
+def reduction_op(op: MPI.Op, dtype: np.dtype) -> MPI.Op:
+    """
+    MPI operation of a buffered reduction. Built-in operations on dtypes MPI cannot
+    reduce itself (structured dtypes, float16, bool, non-native byte order) are replaced
+    by an equivalent operation applying the matching NumPy ufunc field by field.
+    """
+    dtype = np.dtype(dtype)
+    ufunc = _op_ufuncs.get(op.py2f())
+    if ufunc is None or (dtype.kind in 'iufc' and dtype.isnative and dtype.type in _primitive_dtypes):
+        return op
+    key = (op.py2f(), dtype)
+    if key not in _fieldwise_ops:
+        sample = np.zeros(1, dtype=dtype)
+        try:
+            _apply_fieldwise(ufunc, sample, sample.copy())
+        except TypeError as e:
+            raise TypeError(f"Cannot reduce dtype {dtype} with {ufunc.__name__}: {e}") from None
+        fn = lambda a, b, ufunc=ufunc: _apply_fieldwise(ufunc, a, b)
+        user_op = _UserOp(fn, dtype, True)
+        _fieldwise_ops[key] = MPI.Op.Create(user_op, commute=True)
+        _user_ops[_fieldwise_ops[key].py2f()] = user_op
+    return _fieldwise_ops[key]
+
 # Helper function to build buffers
 def build_buffer(shape: int | Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
     """Build buffer for MPI communication."""
     return np.empty(shape, dtype=dtype)
 
 # Helper functions to convert dtypes to MPI datatypes
+_primitive_dtypes = {
+    np.bool_: MPI.C_BOOL,
+    np.int8: MPI.INT8_T,
+    np.int16: MPI.INT16_T, 
+    np.int32: MPI.INT32_T,
+    np.int64: MPI.INT64_T,
+    np.uint8: MPI.UINT8_T,
+    np.uint16: MPI.UINT16_T,
+    np.uint32: MPI.UINT32_T,
+    np.uint64: MPI.UINT64_T,
+    np.float32: MPI.FLOAT,
+    np.float64: MPI.DOUBLE,
+    np.longdouble: MPI.LONG_DOUBLE,
+    np.complex64: MPI.COMPLEX,
+    np.complex128: MPI.DOUBLE_COMPLEX,
+    np.clongdouble: MPI.C_LONG_DOUBLE_COMPLEX,
+    np.datetime64: MPI.INT64_T,
+    np.timedelta64: MPI.INT64_T,
+}
+
+def _derived_dtype(dtype: np.dtype) -> MPI.Datatype:
+    """
+    Uncommitted MPI datatype of a dtype without a predefined equivalent: a struct
+    with the field offsets and item size (padding included) of a structured dtype,
+    a contiguous block of a subarray dtype, or opaque bytes (float16, strings, void).
+    """
+    if dtype.subdtype is not None:
+        base, shape = dtype.subdtype
+        return numpy_to_mpi_dtype(base).Create_contiguous(int(np.prod(shape, dtype=np.int64)))
+    if dtype.names is not None:
+        fields = [dtype.fields[name] for name in dtype.names]
+        struct = MPI.Datatype.Create_struct([1] * len(fields), [offset for _, offset, *_ in fields],
+                                            [numpy_to_mpi_dtype(field) for field, *_ in fields])
+        resized = struct.Create_resized(0, dtype.itemsize)
+        struct.Free()
+        return resized
+    return MPI.BYTE.Create_contiguous(dtype.itemsize)
+
 def numpy_to_mpi_dtype(np_dtype: np.dtype) -> MPI.Datatype:
-    """Convert numpy dtype to MPI datatype."""
-    dtype_map = {
-        np.int8: MPI.INT8_T,
-        np.int16: MPI.INT16_T, 
-        np.int32: MPI.INT32_T,
-        np.int64: MPI.INT64_T,
-        np.uint8: MPI.UINT8_T,
-        np.uint16: MPI.UINT16_T,
-        np.uint32: MPI.UINT32_T,
-        np.uint64: MPI.UINT64_T,
-        np.float32: MPI.FLOAT,
-        np.float64: MPI.DOUBLE,
-        np.complex64: MPI.COMPLEX,
-        np.complex128: MPI.DOUBLE_COMPLEX,
-    }
-    
-    # Handle numpy dtype objects
-    if hasattr(np_dtype, 'type'):
-        np_dtype = np_dtype.type
-    
-    return dtype_map.get(np_dtype, MPI.BYTE)
+    """
+    Convert numpy dtype to MPI datatype. Dtypes without a predefined MPI datatype,
+    including non-native byte orders, get a derived datatype, built once and cached.
+    """
+    np_dtype = np.dtype(np_dtype)
+    if np_dtype.names is None and np_dtype.subdtype is None and np_dtype.isnative and np_dtype.type in _primitive_dtypes:
+        return _primitive_dtypes[np_dtype.type]
+    if np_dtype not in _mpi_dtypes:
+        mpi_dtype = _derived_dtype(np_dtype).Commit()
+        _mpi_dtypes[np_dtype] = mpi_dtype
+        _numpy_dtypes[mpi_dtype.py2f()] = np_dtype
+    return _mpi_dtypes[np_dtype]
 
 def to_mpi_dtype(dtype: np.dtype) -> MPI.Datatype:
-    return numpy_to_mpi_dtype(dtype)
\ No newline at end of file
+    return numpy_to_mpi_dtype(dtype)
+
+# Helper functions for node-local shared memory
+def node_comms(comm: MPI.Comm = MPI.COMM_WORLD) -> Tuple[MPI.Comm, MPI.Comm]:
+    """
+    Split a communicator into per-node communicators and a communicator of node leaders.
+    
+    The lowest rank on each node is its leader (node rank 0). The leader communicator is
+    ordered by rank in comm and is MPI.COMM_NULL on non-leaders. Results are cached per
+    communicator, so repeated calls are free; the first call is collective.
+    """
+    key = comm.py2f()
+    if key not in _node_comms:
+        rank = comm.Get_rank()
+        node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED, key=rank)
+        is_leader = node_comm.Get_rank() == 0
+        leader_comm = comm.Split(0 if is_leader else MPI.UNDEFINED, key=rank)
+        _node_comms[key] = (node_comm, leader_comm)
+    return _node_comms[key]
+
+def allocate_shared(node_comm: MPI.Comm, shape: int | Tuple[int, ...], dtype: np.dtype) -> Tuple[MPI.Win, np.ndarray]:
+    """
+    Allocate an array in shared memory, once per node.
+    
+    Collective over node_comm. Node rank 0 owns the memory; every process gets a NumPy
+    view of it. The returned window must be freed (collectively) once the views are no
+    longer used.
+    """
+    dtype = np.dtype(dtype)
+    if isinstance(shape, int):
+        shape = (shape,)
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    win = MPI.Win.Allocate_shared(nbytes if node_comm.Get_rank() == 0 else 0, dtype.itemsize, comm=node_comm)
+    buff, _ = win.Shared_query(0)
+    return win, np.ndarray(shape, dtype=dtype, buffer=buff)
\ No newline at end of file
@@ -1,13 +1,92 @@
+from __future__ import annotations
+
 import numpy as np
 from mpi4py import MPI
 from mpi4py.MPI import Comm, COMM_WORLD
 from collections.abc import Callable
 from functools import wraps
-from typing import Sequence
-from mpitools.comms.utils import to_mpi_dtype, build_buffer
+from typing import List, Optional, Sequence, Tuple
+from mpitools.comms.utils import to_mpi_dtype
+from mpitools.comms.buffer_pool import BufferPool, ReceiveBuffers
+from mpitools.comms.segmented import (
+    segment_bytes,
+    as_bytes,
+    segmented_scatterv,
+    segmented_gatherv,
+    segmented_alltoallv
+)
+from mpitools.comms.views import buffer_spec
+
+# Counts and displacements of variable collectives
+class _Layout:
+    """Counts and displacements of a variable collective, in elements and in bytes."""
+
+    def __init__(self, counts: Sequence[int], itemsize: int, segment: int):
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.displs = np.zeros_like(self.counts)
+        np.cumsum(self.counts[:-1], out=self.displs[1:])
+        self.total = int(self.counts.sum())
+        self.byte_counts = self.counts * itemsize
+        self.byte_displs = self.displs * itemsize
+        self.segmented = self.total * itemsize > segment
+
+class _LayoutCache:
+    """Layout of the counts seen last, only rebuilt when the counts change."""
+
+    def __init__(self, itemsize: int, segment: int):
+        self.itemsize = itemsize
+        self.segment = segment
+        self.layout = None
+
+    def get(self, counts: Sequence[int]) -> _Layout:
+        if self.layout is None or not np.array_equal(counts, self.layout.counts):
+            self.layout = _Layout(counts, self.itemsize, self.segment)
+        return self.layout
+
+def _is_auto(counts) -> bool:
+    return isinstance(counts, str) and counts == 'auto'
+
+def _checked_counts(counts: Sequence[int], size: int, name: str = 'counts') -> List[int]:
+    if counts is None or isinstance(counts, str):
+        raise ValueError(f"{name} must be a sequence of ints")
+    counts = list(counts)
+    if len(counts) != size:
+        raise ValueError(f"{name} length {len(counts)} must equal number of processes {size}")
+    return counts
+
+def _row_shape(arrays: Sequence[np.ndarray]) -> Tuple[bool, Tuple[int, ...]]:
+    """Whether any array has rows, and the row shape of the first that has (else of the first array)."""
+    for array in arrays:
+        if np.size(array):
+            return True, np.shape(array)[1:]
+    return False, np.shape(arrays[0])[1:] if len(arrays) else ()
+
+def _agreed_row_shape(shapes: Sequence[Tuple[bool, Tuple[int, ...]]]) -> Tuple[int, ...]:
+    """
+    Row shape of the ranks that have rows, which must all agree. Ranks without
+    rows have no say, unless none has any, when rank 0 decides.
+    """
+    known = {shape for has_rows, shape in shapes if has_rows}
+    if len(known) > 1:
+        raise ValueError(f"Processes returned rows of different shapes: {sorted(known)}")
+    return known.pop() if known else shapes[0][1]
+
+def _exchange_counts(comm: Comm, result: np.ndarray, layouts: _LayoutCache) -> Tuple[_Layout, Tuple[int, ...]]:
+    """Layout of the results of all ranks and their common row shape, exchanged with one small allgather."""
+    sizes, shapes = zip(*comm.allgather((int(np.size(result)), _row_shape([result]))))
+    return layouts.get(np.array(sizes, dtype=np.int64)), _agreed_row_shape(shapes)
+
+def _rows_shape(total: int, row_shape: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Shape of total elements stacked as rows of row_shape."""
+    row_size = int(np.prod(row_shape, dtype=np.int64))
+    return (total // row_size if row_size else 0,) + tuple(row_shape)
+
+def _gathered_shape(layout: _Layout, row_shape: Optional[Tuple[int, ...]]) -> Tuple[int, ...]:
+    """Shape of a gathered result: flat, or the rows of all ranks with counts='auto'."""
+    return _rows_shape(layout.total, row_shape) if row_shape is not None else (layout.total,)
 
 # Buffered variable scatter decorators
-def variable_scatter_from_main(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def variable_scatter_from_main(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None) -> Callable:
     """
     Decorator that executes function on rank 0 and scatters variable-sized results to all processes.
     
@@ -19,6 +98,17 @@ def variable_scatter_from_main(counts: Sequence[int], dtype: np.dtype, comm: Com
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
     
     Returns
     -------
@@ -36,40 +126,46 @@ def variable_scatter_from_main(counts: Sequence[int], dtype: np.dtype, comm: Com
     Notes
     -----
     Decorated function only runs on the main process.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
     
-    counts = list(counts)
-    if len(counts) != size:
-        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
-    
-    # Calculate displacements
-    displs = [sum(counts[:i]) for i in range(size)]
-    
     mpi_dtype = to_mpi_dtype(dtype)
     
+    # Counts and displacements in elements, and in bytes for the segmented path
+    # that moves large messages as pipelined segments of raw bytes
+    segment = segment_bytes(segment_size)
+    layout = _Layout(_checked_counts(counts, size), np.dtype(dtype).itemsize, segment)
+    
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Allocate receive buffer on all processes
-            recv_buff = build_buffer((counts[rank],), dtype)
+            recv_buff = buffers.get((int(layout.counts[rank]),), out)
             
             if rank == 0:
                 # Execute function and prepare send buffer
                 result = func(*args, **kwargs)
-                send_buff = result
+                send_buff = np.ascontiguousarray(result)
             else:
                 send_buff = None
             
             # Scatter variable data
-            comm.Scatterv([send_buff, counts, displs, mpi_dtype], [recv_buff, mpi_dtype], root=0)
+            if layout.segmented:
+                segmented_scatterv(comm, as_bytes(send_buff), layout.byte_counts, layout.byte_displs, as_bytes(recv_buff), segment, root=0)
+            else:
+                comm.Scatterv([send_buff, layout.counts, layout.displs, mpi_dtype], [recv_buff, mpi_dtype], root=0)
             
             return recv_buff
         return wrapper
     return decorator
 
-def variable_scatter_from_process(process_rank: int, counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def variable_scatter_from_process(process_rank: int, counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None) -> Callable:
     """
     Decorator that executes function on specified rank and scatters variable-sized results to all processes.
     
@@ -83,6 +179,17 @@ def variable_scatter_from_process(process_rank: int, counts: Sequence[int], dtyp
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
     
     Returns
     -------
@@ -100,52 +207,70 @@ def variable_scatter_from_process(process_rank: int, counts: Sequence[int], dtyp
     Notes
     -----
     Decorated function only runs on the specified process.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
     
-    counts = list(counts)
-    if len(counts) != size:
-        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
-    
-    # Calculate displacements
-    displs = [sum(counts[:i]) for i in range(size)]
-    
     mpi_dtype = to_mpi_dtype(dtype)
     
+    # Counts and displacements in elements, and in bytes for the segmented path
+    # that moves large messages as pipelined segments of raw bytes
+    segment = segment_bytes(segment_size)
+    layout = _Layout(_checked_counts(counts, size), np.dtype(dtype).itemsize, segment)
+    
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Allocate receive buffer on all processes
-            recv_buff = build_buffer((counts[rank],), dtype)
+            recv_buff = buffers.get((int(layout.counts[rank]),), out)
             
             if rank == process_rank:
                 # Execute function and prepare send buffer
                 result = func(*args, **kwargs)
-                send_buff = result
+                send_buff = np.ascontiguousarray(result)
             else:
                 send_buff = None
             
             # Scatter variable data
-            comm.Scatterv([send_buff, counts, displs, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
+            if layout.segmented:
+                segmented_scatterv(comm, as_bytes(send_buff), layout.byte_counts, layout.byte_displs, as_bytes(recv_buff), segment, root=process_rank)
+            else:
+                comm.Scatterv([send_buff, layout.counts, layout.displs, mpi_dtype], [recv_buff, mpi_dtype], root=process_rank)
             
             return recv_buff
         return wrapper
     return decorator
 
 # Buffered variable gather decorators
-def variable_gather_to_main(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def variable_gather_to_main(counts: Sequence[int] | str, dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None) -> Callable:
     """
     Decorator that executes function on all processes and gathers variable-sized results to rank 0.
     
     Parameters
     ----------
-    counts : sequence of ints
-        Number of elements to receive from each process.
+    counts : sequence of ints or 'auto'
+        Number of elements to receive from each process, or 'auto' to exchange the
+        sizes of the results with one small Allgather on every call.
     dtype : numpy.dtype
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
     
     Returns
     -------
@@ -155,50 +280,64 @@ def variable_gather_to_main(counts: Sequence[int], dtype: np.dtype, comm: Comm =
     Decorated Function Requirements
     -------------------------------
     The decorated function should return a 1D numpy array with size counts[rank] and the specified dtype.
+    With counts='auto' it may return any number of rows of a row shape shared by all processes.
     
     Decorated Function Returns
     --------------------------
     On rank 0: Buffer containing concatenated variable-sized data from all processes.
+    With counts='auto' the rows of all processes are stacked along the first axis.
     On other ranks: None.
 
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
     
-    counts = list(counts)
-    if len(counts) != size:
-        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
-    
-    # Calculate displacements
-    displs = [sum(counts[:i]) for i in range(size)]
+    auto = _is_auto(counts)
     
     mpi_dtype = to_mpi_dtype(dtype)
     
+    # Counts and displacements in elements, and in bytes for the segmented path
+    # that moves large messages as pipelined segments of raw bytes. With
+    # counts='auto' they are exchanged on every call and cached while they repeat.
+    segment = segment_bytes(segment_size)
+    layouts = _LayoutCache(np.dtype(dtype).itemsize, segment)
+    if not auto:
+        layouts.get(_checked_counts(counts, size))
+    
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
             send_buff = result
+            layout, row_shape = _exchange_counts(comm, send_buff, layouts) if auto else (layouts.layout, None)
             
             # Prepare receive buffer only on rank 0
             if rank == 0:
-                recv_buff = build_buffer((sum(counts),), dtype)
+                recv_buff = buffers.get(_gathered_shape(layout, row_shape), out)
             else:
                 recv_buff = None
             
             # Gather variable data to rank 0
-            comm.Gatherv([send_buff, mpi_dtype], [recv_buff, counts, displs, mpi_dtype], root=0)
+            if layout.segmented:
+                segmented_gatherv(comm, as_bytes(send_buff), layout.byte_counts, layout.byte_displs, as_bytes(recv_buff), segment, root=0)
+            else:
+                comm.Gatherv(buffer_spec(send_buff, mpi_dtype), [recv_buff, layout.counts, layout.displs, mpi_dtype], root=0)
             
             return recv_buff
         return wrapper
     return decorator
 
-def variable_gather_to_process(process_rank: int, counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def variable_gather_to_process(process_rank: int, counts: Sequence[int] | str, dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None) -> Callable:
     """
     Decorator that executes function on all processes and gathers variable-sized results to specified rank.
     
@@ -206,12 +345,24 @@ def variable_gather_to_process(process_rank: int, counts: Sequence[int], dtype:
     ----------
     process_rank : int
         Rank of the process that should receive gathered results.
-    counts : sequence of ints
-        Number of elements to receive from each process.
+    counts : sequence of ints or 'auto'
+        Number of elements to receive from each process, or 'auto' to exchange the
+        sizes of the results with one small Allgather on every call.
     dtype : numpy.dtype
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
     
     Returns
     -------
@@ -221,61 +372,87 @@ def variable_gather_to_process(process_rank: int, counts: Sequence[int], dtype:
     Decorated Function Requirements
     -------------------------------
     The decorated function should return a 1D numpy array with size counts[rank] and the specified dtype.
+    With counts='auto' it may return any number of rows of a row shape shared by all processes.
     
     Decorated Function Returns
     --------------------------
     On specified rank: Buffer containing concatenated variable-sized data from all processes.
+    With counts='auto' the rows of all processes are stacked along the first axis.
     On other ranks: None.
 
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     rank = comm.Get_rank()
     size = comm.Get_size()
     
-    counts = list(counts)
-    if len(counts) != size:
-        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
-    
-    # Calculate displacements
-    displs = [sum(counts[:i]) for i in range(size)]
+    auto = _is_auto(counts)
     
     mpi_dtype = to_mpi_dtype(dtype)
     
+    # Counts and displacements in elements, and in bytes for the segmented path
+    # that moves large messages as pipelined segments of raw bytes. With
+    # counts='auto' they are exchanged on every call and cached while they repeat.
+    segment = segment_bytes(segment_size)
+    layouts = _LayoutCache(np.dtype(dtype).itemsize, segment)
+    if not auto:
+        layouts.get(_checked_counts(counts, size))
+    
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
             send_buff = result
+            layout, row_shape = _exchange_counts(comm, send_buff, layouts) if auto else (layouts.layout, None)
             
             # Prepare receive buffer only on specified rank
             if rank == process_rank:
-                recv_buff = build_buffer((sum(counts),), dtype)
+                recv_buff = buffers.get(_gathered_shape(layout, row_shape), out)
             else:
                 recv_buff = None
             
             # Gather variable data to specified rank
-            comm.Gatherv([send_buff, mpi_dtype], [recv_buff, counts, displs, mpi_dtype], root=process_rank)
+            if layout.segmented:
+                segmented_gatherv(comm, as_bytes(send_buff), layout.byte_counts, layout.byte_displs, as_bytes(recv_buff), segment, root=process_rank)
+            else:
+                comm.Gatherv(buffer_spec(send_buff, mpi_dtype), [recv_buff, layout.counts, layout.displs, mpi_dtype], root=process_rank)
             
             return recv_buff
         return wrapper
     return decorator
 
-def variable_gather_to_all(counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def variable_gather_to_all(counts: Sequence[int] | str, dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None) -> Callable:
     """
     Decorator that executes function on all processes and gathers variable-sized results to all processes.
     
     Parameters
     ----------
-    counts : sequence of ints
-        Number of elements to receive from each process.
+    counts : sequence of ints or 'auto'
+        Number of elements to receive from each process, or 'auto' to exchange the
+        sizes of the results with one small Allgather on every call.
     dtype : numpy.dtype
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
     
     Returns
     -------
@@ -285,57 +462,83 @@ def variable_gather_to_all(counts: Sequence[int], dtype: np.dtype, comm: Comm =
     Decorated Function Requirements
     -------------------------------
     The decorated function should return a 1D numpy array with size counts[rank] and the specified dtype.
+    With counts='auto' it may return any number of rows of a row shape shared by all processes.
     
     Decorated Function Returns
     --------------------------
     Buffer containing concatenated variable-sized data from all processes, available on all processes.
+    With counts='auto' the rows of all processes are stacked along the first axis.
 
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     size = comm.Get_size()
     
-    counts = list(counts)
-    if len(counts) != size:
-        raise ValueError(f"counts length {len(counts)} must equal number of processes {size}")
-    
-    # Calculate displacements
-    displs = [sum(counts[:i]) for i in range(size)]
+    auto = _is_auto(counts)
     
     mpi_dtype = to_mpi_dtype(dtype)
     
+    # Counts and displacements in elements, and in bytes for the segmented path
+    # that moves large messages as pipelined segments of raw bytes. With
+    # counts='auto' they are exchanged on every call and cached while they repeat.
+    segment = segment_bytes(segment_size)
+    layouts = _LayoutCache(np.dtype(dtype).itemsize, segment)
+    if not auto:
+        layouts.get(_checked_counts(counts, size))
+    
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
             send_buff = result
-            recv_buff = build_buffer((sum(counts),), dtype)
+            layout, row_shape = _exchange_counts(comm, send_buff, layouts) if auto else (layouts.layout, None)
+            recv_buff = buffers.get(_gathered_shape(layout, row_shape), out)
             
             # Gather variable data to all processes
-            comm.Allgatherv([send_buff, mpi_dtype], [recv_buff, counts, displs, mpi_dtype])
+            if layout.segmented:
+                segmented_gatherv(comm, as_bytes(send_buff), layout.byte_counts, layout.byte_displs, as_bytes(recv_buff), segment, root=None)
+            else:
+                comm.Allgatherv(buffer_spec(send_buff, mpi_dtype), [recv_buff, layout.counts, layout.displs, mpi_dtype])
             
             return recv_buff
         return wrapper
     return decorator
 
 # Buffered variable all-to-all decorator
-def variable_all_to_all(send_counts: Sequence[int], recv_counts: Sequence[int], dtype: np.dtype, comm: Comm = COMM_WORLD) -> Callable:
+def variable_all_to_all(send_counts: Sequence[int] | str, recv_counts: Optional[Sequence[int]], dtype: np.dtype, comm: Comm = COMM_WORLD, *, segment_size: Optional[int] = None, reuse: bool = False, pool: Optional[BufferPool | bool] = None) -> Callable:
     """
     Decorator that executes function on all processes and exchanges variable-sized results between all processes.
     
     Parameters
     ----------
-    send_counts : sequence of ints
-        Number of elements to send to each process.
-    recv_counts : sequence of ints
-        Number of elements to receive from each process.
+    send_counts : sequence of ints or 'auto'
+        Number of elements to send to each process, or 'auto' to exchange the
+        sizes of the results with one small Alltoall on every call.
+    recv_counts : sequence of ints or None
+        Number of elements to receive from each process. None with 'auto'.
     dtype : numpy.dtype
         Data type of the buffer.
     comm : MPI.Comm, optional
         MPI communicator. Defaults to COMM_WORLD.
+    segment_size : int, optional
+        Messages larger than this many bytes are split into segments of this size and
+        sent as pipelined nonblocking collectives, which also lifts the 2**31 limit on
+        MPI element counts. Defaults to 256 MiB.
+    reuse : bool, optional
+        Receive into one buffer owned by the decorated function instead of a new
+        array per call. The returned array is then only valid until the next call.
+        Defaults to False.
+    pool : BufferPool or bool, optional
+        Take receive buffers from a BufferPool, True for the shared pool. Give them
+        back with pool.release(result) once done. Defaults to None.
     
     Returns
     -------
@@ -345,44 +548,80 @@ def variable_all_to_all(send_counts: Sequence[int], recv_counts: Sequence[int],
     Decorated Function Requirements
     -------------------------------
     The decorated function should return a 1D numpy array with size sum(send_counts) and the specified dtype.
+    With send_counts='auto' it should return a sequence with one array per process instead,
+    each with any number of rows of a row shape shared by all processes.
     
     Decorated Function Returns
     --------------------------
     Buffer containing variable-sized data received from all processes based on recv_counts array.
+    With send_counts='auto': list with the rows received from each process, as views of one buffer.
 
     Notes
     -----
     Decorated function runs on all processes.
+    Pass out= to the decorated function to receive into a caller-provided
+    C-contiguous array of the result shape and dtype instead.
     """
     size = comm.Get_size()
     
-    send_counts = list(send_counts)
-    recv_counts = list(recv_counts)
-    
-    if len(send_counts) != size:
-        raise ValueError(f"send_counts length {len(send_counts)} must equal number of processes {size}")
-    if len(recv_counts) != size:
-        raise ValueError(f"recv_counts length {len(recv_counts)} must equal number of processes {size}")
-    
-    # Calculate displacements
-    send_displs = [sum(send_counts[:i]) for i in range(size)]
-    recv_displs = [sum(recv_counts[:i]) for i in range(size)]
+    auto = _is_auto(send_counts)
     
     mpi_dtype = to_mpi_dtype(dtype)
     
+    # Counts and displacements in elements, and in bytes for the segmented path
+    # that moves large messages as pipelined segments of raw bytes. Totals differ
+    # between ranks, so whether to segment is agreed on collectively.
+    segment = segment_bytes(segment_size)
+    itemsize = np.dtype(dtype).itemsize
+    send_layouts = _LayoutCache(itemsize, segment)
+    recv_layouts = _LayoutCache(itemsize, segment)
+    segmented = None
+    if not auto:
+        send_layouts.get(_checked_counts(send_counts, size, 'send_counts'))
+        recv_layouts.get(_checked_counts(recv_counts, size, 'recv_counts'))
+    
     def decorator(func: Callable) -> Callable:
+        buffers = ReceiveBuffers(dtype, reuse, pool)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
+            nonlocal segmented
+            out = kwargs.pop('out', None)
             # Execute function on all processes
             result = func(*args, **kwargs)
             
-            send_buff = result
-            recv_buff = build_buffer((sum(recv_counts),), dtype)
+            if auto:
+                # One Alltoall tells every rank what it receives
+                parts = list(result)
+                if len(parts) != size:
+                    raise ValueError(f"Result length {len(parts)} must equal number of processes {size}")
+                send_buff = np.concatenate([np.ravel(part) for part in parts]).astype(dtype, copy=False)
+                send_counts = np.array([np.size(part) for part in parts], dtype=np.int64)
+                recv_counts = np.empty(size, dtype=np.int64)
+                comm.Alltoall([send_counts, MPI.INT64_T], [recv_counts, MPI.INT64_T])
+                send = send_layouts.get(send_counts)
+                recv = recv_layouts.get(recv_counts)
+                # Then all agree on the row shape and on segmenting from the largest send or receive total
+                totals, shapes = zip(*comm.allgather((max(send.total, recv.total), _row_shape(parts))))
+                row_shape = _agreed_row_shape(shapes)
+                segmented = max(totals) * itemsize > segment
+            else:
+                send_buff = np.ascontiguousarray(result)
+                send, recv = send_layouts.layout, recv_layouts.layout
+                if segmented is None:
+                    segmented = comm.allreduce(max(send.total, recv.total) * itemsize, op=MPI.MAX) > segment
+            recv_buff = buffers.get((recv.total,), out)
             
             # Variable all-to-all exchange
-            comm.Alltoallv([send_buff, send_counts, send_displs, mpi_dtype], 
-                          [recv_buff, recv_counts, recv_displs, mpi_dtype])
+            if segmented:
+                segmented_alltoallv(comm, as_bytes(send_buff), send.byte_counts, send.byte_displs,
+                                    as_bytes(recv_buff), recv.byte_counts, recv.byte_displs, segment)
+            else:
+                comm.Alltoallv([send_buff, send.counts, send.displs, mpi_dtype], 
+                              [recv_buff, recv.counts, recv.displs, mpi_dtype])
             
+            if auto:
+                return [recv_buff[d:d + c].reshape(_rows_shape(c, row_shape)) for d, c in zip(recv.displs, recv.counts)]
             return recv_buff
         return wrapper
     return decorator
@@ -0,0 +1,72 @@
+import numpy as np
+from mpi4py import MPI
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# (shape, strides, MPI datatype handle, blocks) -> committed view datatype, least recently used first
+_view_dtypes = OrderedDict()
+_MAX_VIEW_DTYPES = 64
+
+def _block_datatype(shape: Tuple[int, ...], strides: Tuple[int, ...], mpi_dtype: MPI.Datatype) -> MPI.Datatype:
+    """
+    Uncommitted datatype of the elements of a strided view, in C order: a
+    contiguous run for each dimension whose stride continues the one inside
+    it, a vector for a dimension striding over whole inner blocks (like a
+    column block of a C-ordered matrix) and an hvector for any other stride.
+    """
+    datatype, owned = mpi_dtype, False
+    for n, stride in zip(reversed(shape), reversed(strides)):
+        extent = datatype.Get_extent()[1]
+        if stride == extent:
+            inner = datatype.Create_contiguous(n)
+        elif stride % extent == 0:
+            inner = datatype.Create_vector(n, 1, stride // extent)
+        else:
+            inner = datatype.Create_hvector(n, 1, stride)
+        if owned:
+            datatype.Free()
+        datatype, owned = inner, True
+    return datatype
+
+def _view_datatype(array: np.ndarray, mpi_dtype: MPI.Datatype, blocks: int) -> MPI.Datatype:
+    """
+    Committed datatype describing one of blocks equal slices along the first
+    axis of a strided view, resized so consecutive blocks follow each other.
+    Built once per layout and cached; the least recently used datatype is
+    freed once more than _MAX_VIEW_DTYPES layouts are cached. Freeing does not
+    affect communication still using it.
+    """
+    key = (array.shape, array.strides, mpi_dtype.py2f(), blocks)
+    datatype = _view_dtypes.get(key)
+    if datatype is not None:
+        _view_dtypes.move_to_end(key)
+        return datatype
+    
+    rows = array.shape[0] // blocks
+    block = _block_datatype((rows,) + array.shape[1:], array.strides, mpi_dtype)
+    resized = block.Create_resized(0, rows * array.strides[0])
+    block.Free()
+    datatype = _view_dtypes[key] = resized.Commit()
+    if len(_view_dtypes) > _MAX_VIEW_DTYPES:
+        _, evicted = _view_dtypes.popitem(last=False)
+        evicted.Free()
+    return datatype
+
+def buffer_spec(array: Optional[np.ndarray], mpi_dtype: MPI.Datatype, blocks: int = 1) -> Optional[List]:
+    """
+    MPI buffer specification of an array to send, split into blocks equal
+    parts along its first axis (one per process for scatters and
+    all-to-all). Strided views (column slices, transposes, subarrays of a
+    larger grid) are described with a derived datatype over their own memory
+    instead of being copied. Views with negative strides are copied.
+    """
+    if array is None:
+        return None
+    if not isinstance(array, np.ndarray) or array.flags.c_contiguous:
+        return [array, mpi_dtype]
+    if array.ndim == 0 or array.size == 0 or min(array.strides) < 0 or array.shape[0] % blocks:
+        return [np.ascontiguousarray(array), mpi_dtype]
+    span = sum((n - 1) * stride for n, stride in zip(array.shape, array.strides)) + array.dtype.itemsize
+    memory = MPI.buffer.fromaddress(array.ctypes.data, span, readonly=not array.flags.writeable)
+    # Scatters and all-to-all take the count per process, so it is always one block
+    return [memory, 1, _view_datatype(array, mpi_dtype, blocks)]
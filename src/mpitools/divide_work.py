@@ -1,6 +1,14 @@
+from __future__ import annotations
+
+import numpy as np
+from mpi4py import MPI
 from mpi4py.MPI import Comm, COMM_WORLD
 from collections.abc import Callable
 from functools import wraps
+from typing import Any
+from mpitools.base import abort_on_error
+
+_schedules = ('static', 'dynamic', 'guided')
 
 # MPI tools for dividing work among processes
 def eval_on_main(comm: Comm = COMM_WORLD) -> Callable:
@@ -121,4 +129,110 @@ def eval_on_select(process_ranks: list[int], comm: Comm = COMM_WORLD) -> Callabl
             else:
                 return None
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+# Self-scheduling loop over an index range
+def parallel_for(n: int, body: Callable[[int], Any], schedule: str = 'dynamic', chunk: int | None = None, comm: Comm = COMM_WORLD) -> dict[int, Any]:
+    """
+    Execute body(i) for i in range(n), distributing iterations over all processes.
+    
+    Parameters
+    ----------
+    n : int
+        Number of loop iterations.
+    body : Callable
+        Function called with each iteration index.
+    schedule : str, optional
+        Scheduling strategy. Defaults to 'dynamic'.
+        'static': chunks of size chunk are assigned round-robin by rank, without communication.
+        'dynamic': each process claims the next chunk of size chunk when it becomes free.
+        'guided': like 'dynamic', but chunks start large and shrink as the loop drains,
+        never below chunk.
+    chunk : int, optional
+        Chunk size. Defaults to ceil(n / size) for 'static' and 1 otherwise.
+    comm : MPI.Comm, optional
+        MPI communicator. Defaults to COMM_WORLD.
+    
+    Returns
+    -------
+    dict[int, Any]
+        Mapping from iteration index to body result for the iterations executed on this process.
+    
+    Notes
+    -----
+    Must be called by all processes. All processes, including rank 0, execute iterations.
+    The dynamic and guided schedules claim chunks with an atomic fetch-and-add on a shared counter
+    of claims exposed through an MPI.Win on rank 0, so no messages are exchanged with a manager.
+    Guided chunk k covers ceil(remaining / (2 * size)) iterations, where remaining is the number of
+    iterations left once chunks 0 to k-1 are taken, so chunks shrink geometrically in claim order.
+    With the dynamic and guided schedules, an exception
+    in body prints its traceback and aborts all processes, as with abort_on_error.
+    """
+    if schedule not in _schedules:
+        raise ValueError(f"Invalid schedule: {schedule}. Supported schedules: {list(_schedules)}")
+    if chunk is not None and chunk < 1:
+        raise ValueError(f"chunk must be a positive integer, got {chunk}")
+
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    results = {}
+
+    if schedule == 'static':
+        if chunk is None:
+            chunk = max(1, -(-n // size))
+        for start in range(rank * chunk, n, size * chunk):
+            for i in range(start, min(start + chunk, n)):
+                results[i] = body(i)
+        return results
+
+    if chunk is None:
+        chunk = 1
+
+    # Shared iteration counter lives on rank 0
+    itemsize = np.dtype(np.int64).itemsize
+    win = MPI.Win.Allocate(itemsize if rank == 0 else 0, itemsize, comm=comm)
+    if rank == 0:
+        np.frombuffer(win.tomemory(), dtype=np.int64)[:] = 0
+    comm.Barrier()
+
+    # The other processes keep claiming while one fails, so errors abort the job instead of hanging it
+    body = abort_on_error(comm=comm)(body)
+    win.Lock_all()
+    for start, stop in _claim_chunks(win, n, size, schedule, chunk):
+        for i in range(start, stop):
+            results[i] = body(i)
+    win.Unlock_all()
+    win.Free()
+    return results
+
+def _claim_chunks(win: MPI.Win, n: int, size: int, schedule: str, chunk: int):
+    """Yield (start, stop) iteration ranges claimed from the shared counter."""
+    # The counter holds the number of claims made so far, each claim owns one chunk
+    bounds = _guided_bounds(n, size, chunk) if schedule == 'guided' else None
+    one = np.ones(1, dtype=np.int64)
+    claimed = np.empty(1, dtype=np.int64)
+    while True:
+        win.Fetch_and_op(one, claimed, 0, 0, MPI.SUM)
+        win.Flush(0)
+        k = int(claimed[0])
+        if bounds is not None:
+            if k >= len(bounds) - 1:
+                return
+            yield bounds[k], bounds[k + 1]
+        else:
+            start = k * chunk
+            if start >= n:
+                return
+            yield start, min(start + chunk, n)
+
+# Helper function to compute guided chunk boundaries
+def _guided_bounds(n: int, size: int, chunk: int) -> list[int]:
+    """
+    Boundaries of the guided chunks, where each chunk takes half an even share
+    of the iterations remaining at its start, but never less than chunk.
+    """
+    bounds = [0]
+    while bounds[-1] < n:
+        remaining = n - bounds[-1]
+        bounds.append(bounds[-1] + min(remaining, max(chunk, -(-remaining // (2 * size)))))
+    return bounds
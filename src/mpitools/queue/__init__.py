@@ -1,4 +1,6 @@
-from .tasks import Task, TaskResult 
+from .tasks import Task, TaskResult, ObjectRef, SharedRef
+from .results import ResultTable
+from .profiling import QueueProfile
 from .managers import MPIQueue
 
-__all__ = ["Task", "TaskResult", "MPIQueue"]
\ No newline at end of file
+__all__ = ["Task", "TaskResult", "ObjectRef", "SharedRef", "ResultTable", "QueueProfile", "MPIQueue"]
\ No newline at end of file
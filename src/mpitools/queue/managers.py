@@ -1,8 +1,17 @@
-from .tasks import Task, TaskResult
+from __future__ import annotations
+
+from .tasks import Task, TaskResult, ObjectRef, SharedRef
+from .shared import _NodeSharedStore
+from .output import _OutputArray
+from .results import ResultTable, _ResultSlabs
+from .profiling import _Profiler, QueueProfile
+from functools import lru_cache
 from mpi4py import MPI
 from mpi4py.MPI import Comm, COMM_WORLD
 import time
-from typing import List, Optional
+import weakref
+import numpy as np
+from typing import Any, Callable, List, Optional, Tuple
 from enum import Enum
 
 class _MessageTag(Enum):
@@ -10,6 +19,197 @@ class _MessageTag(Enum):
     TASK_ASSIGNMENT = 1
     TASK_RESULT = 2
     SHUTDOWN = 3
+    STORED_TASK_ASSIGNMENT = 4
+    OBJECT_REQUEST = 5
+    OBJECT_REPLY = 6
+    EVICT = 7
+    BATCH_ASSIGNMENT = 8
+    RESULT_DATA = 9
+
+
+@lru_cache(maxsize=None)
+def _slot_names(cls: type) -> tuple:
+    """Names of the __slots__ attributes declared by a class and its bases"""
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(name for name in slots if name not in ('__dict__', '__weakref__'))
+    return tuple(names)
+
+
+def _task_attributes(task: Task) -> dict:
+    """Instance attributes of a task, whether stored in __dict__ or __slots__"""
+    attributes = {name: getattr(task, name) for name in _slot_names(type(task)) if hasattr(task, name)}
+    attributes.update(getattr(task, '__dict__', {}))
+    return attributes
+
+
+def _find_refs(task: Task) -> List[ObjectRef]:
+    """Return the ObjectRefs held by a task, directly or inside a list, tuple or dict attribute"""
+    refs = []
+    for value in _task_attributes(task).values():
+        if isinstance(value, ObjectRef):
+            refs.append(value)
+        elif isinstance(value, (list, tuple)):
+            refs.extend(item for item in value if isinstance(item, ObjectRef))
+        elif isinstance(value, dict):
+            refs.extend(item for item in value.values() if isinstance(item, ObjectRef))
+    return refs
+
+
+def _resolve_refs(task: Task, get: Callable[[ObjectRef | SharedRef], Any]):
+    """Replace the ObjectRefs and SharedRefs held by a task with the objects they reference"""
+    ref_types = (ObjectRef, SharedRef)
+    def resolve(item):
+        return get(item) if isinstance(item, ref_types) else item
+    
+    for name, value in _task_attributes(task).items():
+        if isinstance(value, ref_types):
+            setattr(task, name, get(value))
+        elif isinstance(value, (list, tuple)):
+            if any(isinstance(item, ref_types) for item in value):
+                setattr(task, name, type(value)(resolve(item) for item in value))
+        elif isinstance(value, dict):
+            if any(isinstance(item, ref_types) for item in value.values()):
+                setattr(task, name, {key: resolve(item) for key, item in value.items()})
+
+
+def _is_batchable(task: Task, refs: "_ObjectRefTable") -> bool:
+    """Whether a task can run as part of a vectorized batch"""
+    return (type(task).batch_dtype is not None and task.output_index is None
+            and task.task_id not in refs.handles and task.task_id not in refs.task_deps)
+
+
+def _pop_batch(task_queue: List[Task], start: int, refs: "_ObjectRefTable") -> List[Task]:
+    """Pop the run of consecutive batchable tasks of the same class beginning at start"""
+    cls = type(task_queue[start])
+    stop = start + 1
+    while (stop < len(task_queue) and stop - start < cls.batch_size
+           and type(task_queue[stop]) is cls and _is_batchable(task_queue[stop], refs)):
+        stop += 1
+    batch = task_queue[start:stop]
+    del task_queue[start:stop]
+    return batch
+
+
+def _pack_batch(tasks: List[Task]) -> np.ndarray:
+    """Pack the batch_dtype fields of same-class tasks into a structured array"""
+    dtype = np.dtype(type(tasks[0]).batch_dtype)
+    names = dtype.names
+    return np.array([tuple(getattr(task, name) for name in names) for task in tasks], dtype=dtype)
+
+
+def _store_batch(results: ResultTable, task_ids: List[str], batch_result: TaskResult):
+    """Store the result array of a batch as one row per task"""
+    results.extend(task_ids, list(batch_result.result),
+                   execution_time=batch_result.execution_time / len(task_ids),
+                   worker_rank=batch_result.worker_rank,
+                   completed_at=batch_result.completed_at)
+
+
+def _execute_batch(cls: type, params: np.ndarray, worker_rank: int) -> TaskResult:
+    """Execute a packed batch with one vectorized call"""
+    start_time = time.time()
+    
+    result = np.asarray(cls.execute_batch(params))
+    execution_time = time.time() - start_time
+    if len(result) != len(params):
+        raise ValueError(f"{cls.__name__}.execute_batch returned {len(result)} results for {len(params)} tasks")
+    
+    return TaskResult(
+        task_id=None,
+        result=result,
+        execution_time=execution_time,
+        worker_rank=worker_rank
+    )
+
+
+def _result_layout(task: Task) -> Optional[Tuple[np.dtype, tuple]]:
+    """dtype and shape of a result sent as a raw buffer, None for pickled results"""
+    if task.result_dtype is None or task.output_index is not None:
+        return None
+    shape = task.result_shape
+    if shape is None:
+        raise ValueError(f"{type(task).__name__} sets result_dtype but not result_shape")
+    return np.dtype(task.result_dtype), (shape,) if isinstance(shape, int) else tuple(shape)
+
+
+def _typed_result(value: Any, dtype: np.dtype, shape: tuple) -> np.ndarray:
+    """Convert a task result to a contiguous array of its declared dtype and shape"""
+    array = np.ascontiguousarray(value, dtype=dtype)
+    if array.shape != shape:
+        raise ValueError(f"Task result of shape {array.shape} does not match result_shape {shape}")
+    return array
+
+
+class _ObjectRefTable:
+    """
+    Reference counts for results of submitted tasks, kept by the manager.
+    A result is evictable once no queued or running task depends on it and
+    the user no longer holds its ObjectRef.
+    """
+    
+    def __init__(self):
+        self.handles = {}  # task_id -> weakref to the ObjectRef returned by submit
+        self.dependents = {}  # task_id -> number of unfinished tasks holding the ref
+        self.owners = {}  # task_id -> rank holding the result
+        self.task_deps = {}  # task_id -> task_ids of the refs the task depends on
+    
+    def register(self, ref: ObjectRef):
+        self.handles[ref.task_id] = weakref.ref(ref)
+        self.dependents[ref.task_id] = 0
+    
+    def add_dependent(self, task: Task):
+        """Record the refs a task depends on"""
+        deps = [ref.task_id for ref in _find_refs(task)]
+        if deps:
+            for dep in deps:
+                if dep not in self.dependents:
+                    raise ValueError(f"Task {task.task_id} depends on {dep}, which was not submitted to this queue")
+                self.dependents[dep] += 1
+            self.task_deps[task.task_id] = deps
+    
+    def is_ready(self, task: Task) -> bool:
+        """Whether all results a task depends on have been produced"""
+        return all(dep in self.owners for dep in self.task_deps.get(task.task_id, ()))
+    
+    def set_owners(self, task: Task):
+        """Fill in the owner rank of every ref held by a task"""
+        for ref in _find_refs(task):
+            ref.owner = self.owners[ref.task_id]
+    
+    def completed(self, task_id: str, owner: int) -> List[str]:
+        """
+        Record a finished task. Returns the stored results that became evictable.
+        """
+        evictable = []
+        if task_id in self.handles:
+            self.owners[task_id] = owner
+            handle = self.handles[task_id]()
+            if handle is not None:
+                handle.owner = owner
+            del handle
+            evictable.append(task_id)
+        for dep in self.task_deps.pop(task_id, ()):
+            self.dependents[dep] -= 1
+            evictable.append(dep)
+        return [t for t in evictable if self._is_evictable(t)]
+    
+    def live(self) -> List[str]:
+        """Stored results whose ObjectRef is still held by the user"""
+        return [t for t in self.owners if self.handles[t]() is not None]
+    
+    def evict(self, task_id: str) -> int:
+        """Forget a stored result and return the rank that held it"""
+        del self.handles[task_id]
+        del self.dependents[task_id]
+        return self.owners.pop(task_id)
+    
+    def _is_evictable(self, task_id: str) -> bool:
+        return (task_id in self.owners and self.dependents[task_id] == 0
+                and self.handles[task_id]() is None)
 
 
 class _SerialQueueManager:
@@ -18,27 +218,42 @@ class _SerialQueueManager:
     Used when MPI size is 1.
     """
     
-    def __init__(self, comm: Comm = COMM_WORLD):
+    def __init__(self, comm: Comm = COMM_WORLD, shared: Optional[_NodeSharedStore] = None):
         self.task_queue: List[Task] = []
-        self.completed_results = {}  # task_id -> TaskResult
+        self.completed_results = ResultTable()
+        self.refs = _ObjectRefTable()
+        self.object_store = {}  # task_id -> result of a submitted task
+        self.shared = shared
+        self.output = None  # _OutputArray set by MPIQueue.output_array
+        self.profiler: Optional[_Profiler] = None  # set by MPIQueue when profiling
+        self.result_buffers = {}  # task_id -> caller-provided array for a typed result
     
     def add_task(self, task: Task):
         """Add a task to the queue"""
+        self.refs.add_dependent(task)
         self.task_queue.append(task)
     
     def add_tasks(self, tasks: List[Task]):
         """Add multiple tasks to the queue"""
-        self.task_queue.extend(tasks)
+        for task in tasks:
+            self.add_task(task)
     
-    def run(self, timeout: Optional[float] = None) -> dict:
+    def submit(self, task: Task) -> ObjectRef:
+        """Add a task whose result is kept in the object store and return a reference to it"""
+        ref = ObjectRef(task.task_id)
+        self.refs.register(ref)
+        self.add_task(task)
+        return ref
+    
+    def run(self, timeout: Optional[float] = None) -> ResultTable:
         """
         Run tasks serially on the current process.
         
         Args:
             timeout: Maximum time to wait for all tasks to complete (seconds)
-            
+        
         Returns:
-            Dictionary mapping task_id to TaskResult
+            ResultTable mapping task_id to TaskResult
         """
         start_time = time.time()
         
@@ -46,26 +261,78 @@ class _SerialQueueManager:
             if timeout and (time.time() - start_time) > timeout:
                 break
             
+            # Execute runs of same-class tasks with one vectorized call
+            if _is_batchable(self.task_queue[0], self.refs):
+                batch = _pop_batch(self.task_queue, 0, self.refs)
+                if self.profiler is not None:
+                    start = self.profiler.now()
+                result = _execute_batch(type(batch[0]), _pack_batch(batch), worker_rank=0)
+                if self.profiler is not None:
+                    self.profiler.record('execute', start, {'tasks': len(batch)})
+                _store_batch(self.completed_results, [task.task_id for task in batch], result)
+                del batch
+                continue
+            
             # Execute task directly
             task = self.task_queue.pop(0)
             task.started_at = time.time()
             task_id = task.task_id
             
+            _resolve_refs(task, self._get_object)
             result = self._execute_task(task)
-            self.completed_results[task_id] = result
+            if self.output is not None and task.output_index is not None:
+                self.output.write(task.output_index, result.result)
+                result.result = None
+            if task_id in self.refs.handles:
+                self.object_store[task_id] = result.result
+                result.result = None
+            else:
+                layout = _result_layout(task)
+                if layout is not None:
+                    result.result = self._place_result(task_id, result.result, *layout)
+            self.completed_results.add(result)
             
             # Release task memory after execution
             del task
+            for evicted in self.refs.completed(task_id, owner=0):
+                self.refs.evict(evicted)
+                del self.object_store[evicted]
+        
+        # Results still referenced by the user are returned with the other results
+        for task_id in self.refs.live():
+            self.completed_results.set_result(task_id, self.object_store.pop(task_id))
+        self.object_store.clear()
         
         return self.completed_results
     
+    def _place_result(self, task_id: str, value: Any, dtype: np.dtype, shape: tuple) -> np.ndarray:
+        """Validate a typed result and copy it into its caller-provided buffer, if any"""
+        array = _typed_result(value, dtype, shape)
+        buffer = self.result_buffers.pop(task_id, None)
+        if buffer is None:
+            return array
+        if buffer.dtype != dtype or buffer.shape != shape:
+            raise ValueError(f"Result buffer for {task_id} has {buffer.dtype}{buffer.shape}, expected {dtype}{shape}")
+        buffer[...] = array
+        return buffer
+    
+    def _get_object(self, ref: ObjectRef | SharedRef) -> Any:
+        """Return the object a reference points to"""
+        if isinstance(ref, SharedRef):
+            return self.shared.get(ref)
+        return self.object_store[ref.task_id]
+    
     def _execute_task(self, task: Task) -> TaskResult:
         """Execute a single task and return the result"""
+        if self.profiler is not None:
+            start = self.profiler.now()
         start_time = time.time()
         
         result = task.execute()
         execution_time = time.time() - start_time
         task.completed_at = time.time()
+        if self.profiler is not None:
+            self.profiler.record('execute', start, {'task_id': task.task_id})
         
         return TaskResult(
             task_id=task.task_id,
@@ -81,41 +348,57 @@ class _MPIQueueManager:
     Runs on rank 0 (master process).
     """
     
-    def __init__(self, comm: Comm = COMM_WORLD):
+    def __init__(self, comm: Comm = COMM_WORLD, shared: Optional[_NodeSharedStore] = None):
         self.comm = comm
         self.rank = comm.Get_rank()
         self.size = comm.Get_size()
+        self.shared = shared
         
         if self.rank != 0:
             raise ValueError("QueueManager must run on rank 0")
         
         self.task_queue: List[Task] = []
         self.pending_tasks = {}  # rank -> task_id
-        self.completed_results = {}  # task_id -> TaskResult
+        self.completed_results = ResultTable()
         self.worker_ranks = list(range(1, self.size))
+        self.idle_workers = list(self.worker_ranks)
+        self.refs = _ObjectRefTable()
+        self.profiler: Optional[_Profiler] = None  # set by MPIQueue when profiling
+        self.result_layouts = {}  # rank -> (dtype, shape) of the typed result it will send
+        self.result_buffers = {}  # task_id -> caller-provided array for a typed result
+        self.slabs = _ResultSlabs()
     
     def add_task(self, task: Task):
         """Add a task to the queue"""
+        self.refs.add_dependent(task)
         self.task_queue.append(task)
     
     def add_tasks(self, tasks: List[Task]):
         """Add multiple tasks to the queue"""
-        self.task_queue.extend(tasks)
+        for task in tasks:
+            self.add_task(task)
+    
+    def submit(self, task: Task) -> ObjectRef:
+        """Add a task whose result stays on the worker and return a reference to it"""
+        ref = ObjectRef(task.task_id)
+        self.refs.register(ref)
+        self.add_task(task)
+        return ref
     
-    def run(self, timeout: Optional[float] = None) -> dict:
+    def run(self, timeout: Optional[float] = None) -> ResultTable:
         """
         Run the queue manager, distributing tasks and collecting results.
         
         Args:
             timeout: Maximum time to wait for all tasks to complete (seconds)
-            
+        
         Returns:
-            Dictionary mapping task_id to TaskResult
+            ResultTable mapping task_id to TaskResult
         """
         start_time = time.time()
         
         # Distribute initial tasks to all workers
-        self._distribute_initial_tasks()
+        self._dispatch_tasks()
         
         # Main execution loop - wait for results and send next tasks
         while self.pending_tasks:
@@ -124,42 +407,124 @@ class _MPIQueueManager:
             
             # Wait for any worker to return a result
             status = MPI.Status()
-            result = self.comm.recv(source=MPI.ANY_SOURCE, tag=_MessageTag.TASK_RESULT.value, status=status)
+            if self.profiler is None:
+                result = self.comm.recv(source=MPI.ANY_SOURCE, tag=_MessageTag.TASK_RESULT.value, status=status)
+            else:
+                result = self.profiler.recv(MPI.ANY_SOURCE, _MessageTag.TASK_RESULT.value, status)
             worker_rank = status.Get_source()
             
             # Store the result
             task_id = self.pending_tasks.pop(worker_rank)
-            self.completed_results[task_id] = result
-            
-            # Send next task to this worker if available
-            if self.task_queue:
-                task = self.task_queue.pop(0)
-                task.started_at = time.time()
-                task.worker_rank = worker_rank
-                task_id = task.task_id
-                
-                self.comm.send(task, dest=worker_rank, tag=_MessageTag.TASK_ASSIGNMENT.value)
-                self.pending_tasks[worker_rank] = task_id
+            self.idle_workers.append(worker_rank)
+            if isinstance(task_id, list):
+                # A batch returns the results of all its tasks in one array
+                _store_batch(self.completed_results, task_id, result)
+            else:
+                layout = self.result_layouts.pop(worker_rank, None)
+                if layout is not None:
+                    result.result = self._recv_typed(task_id, worker_rank, *layout)
+                self.completed_results.add(result)
                 
-                # Release task memory after sending
-                del task
+                # Drop stored results nothing refers to anymore
+                for evicted in self.refs.completed(task_id, owner=worker_rank):
+                    owner = self.refs.evict(evicted)
+                    self.comm.send(evicted, dest=owner, tag=_MessageTag.EVICT.value)
+            
+            # Send next tasks to idle workers if available
+            self._dispatch_tasks()
+        
+        # Fetch the stored results the user still holds a reference to
+        if not self.pending_tasks:
+            for task_id in self.refs.live():
+                self.completed_results.set_result(task_id, self._fetch(task_id))
         
         # Shutdown workers
         self._shutdown_workers()
         
         return self.completed_results
     
-    def _distribute_initial_tasks(self):
-        """Distribute initial tasks to all available workers"""
-        for worker_rank in self.worker_ranks:
-            if self.task_queue:
-                task = self.task_queue.pop(0)
-                task.started_at = time.time()
-                task.worker_rank = worker_rank
-                
-                # Send task to worker
-                self.comm.send(task, dest=worker_rank, tag=_MessageTag.TASK_ASSIGNMENT.value)
-                self.pending_tasks[worker_rank] = task.task_id
+    def _dispatch_tasks(self):
+        """Send ready tasks to idle workers"""
+        while self.idle_workers and self.task_queue:
+            task = self._next_ready_task()
+            if task is None:
+                break
+            
+            worker_rank = self.idle_workers.pop(0)
+            if isinstance(task, list):
+                # Only the packed parameters of a batch are sent
+                self._send_task((type(task[0]), _pack_batch(task)), worker_rank, _MessageTag.BATCH_ASSIGNMENT,
+                                {'task_id': task[0].task_id, 'tasks': len(task)})
+                self.pending_tasks[worker_rank] = [t.task_id for t in task]
+                del task
+                continue
+            
+            task.started_at = time.time()
+            task.worker_rank = worker_rank
+            self.refs.set_owners(task)
+            
+            if task.task_id in self.refs.handles:
+                tag = _MessageTag.STORED_TASK_ASSIGNMENT
+            else:
+                tag = _MessageTag.TASK_ASSIGNMENT
+                layout = _result_layout(task)
+                if layout is not None:
+                    self.result_layouts[worker_rank] = layout
+            self._send_task(task, worker_rank, tag, {'task_id': task.task_id})
+            self.pending_tasks[worker_rank] = task.task_id
+            
+            # Release task memory after sending
+            del task
+    
+    def _send_task(self, message: Any, worker_rank: int, tag: _MessageTag, args: dict):
+        """Send a task or batch to a worker, timing the pickling and send when profiling"""
+        if self.profiler is None:
+            self.comm.send(message, dest=worker_rank, tag=tag.value)
+            return
+        start = self.profiler.now()
+        self.comm.send(message, dest=worker_rank, tag=tag.value)
+        self.profiler.record('dispatch', start, dict(args, worker=worker_rank))
+    
+    def _next_ready_task(self) -> Optional[Task | List[Task]]:
+        """
+        Pop the first queued task whose dependencies have completed, together with
+        the tasks following it when it can run as a batch.
+        """
+        for i, task in enumerate(self.task_queue):
+            if self.refs.is_ready(task):
+                if _is_batchable(task, self.refs):
+                    return _pop_batch(self.task_queue, i, self.refs)
+                return self.task_queue.pop(i)
+        return None
+    
+    def _recv_typed(self, task_id: str, worker_rank: int, dtype: np.dtype, shape: tuple) -> np.ndarray:
+        """
+        Receive the raw buffer of a typed result, which follows its TaskResult header,
+        straight into a caller-provided array or a pooled slab.
+        """
+        buffer = self.result_buffers.pop(task_id, None)
+        if buffer is None:
+            buffer = self.slabs.take(dtype, shape)
+        elif buffer.dtype != dtype or buffer.shape != shape:
+            raise ValueError(f"Result buffer for {task_id} has {buffer.dtype}{buffer.shape}, expected {dtype}{shape}")
+        
+        if self.profiler is not None:
+            start = self.profiler.now()
+        status = MPI.Status()
+        message = self.comm.Mprobe(source=worker_rank, tag=_MessageTag.RESULT_DATA.value, status=status)
+        if status.Get_count(MPI.BYTE) != buffer.nbytes:
+            raise ValueError(f"Result of {task_id} has {status.Get_count(MPI.BYTE)} bytes, expected {buffer.nbytes}")
+        message.Recv([buffer, MPI.BYTE])
+        if self.profiler is not None:
+            self.profiler.record('recv', start, {'bytes': buffer.nbytes, 'source': worker_rank,
+                                                 'tag': _MessageTag.RESULT_DATA.value})
+        return buffer
+    
+    def _fetch(self, task_id: str) -> Any:
+        """Fetch a stored result from the worker holding it"""
+        owner = self.refs.owners[task_id]
+        self.comm.send(task_id, dest=owner, tag=_MessageTag.OBJECT_REQUEST.value)
+        return self.comm.recv(source=owner, tag=_MessageTag.OBJECT_REPLY.value)
     
     def _shutdown_workers(self):
         """Send shutdown signals to all workers"""
@@ -173,9 +538,13 @@ class _MPIQueueWorker:
     Runs on worker processes (rank > 0).
     """
     
-    def __init__(self, comm: Comm = COMM_WORLD):
+    def __init__(self, comm: Comm = COMM_WORLD, shared: Optional[_NodeSharedStore] = None):
         self.comm = comm
         self.rank = comm.Get_rank()
+        self.object_store = {}  # task_id -> result of a submitted task
+        self.shared = shared
+        self.output = None  # _OutputArray set by MPIQueue.output_array
+        self.profiler: Optional[_Profiler] = None  # set by MPIQueue when profiling
         
         if self.rank == 0:
             raise ValueError("Worker cannot run on rank 0")
@@ -183,26 +552,102 @@ class _MPIQueueWorker:
     def run(self):
         """Main worker loop - wait for tasks and execute them"""
         while True:
-            # Wait for a message from manager
+            # Wait for a message from the manager or an object request from another worker
             status = MPI.Status()
-            message = self.comm.recv(source=0, tag=MPI.ANY_TAG, status=status)
+            if self.profiler is None:
+                message = self.comm.recv(source=MPI.ANY_SOURCE, tag=MPI.ANY_TAG, status=status)
+            else:
+                message = self.profiler.recv(MPI.ANY_SOURCE, MPI.ANY_TAG, status)
+            tag = status.Get_tag()
             
-            if status.Get_tag() == _MessageTag.SHUTDOWN.value:
+            if tag == _MessageTag.SHUTDOWN.value:
                 break
-            elif status.Get_tag() == _MessageTag.TASK_ASSIGNMENT.value:
+            elif tag in (_MessageTag.TASK_ASSIGNMENT.value, _MessageTag.STORED_TASK_ASSIGNMENT.value):
                 task = message
+                _resolve_refs(task, self._get_object)
                 result = self._execute_task(task)
                 
+                # Write straight into the output array, only report completion
+                if self.output is not None and task.output_index is not None:
+                    self.output.write(task.output_index, result.result)
+                    result.result = None
+                
+                # Keep submitted results locally, only report completion
+                if tag == _MessageTag.STORED_TASK_ASSIGNMENT.value:
+                    self.object_store[task.task_id] = result.result
+                    result.result = None
+                    layout = None
+                else:
+                    layout = _result_layout(task)
+                
                 # Send result back to manager
-                self.comm.send(result, dest=0, tag=_MessageTag.TASK_RESULT.value)
+                self._send_result(result, layout)
+            elif tag == _MessageTag.BATCH_ASSIGNMENT.value:
+                cls, params = message
+                if self.profiler is not None:
+                    start = self.profiler.now()
+                result = _execute_batch(cls, params, worker_rank=self.rank)
+                if self.profiler is not None:
+                    self.profiler.record('execute', start, {'tasks': len(params)})
+                self._send_result(result)
+            elif tag == _MessageTag.OBJECT_REQUEST.value:
+                self._serve_object(message, status.Get_source())
+            elif tag == _MessageTag.EVICT.value:
+                self.object_store.pop(message, None)
+        
+        self.object_store.clear()
+    
+    def _send_result(self, result: TaskResult, layout: Optional[Tuple[np.dtype, tuple]] = None):
+        """
+        Send a result to the manager, timing the pickling and send when profiling.
+        A typed result (layout given) is sent as a small header followed by its raw buffer.
+        """
+        data = None
+        if layout is not None:
+            data = _typed_result(result.result, *layout)
+            result.result = None
+        
+        if self.profiler is not None:
+            start = self.profiler.now()
+        self.comm.send(result, dest=0, tag=_MessageTag.TASK_RESULT.value)
+        if data is not None:
+            self.comm.Send([data, MPI.BYTE], dest=0, tag=_MessageTag.RESULT_DATA.value)
+        if self.profiler is not None:
+            self.profiler.record('send', start)
+    
+    def _serve_object(self, task_id: str, dest: int):
+        """Send a stored result to the rank that requested it"""
+        self.comm.send(self.object_store[task_id], dest=dest, tag=_MessageTag.OBJECT_REPLY.value)
+    
+    def _get_object(self, ref: ObjectRef | SharedRef) -> Any:
+        """Return the object a reference points to, fetching it from its owner if needed"""
+        if isinstance(ref, SharedRef):
+            return self.shared.get(ref)
+        if ref.owner == self.rank:
+            return self.object_store[ref.task_id]
+        
+        self.comm.send(ref.task_id, dest=ref.owner, tag=_MessageTag.OBJECT_REQUEST.value)
+        
+        # Keep serving requests while waiting, the owner may be waiting on us
+        status = MPI.Status()
+        while not self.comm.iprobe(source=ref.owner, tag=_MessageTag.OBJECT_REPLY.value):
+            if self.comm.iprobe(source=MPI.ANY_SOURCE, tag=_MessageTag.OBJECT_REQUEST.value, status=status):
+                source = status.Get_source()
+                task_id = self.comm.recv(source=source, tag=_MessageTag.OBJECT_REQUEST.value)
+                self._serve_object(task_id, source)
+        return self.comm.recv(source=ref.owner, tag=_MessageTag.OBJECT_REPLY.value)
     
     def _execute_task(self, task: Task) -> TaskResult:
         """Execute a single task and return the result"""
+        if self.profiler is not None:
+            start = self.profiler.now()
         start_time = time.time()
         
         result = task.execute()
         execution_time = time.time() - start_time
         task.completed_at = time.time()
+        if self.profiler is not None:
+            self.profiler.record('execute', start, {'task_id': task.task_id})
         
         return TaskResult(
             task_id=task.task_id,
@@ -217,21 +662,35 @@ class MPIQueue:
     Interface for the MPI queue system.
     Automatically determines whether to run as manager or worker based on rank.
     If running on a single process (size 1), uses serial execution.
+    
+    With profile=True every process records a timeline of dispatch, waiting,
+    message transfer and execution during run(). The QueueProfile is available
+    as the profile attribute on rank 0 afterwards. When profiling is disabled
+    the only overhead is a None check at each recording point.
+    
+    Arrays placed in shared memory with share() live until close() is called
+    on all processes, so results that are views of them stay valid after
+    run(). Using the queue as a context manager closes it on exit.
     """
     
-    def __init__(self, comm: Comm = COMM_WORLD):
+    def __init__(self, comm: Comm = COMM_WORLD, profile: bool = False):
         self.comm = comm
         self.rank = comm.Get_rank()
         self.size = comm.Get_size()
         self.manager = None
         self.worker = None
+        self.shared = _NodeSharedStore(comm)
+        self.output = None
+        self.profiler = _Profiler(comm) if profile else None
+        self.profile: Optional[QueueProfile] = None
         
         if self.size == 1:
-            self.manager = _SerialQueueManager(comm)
+            self.manager = _SerialQueueManager(comm, self.shared)
         elif self.rank == 0:
-            self.manager = _MPIQueueManager(comm)
+            self.manager = _MPIQueueManager(comm, self.shared)
         else:
-            self.worker = _MPIQueueWorker(comm)
+            self.worker = _MPIQueueWorker(comm, self.shared)
+        (self.manager or self.worker).profiler = self.profiler
     
     def add_task(self, task: Task):
         """Add a task to the queue (only valid on manager)"""
@@ -245,18 +704,133 @@ class MPIQueue:
             raise RuntimeError("Tasks can only be added on the manager process (rank 0)")
         self.manager.add_tasks(tasks)
     
-    def run(self, timeout: Optional[float] = None) -> dict[str, TaskResult]:
+    def submit(self, task: Task) -> ObjectRef:
+        """
+        Add a task to the queue and return a reference to its result (only valid on manager).
+        
+        The result stays in the object store of the worker that executed the task.
+        Tasks holding the reference as an attribute (directly, or in a list, tuple or
+        dict attribute) run after it completes and receive the result in its place,
+        fetched directly from the owning worker. A stored result is evicted once no
+        pending task depends on it and the reference has been garbage collected;
+        results still referenced when run() finishes are fetched to rank 0.
+        
+        Returns:
+            ObjectRef to the task result
+        """
+        if self.rank != 0:
+            raise RuntimeError("Tasks can only be added on the manager process (rank 0)")
+        return self.manager.submit(task)
+    
+    def share(self, key: str, array: Optional[np.ndarray] = None) -> SharedRef:
+        """
+        Place a read-only array in node-local shared memory (collective, call on all processes).
+        
+        The array passed on rank 0 is sent once to each node and stored in a window
+        allocated with MPI.Win.Allocate_shared. Tasks holding the returned SharedRef as
+        an attribute receive a zero-copy read-only view of the node copy in its place,
+        so the array is never pickled into individual tasks. Shared arrays stay alive
+        across run() calls and are released by close().
+        
+        Args:
+            key: Unique name of the shared array
+            array: The array to share (only used on rank 0)
+        
+        Returns:
+            SharedRef to the shared array
+        """
+        return self.shared.share(key, array)
+    
+    def output_array(self, shape: int | tuple[int, ...], dtype: np.dtype) -> Optional[np.ndarray]:
+        """
+        Create the global output array of the queue (collective, call on all processes).
+        
+        Tasks with an output_index write their result straight into the selected rows of
+        this array instead of returning it: workers Put the data into rank 0's memory
+        through an MPI.Win and report only completion, so no result payload passes
+        through the manager. Their TaskResult.result is None. The array is complete
+        when run() returns.
+        
+        Args:
+            shape: Shape of the output array, rows are indexed along the first axis
+            dtype: Data type of the output array
+        
+        Returns:
+            The output array on rank 0, None on workers
+        """
+        self.output = _OutputArray(shape, dtype, self.comm)
+        (self.manager or self.worker).output = self.output
+        return self.output.array
+    
+    def set_result_buffer(self, task_id: str, buffer: np.ndarray):
+        """
+        Receive the result of a typed task straight into buffer (only valid on manager).
+        
+        Tasks that set result_dtype and result_shape send their result as a raw
+        buffer after a small header. The manager matches it with Mprobe and receives
+        it with Mrecv into buffer, without pickling or an extra copy; results without
+        a registered buffer land in pooled slabs. The buffer becomes the task's
+        TaskResult.result.
+        
+        Args:
+            task_id: Identifier of a task with result_dtype set
+            buffer: Writeable C-contiguous array with the task's result dtype and shape
+        """
+        if self.rank != 0:
+            raise RuntimeError("Results are only available on the manager process (rank 0)")
+        if not (buffer.flags.c_contiguous and buffer.flags.writeable):
+            raise ValueError("Result buffers must be writeable and C-contiguous")
+        self.manager.result_buffers[task_id] = buffer
+    
+    def get(self, ref: ObjectRef) -> Any:
+        """
+        Return the result referenced by an ObjectRef after run() (only valid on manager).
+        """
+        if self.rank != 0:
+            raise RuntimeError("Results are only available on the manager process (rank 0)")
+        return self.manager.completed_results[ref.task_id].result
+    
+    def run(self, timeout: Optional[float] = None) -> Optional[ResultTable]:
         """
         Run the queue system.
         
         For manager (rank 0): distributes tasks and returns results
         For workers (rank > 0): executes tasks until shutdown
         
+        When profiling, the timeline of the run is stored in self.profile on rank 0.
+        
         Returns:
-            Dictionary of results indexed by task_id (only on manager), None on workers
+            ResultTable of results indexed by task_id (only on manager), None on workers.
+            This is a read-only mapping rather than a dict: item assignment and deletion
+            are not supported, use results.to_dict() where a plain dict is needed.
         """
+        if self.output is not None and self.size > 1:
+            self.output.open()
+        if self.profiler is not None:
+            self.profiler.start()
         if self.rank == 0:
-            return self.manager.run(timeout)
+            results = self.manager.run(timeout)
         else:
             self.worker.run()
-            return None
+            results = None
+        if self.profiler is not None:
+            self.profile = self.profiler.collect()
+        if self.output is not None and self.size > 1:
+            self.output.close()
+        return results
+    
+    def close(self):
+        """
+        Release the shared arrays of the queue (collective, call on all processes).
+        
+        Views of shared arrays, including task results that are slices of them,
+        must not be used afterwards.
+        """
+        self.shared.free()
+    
+    def __enter__(self) -> MPIQueue:
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from mpitools.comms.utils import to_mpi_dtype
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD
+import numpy as np
+from typing import Tuple
+
+class _OutputArray:
+    """
+    Global output array owned by rank 0 and exposed to workers through an MPI.Win.
+    Workers write task results straight into their rows with Put, so result
+    payloads never pass through the manager.
+    """
+    
+    def __init__(self, shape: int | Tuple[int, ...], dtype: np.dtype, comm: Comm = COMM_WORLD):
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        if isinstance(shape, int):
+            shape = (shape,)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.mpi_dtype = to_mpi_dtype(self.dtype)
+        self.row_size = int(np.prod(self.shape[1:], dtype=np.int64))
+        
+        self.array = np.zeros(self.shape, dtype=self.dtype) if self.rank == 0 else None
+        self.win = None
+    
+    def open(self):
+        """Expose the array for the duration of a run (collective)"""
+        self.win = MPI.Win.Create(self.array, self.dtype.itemsize, comm=self.comm)
+        if self.rank != 0:
+            self.win.Lock_all()
+    
+    def close(self):
+        """Complete all writes and release the window (collective)"""
+        if self.rank != 0:
+            self.win.Unlock_all()
+        self.win.Free()
+        self.win = None
+    
+    def write(self, index: int | slice, value):
+        """Write value into the rows selected by index"""
+        start, stop = self._rows(index)
+        count = (stop - start) * self.row_size
+        value = np.ascontiguousarray(value, dtype=self.dtype)
+        if value.size != count:
+            raise ValueError(f"Result of size {value.size} does not fit output rows {start}:{stop} of {self.shape}")
+        
+        if self.rank == 0:
+            self.array[start:stop] = value.reshape((stop - start,) + self.shape[1:])
+        else:
+            # Flush so the data has landed before the completion record is sent
+            self.win.Put([value, self.mpi_dtype], 0, target=(start * self.row_size, count, self.mpi_dtype))
+            self.win.Flush(0)
+    
+    def _rows(self, index: int | slice) -> Tuple[int, int]:
+        """Convert an output_index into a (start, stop) row range"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.shape[0])
+            if step != 1:
+                raise ValueError("output_index slices must have step 1")
+            return start, max(start, stop)
+        index = int(index)
+        if index < 0:
+            index += self.shape[0]
+        if not 0 <= index < self.shape[0]:
+            raise IndexError(f"output_index {index} out of range for output of shape {self.shape}")
+        return index, index + 1
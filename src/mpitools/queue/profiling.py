@@ -0,0 +1,217 @@
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD
+import json
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+# Tag of the clock synchronization messages exchanged by _Profiler.start
+_SYNC_TAG = 99
+
+# Round trips with rank 0 used to estimate the clock offset of a process
+_SYNC_ROUNDS = 10
+
+class _Profiler:
+    """
+    Records timed spans of queue activity on one process.
+    Timestamps come from time.perf_counter and are taken relative to the start
+    time of rank 0, corrected by the offset of each process's clock from the
+    clock of rank 0, so the timelines of all processes line up.
+    """
+
+    def __init__(self, comm: Comm = COMM_WORLD):
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        self.events = []  # (name, start, end, args)
+        self.t0 = 0.0
+
+    def start(self):
+        """Synchronize the start time of all processes (collective)"""
+        self.events = []
+        offset = self._clock_offset()
+        t0 = self.comm.bcast(time.perf_counter() if self.rank == 0 else None, root=0)
+        self.t0 = t0 - offset
+
+    def _clock_offset(self) -> float:
+        """
+        Offset of the clock of rank 0 from the clock of this process, from
+        ping-pongs with rank 0. Rank 0 timestamps each reply, and the round trip
+        with the smallest delay gives the estimate, assumed halfway through it,
+        with an error of at most half that delay.
+        """
+        stamp = np.zeros(1)
+        if self.rank == 0:
+            for rank in range(1, self.comm.Get_size()):
+                for _ in range(_SYNC_ROUNDS):
+                    self.comm.Recv([stamp, MPI.DOUBLE], source=rank, tag=_SYNC_TAG)
+                    stamp[0] = time.perf_counter()
+                    self.comm.Send([stamp, MPI.DOUBLE], dest=rank, tag=_SYNC_TAG)
+            return 0.0
+        best, offset = float('inf'), 0.0
+        for _ in range(_SYNC_ROUNDS):
+            sent = time.perf_counter()
+            self.comm.Send([stamp, MPI.DOUBLE], dest=0, tag=_SYNC_TAG)
+            self.comm.Recv([stamp, MPI.DOUBLE], source=0, tag=_SYNC_TAG)
+            received = time.perf_counter()
+            if received - sent < best:
+                best, offset = received - sent, stamp[0] - (sent + received) / 2
+        return offset
+
+    def now(self) -> float:
+        """Seconds since start()"""
+        return time.perf_counter() - self.t0
+
+    def record(self, name: str, start: float, args: Optional[dict] = None):
+        """Record a span that began at start and ends now"""
+        self.events.append((name, start, self.now(), args))
+
+    def recv(self, source: int, tag: int, status: MPI.Status) -> Any:
+        """
+        Receive a pickled message, recording the time spent waiting for it
+        separately from the time spent receiving and unpickling it.
+        """
+        start = self.now()
+        message = self.comm.mprobe(source=source, tag=tag, status=status)
+        self.record('wait', start)
+
+        start = self.now()
+        obj = message.recv()
+        self.record('recv', start, {'bytes': status.Get_count(), 'source': status.Get_source(),
+                                    'tag': status.Get_tag()})
+        return obj
+
+    def collect(self) -> Optional["QueueProfile"]:
+        """Gather the events of all processes (collective). Returns the profile on rank 0."""
+        events = self.comm.gather(self.events, root=0)
+        self.events = []
+        if self.rank != 0:
+            return None
+        return QueueProfile(events)
+
+
+class QueueProfile:
+    """
+    Timeline of one MPIQueue run, collected on rank 0 when the queue is
+    created with profile=True.
+
+    Each process records spans named:
+        dispatch: manager pickling and sending a task or batch to a worker
+        wait: waiting for the next message (idle time)
+        recv: receiving and unpickling a message, with its size in bytes
+        execute: running a task or batch
+        send: worker pickling and sending a result to the manager
+
+    attributes:
+        events: Per-rank lists of (name, start, end, args) tuples, times in
+            seconds since the synchronized start of the run.
+    """
+
+    def __init__(self, events: List[List[tuple]]):
+        self.events = events
+
+    @property
+    def wall_time(self) -> float:
+        """Time from the start of the run to the last recorded event"""
+        return max((end for rank_events in self.events for _, _, end, _ in rank_events), default=0.0)
+
+    def workers(self) -> List[int]:
+        """Ranks that executed tasks"""
+        return [0] if len(self.events) == 1 else list(range(1, len(self.events)))
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        Return the timeline in Chrome trace event format, with one lane per rank.
+        Open the saved JSON in chrome://tracing or https://ui.perfetto.dev.
+        """
+        trace = []
+        for rank, rank_events in enumerate(self.events):
+            lane = "manager" if rank == 0 and len(self.events) > 1 else f"worker {rank}"
+            trace.append({"name": "thread_name", "ph": "M", "pid": 0, "tid": rank,
+                          "args": {"name": lane}})
+            for name, start, end, args in rank_events:
+                event = {"name": name, "cat": "queue", "ph": "X", "pid": 0, "tid": rank,
+                         "ts": start * 1e6, "dur": (end - start) * 1e6}
+                if args:
+                    event["args"] = args
+                trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str):
+        """Write the Chrome trace JSON timeline to path"""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize utilization and load imbalance of the run.
+
+        Returns:
+            dict with the wall time, per-worker busy/idle/communication time,
+            task count and utilization, the mean utilization, the load imbalance
+            (max busy time over mean busy time, minus one), dispatch latency
+            statistics (from the manager starting to send a task to the worker
+            starting to run it), manager time per activity and the total bytes
+            received by workers and by the manager.
+        """
+        wall = self.wall_time
+        totals = [self._totals(rank_events) for rank_events in self.events]
+
+        workers = {}
+        for rank in self.workers():
+            t = totals[rank]
+            workers[rank] = {
+                "busy": t.get("execute", 0.0),
+                "idle": t.get("wait", 0.0),
+                "communication": t.get("recv", 0.0) + t.get("send", 0.0),
+                "tasks": sum((args or {}).get("tasks", 1) for name, _, _, args in self.events[rank]
+                             if name == "execute"),
+                "utilization": t.get("execute", 0.0) / wall if wall > 0 else 0.0,
+            }
+
+        busy = np.array([w["busy"] for w in workers.values()])
+        utilization = np.array([w["utilization"] for w in workers.values()])
+        latency = self._dispatch_latency()
+
+        return {
+            "wall_time": wall,
+            "workers": workers,
+            "mean_utilization": float(utilization.mean()) if len(utilization) else 0.0,
+            "load_imbalance": float(busy.max() / busy.mean() - 1.0) if len(busy) and busy.mean() > 0 else 0.0,
+            "dispatch_latency": {
+                "min": float(latency.min()) if len(latency) else 0.0,
+                "mean": float(latency.mean()) if len(latency) else 0.0,
+                "median": float(np.median(latency)) if len(latency) else 0.0,
+                "max": float(latency.max()) if len(latency) else 0.0,
+            },
+            "manager": {name: totals[0].get(name, 0.0) for name in ("dispatch", "wait", "recv")},
+            "bytes_to_workers": sum(self._bytes(self.events[rank]) for rank in self.workers()),
+            "bytes_to_manager": self._bytes(self.events[0]) if len(self.events) > 1 else 0,
+        }
+
+    def _dispatch_latency(self) -> np.ndarray:
+        """
+        Delay between each dispatch and the start of its execution. A worker runs
+        one task or batch at a time, so the nth dispatch to a worker is its nth execute.
+        """
+        if len(self.events) == 1:
+            return np.zeros(0)
+        dispatched = {}
+        for name, start, _, args in self.events[0]:
+            if name == "dispatch":
+                dispatched.setdefault(args["worker"], []).append(start)
+        latency = []
+        for rank in self.workers():
+            starts = [start for name, start, _, _ in self.events[rank] if name == "execute"]
+            latency.extend(s - d for d, s in zip(dispatched.get(rank, []), starts))
+        return np.array(latency)
+
+    @staticmethod
+    def _totals(events: List[tuple]) -> Dict[str, float]:
+        totals = {}
+        for name, start, end, _ in events:
+            totals[name] = totals.get(name, 0.0) + (end - start)
+        return totals
+
+    @staticmethod
+    def _bytes(events: List[tuple]) -> int:
+        return sum(args["bytes"] for name, _, _, args in events if name == "recv")
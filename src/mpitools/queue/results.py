@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from .tasks import TaskResult
+from collections.abc import Mapping
+import numpy as np
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+class ResultTable(Mapping):
+    """
+    Columnar store of completed task results, kept by the manager.
+    Metadata (execution_time, worker_rank, completed_at) is held in NumPy arrays
+    and payloads in a separate list, so no TaskResult object is kept per task
+    until it is looked up.
+    Behaves as a read-only mapping of task_id to TaskResult. Unlike the plain
+    dict returned by earlier versions of MPIQueue.run(), it does not support
+    item assignment or deletion; use to_dict() for a mutable copy. A TaskResult
+    is built on first access and cached, so repeated lookups return the same
+    object and changes made to it are kept.
+
+    attributes:
+        task_ids: Task identifiers in completion order.
+        execution_time: Execution time of each task in seconds.
+        worker_rank: Rank of the worker that executed each task.
+        completed_at: Timestamp when each task was completed.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self._rows = {}  # task_id -> row
+        self._task_ids = []
+        self._payloads = []
+        self._built = {}  # row -> TaskResult handed out by a lookup
+        self._execution_time = np.empty(capacity, dtype=np.float64)
+        self._worker_rank = np.empty(capacity, dtype=np.int32)
+        self._completed_at = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+    
+    def add(self, result: TaskResult):
+        """Add a single result"""
+        self.extend([result.task_id], [result.result], result.execution_time,
+                    result.worker_rank, result.completed_at)
+    
+    def extend(self, task_ids: Sequence[str], payloads: Sequence[Any], execution_time,
+               worker_rank, completed_at):
+        """
+        Add the results of several tasks at once. Metadata arguments may be
+        scalars (shared by all tasks) or arrays with one value per task.
+        """
+        n = len(task_ids)
+        start = self._size
+        self._reserve(start + n)
+        self._execution_time[start:start + n] = execution_time
+        self._worker_rank[start:start + n] = worker_rank
+        self._completed_at[start:start + n] = completed_at
+        
+        for i, (task_id, payload) in enumerate(zip(task_ids, payloads)):
+            row = self._rows.get(task_id)
+            if row is None:
+                self._rows[task_id] = self._size
+                self._task_ids.append(task_id)
+                self._payloads.append(payload)
+                if self._size != start + i:
+                    self._copy_row(start + i, self._size)
+                self._size += 1
+            else:
+                # A repeated task_id replaces the earlier result
+                self._payloads[row] = payload
+                self._built.pop(row, None)
+                self._copy_row(start + i, row)
+    
+    def set_result(self, task_id: str, result: Any):
+        """Replace the payload of a completed task"""
+        row = self._rows[task_id]
+        self._payloads[row] = result
+        if row in self._built:
+            self._built[row].result = result
+    
+    @property
+    def task_ids(self) -> List[str]:
+        return list(self._task_ids)
+    
+    @property
+    def execution_time(self) -> np.ndarray:
+        return self._execution_time[:self._size]
+    
+    @property
+    def worker_rank(self) -> np.ndarray:
+        return self._worker_rank[:self._size]
+    
+    @property
+    def completed_at(self) -> np.ndarray:
+        return self._completed_at[:self._size]
+    
+    def per_worker_totals(self) -> dict[int, dict[str, float]]:
+        """
+        Number of tasks and total execution time per worker rank.
+        
+        Returns:
+            Dictionary mapping worker rank to {'tasks': count, 'execution_time': seconds}
+        """
+        if self._size == 0:
+            return {}
+        ranks = self.worker_rank
+        offset = int(ranks.min())
+        counts = np.bincount(ranks - offset)
+        totals = np.bincount(ranks - offset, weights=self.execution_time)
+        return {int(r) + offset: {'tasks': int(counts[r]), 'execution_time': float(totals[r])}
+                for r in np.flatnonzero(counts)}
+    
+    def slowest(self, n: int = 10) -> List[TaskResult]:
+        """Return the n tasks with the longest execution time, slowest first"""
+        n = min(n, self._size)
+        if n == 0:
+            return []
+        rows = np.argpartition(-self.execution_time, n - 1)[:n]
+        rows = rows[np.argsort(-self.execution_time[rows], kind='stable')]
+        return [self._get(int(row)) for row in rows]
+    
+    def to_dict(self) -> dict[str, TaskResult]:
+        """Return the results as a plain dictionary of task_id to TaskResult"""
+        return {task_id: self._get(row) for row, task_id in enumerate(self._task_ids)}
+    
+    def __getitem__(self, task_id: str) -> TaskResult:
+        return self._get(self._rows[task_id])
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._task_ids)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._rows
+    
+    def _get(self, row: int) -> TaskResult:
+        result = self._built.get(row)
+        if result is None:
+            result = self._built[row] = self._build(row)
+        return result
+    
+    def _build(self, row: int) -> TaskResult:
+        result = TaskResult(task_id=self._task_ids[row], result=self._payloads[row],
+                            execution_time=float(self._execution_time[row]),
+                            worker_rank=int(self._worker_rank[row]))
+        result.completed_at = float(self._completed_at[row])
+        return result
+    
+    def _copy_row(self, source: int, dest: int):
+        self._execution_time[dest] = self._execution_time[source]
+        self._worker_rank[dest] = self._worker_rank[source]
+        self._completed_at[dest] = self._completed_at[source]
+    
+    def _reserve(self, capacity: int):
+        """Grow the metadata arrays geometrically to hold at least capacity rows"""
+        if capacity <= len(self._execution_time):
+            return
+        new_capacity = max(capacity, 2 * len(self._execution_time))
+        for name in ('_execution_time', '_worker_rank', '_completed_at'):
+            old = getattr(self, name)
+            new = np.empty(new_capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+    
+    def __repr__(self):
+        return f"ResultTable({self._size} results)"
+
+
+
+class _ResultSlabs:
+    """
+    Pool of preallocated slabs that typed task results are received into.
+    Results of the same dtype and shape are handed out as consecutive rows of
+    one slab, so receiving many of them costs one allocation per slab instead
+    of one per result. A slab is freed once none of its results is referenced.
+    """
+    
+    def __init__(self, rows: int = 64, slab_bytes: int = 16 * 1024**2):
+        self.rows = rows
+        self.slab_bytes = slab_bytes
+        self._slabs: Dict[Tuple[np.dtype, tuple], Tuple[np.ndarray, int]] = {}  # layout -> (slab, next row)
+    
+    def take(self, dtype: np.dtype, shape: tuple) -> np.ndarray:
+        """Return an uninitialized array of the given dtype and shape"""
+        key = (dtype, shape)
+        slab, row = self._slabs.get(key, (None, 0))
+        if slab is None or row == len(slab):
+            nbytes = max(dtype.itemsize * int(np.prod(shape, dtype=np.int64)), 1)
+            rows = max(1, min(self.rows, self.slab_bytes // nbytes))
+            slab, row = np.empty((rows,) + shape, dtype=dtype), 0
+        self._slabs[key] = (slab, row + 1)
+        return slab[row]
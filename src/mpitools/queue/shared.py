@@ -0,0 +1,54 @@
+from .tasks import SharedRef
+from mpitools.comms.shared_collective import _shared_bcast
+from mpitools.comms.segmented import as_bytes, segment_bytes
+from mpi4py import MPI
+from mpi4py.MPI import Comm, COMM_WORLD
+import numpy as np
+from typing import Optional
+
+class _NodeSharedStore:
+    """
+    Read-only arrays shared by all processes of a node through MPI.Win.Allocate_shared.
+    Each array is transferred once per node (among node leaders) and every process
+    holds a zero-copy view of the node's copy.
+    """
+    
+    def __init__(self, comm: Comm = COMM_WORLD):
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        self.arrays = {}  # key -> read-only view of the node copy
+        self.windows = {}  # key -> SharedArray owning the node copy
+    
+    def share(self, key: str, array: Optional[np.ndarray] = None) -> SharedRef:
+        """Place an array held by rank 0 in shared memory on every node (collective)"""
+        if self.rank == 0:
+            array = np.ascontiguousarray(array)
+            if array.dtype.hasobject:
+                raise TypeError("Arrays of Python objects cannot be placed in shared memory")
+            layout = (key, array.shape, array.dtype.str)
+        else:
+            layout = None
+        key, shape, dtype = self.comm.bcast(layout, root=0)
+        if key in self.arrays:
+            raise KeyError(f"Shared array {key} already exists")
+        
+        # Sent as bytes among node leaders, in segments for arrays beyond the MPI count limit
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        data = as_bytes(array) if self.rank == 0 else None
+        shared = _shared_bcast(self.comm, data, (nbytes,), np.dtype(np.uint8), MPI.BYTE, 0, segment_bytes(None))
+        
+        self.arrays[key] = shared.array.view(dtype).reshape(shape)
+        self.windows[key] = shared
+        return SharedRef(key)
+    
+    def get(self, ref: SharedRef) -> np.ndarray:
+        """Return the read-only view of a shared array"""
+        return self.arrays[ref.key]
+    
+    def free(self):
+        """Release all shared arrays (collective)"""
+        self.arrays.clear()
+        for key in sorted(self.windows):
+            self.windows[key].free()
+        self.windows.clear()
@@ -1,4 +1,5 @@
 import time
+import numpy as np
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -13,7 +14,27 @@ class Task(ABC):
         started_at: Timestamp when the task started execution.
         completed_at: Timestamp when the task was completed.
         worker_rank: Rank of the worker that executed the task.
+        output_index: Row (int) or row range (slice) of the queue output array the result
+            is written to, see MPIQueue.output_array. None returns the result normally.
+    
+    Task uses __slots__ for its own attributes. Subclasses get an instance __dict__
+    unless they declare __slots__ themselves, which keeps millions of queued tasks small.
+    
+    class attributes:
+        batch_dtype: Structured NumPy dtype whose field names are task attributes.
+            Setting it enables batched execution through execute_batch.
+        batch_size: Maximum number of tasks executed in one batch.
+        result_dtype: NumPy dtype of the result. Setting it together with result_shape
+            sends the result as a raw buffer instead of pickling it, received by the
+            manager straight into a preallocated array (see MPIQueue.set_result_buffer).
+        result_shape: Shape of the result when result_dtype is set.
     """
+    __slots__ = ('task_id', 'created_at', 'started_at', 'completed_at', 'worker_rank')
+    output_index = None
+    batch_dtype = None
+    batch_size = 1024
+    result_dtype = None
+    result_shape = None
     
     def __init__(self, task_id: str):
         self.task_id = task_id
@@ -30,6 +51,17 @@ class Task(ABC):
         """
         pass
     
+    @classmethod
+    def execute_batch(cls, params: np.ndarray) -> np.ndarray:
+        """
+        Execute a batch of tasks of this class in one vectorized call.
+        Optional, used when batch_dtype is set: queued tasks of the same class are
+        packed into a structured array with one row per task (fields taken from the
+        task attributes named in batch_dtype), and the returned array must hold one
+        result per row, in the same order.
+        """
+        raise NotImplementedError(f"{cls.__name__} sets batch_dtype but does not implement execute_batch")
+    
     def __str__(self):
         return f"Task({self.task_id})"
 
@@ -44,6 +76,7 @@ class TaskResult:
         worker_rank: Rank of the worker that executed the task.
         completed_at: Timestamp when the task was completed.
     """
+    __slots__ = ('task_id', 'result', 'execution_time', 'worker_rank', 'completed_at')
     
     def __init__(self, task_id: str, result: Any, execution_time: float = 0.0,
                  worker_rank: int = -1):
@@ -57,4 +90,40 @@ class TaskResult:
         return f"TaskResult(\n\ttask_id={self.task_id},\n\t" \
                f"worker_rank={self.worker_rank},\n\t" \
                f"execution_time={self.execution_time:.4f}s,\n\t" \
-               f"result={self.result}\n)"
\ No newline at end of file
+               f"result={self.result}\n)"
+
+class ObjectRef:
+    """
+    Lightweight reference to the result of a task submitted with MPIQueue.submit.
+    The result stays in the object store of the worker that produced it and is
+    fetched directly by any task that holds the reference as an attribute.
+
+    attributes:
+        task_id: Identifier of the task that produces the referenced result.
+        owner: Rank of the worker holding the result, None until the task completed.
+    """
+
+    __slots__ = ('task_id', 'owner', '__weakref__')
+    
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.owner = None
+
+    def __repr__(self):
+        return f"ObjectRef({self.task_id}, owner={self.owner})"
+
+class SharedRef:
+    """
+    Reference to a read-only array placed in node-local shared memory with MPIQueue.share.
+    Tasks holding the reference as an attribute receive a zero-copy view of the array
+    in its place on the worker.
+
+    attributes:
+        key: Name of the shared array.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __repr__(self):
+        return f"SharedRef({self.key})"
@@ -0,0 +1,791 @@
+from mpitools import setup_mpi
+from mpitools.comms import (
+    broadcast_from_main,
+    scatter_from_main,
+    gather_to_main,
+    gather_to_all,
+    all_to_all,
+    ibroadcast_from_main,
+    iscatter_from_main,
+    igather_to_main,
+    igather_to_all,
+    iall_to_all,
+    ireduce_to_all,
+    ibuffered_broadcast_from_main,
+    ibuffered_gather_to_all,
+    ibuffered_reduce_to_all,
+    ivariable_gather_to_main,
+    wait_all,
+    buffered_broadcast_from_main,
+    buffered_scatter_from_main,
+    buffered_gather_to_all,
+    buffered_all_to_all,
+    variable_scatter_from_main,
+    variable_gather_to_main,
+    variable_gather_to_all,
+    variable_all_to_all,
+    Compression,
+    BufferPool,
+    buffered_reduce_to_all,
+    buffered_reduce_to_main,
+    reduce_to_all,
+    register_op,
+    reduce_with,
+    allreduce_with,
+    sparse_reduce_to_all,
+    buffered_broadcast_from_process,
+    buffered_gather_to_main,
+    buffered_gather_to_process,
+    buffered_reduce_to_process,
+    shared_broadcast_from_main,
+    shared_broadcast_from_process,
+)
+import heapq
+import os
+from mpi4py import MPI
+import mpitools.comms.utils as comm_utils
+from mpitools.comms.persistent import PersistentCollective
+import mpitools.comms.views as views
+import numpy as np
+from collections import Counter
+
+comm, rank, size = setup_mpi()
+
+def main_print(x):
+    if rank == 0:
+        print(x)
+
+def test_nonblocking():
+    """i-decorators return futures whose results match the blocking collectives"""
+    @ibroadcast_from_main()
+    def config():
+        return {"steps": 10, "name": "run"}
+
+    @iscatter_from_main()
+    def pieces():
+        return [f"piece_{r}" for r in range(size)]
+
+    @igather_to_main()
+    def local_names():
+        return f"rank_{rank}"
+
+    @igather_to_all()
+    def local_values():
+        return rank * 2
+
+    @iall_to_all()
+    def exchange():
+        return [(rank, r) for r in range(size)]
+
+    @ireduce_to_all(op='sum')
+    def local_sum():
+        return rank + 1
+
+    @ibuffered_broadcast_from_main(shape=4, dtype=np.float64)
+    def coefficients():
+        return np.arange(4.0)
+
+    @ibuffered_gather_to_all(shape=3, dtype=np.int64)
+    def rows():
+        return np.full(3, rank, dtype=np.int64)
+
+    @ibuffered_reduce_to_all(shape=5, dtype=np.float64, op='max')
+    def local_max():
+        return np.arange(5.0) * rank
+
+    counts = [r + 1 for r in range(size)]
+    @ivariable_gather_to_main(counts=counts, dtype=np.int32)
+    def ragged():
+        return np.full(rank + 1, rank, dtype=np.int32)
+
+    futures = [config(), pieces(), local_names(), local_values(), exchange(), local_sum(),
+               coefficients(), rows(), local_max(), ragged()]
+    futures[0].test()
+    results = wait_all(futures)
+
+    assert results[0] == {"steps": 10, "name": "run"}
+    assert results[1] == f"piece_{rank}"
+    assert results[2] == ([f"rank_{r}" for r in range(size)] if rank == 0 else None)
+    assert results[3] == [r * 2 for r in range(size)]
+    assert results[4] == [(r, rank) for r in range(size)]
+    assert results[5] == size * (size + 1) // 2
+    assert np.array_equal(results[6], np.arange(4.0))
+    assert np.array_equal(results[7], np.repeat(np.arange(size), 3).reshape(size, 3))
+    assert np.array_equal(results[8], np.arange(5.0) * (size - 1))
+    if rank == 0:
+        assert np.array_equal(results[9], np.repeat(np.arange(size), counts))
+    else:
+        assert results[9] is None
+    assert all(future.done() for future in futures)
+
+    # Payload transfers start late, in creation order, even when waited out of order
+    # and with other collectives and uneven polling in between
+    first, second, third = local_values(), pieces(), local_sum()
+    assert comm.allreduce(1) == size
+    for _ in range(rank):
+        second.test()
+    assert third.wait() == size * (size + 1) // 2
+    assert first.wait() == [r * 2 for r in range(size)]
+    assert second.wait() == f"piece_{rank}"
+    main_print("Nonblocking collectives passed")
+
+def test_array_fast_path():
+    """Object collectives send NumPy results as raw buffers and still accept any object"""
+    @broadcast_from_main()
+    def table():
+        return np.arange(12, dtype=np.float32).reshape(3, 4)
+
+    @scatter_from_main()
+    def rows():
+        return np.arange(size * 2).reshape(size, 2)
+
+    @gather_to_main()
+    def ragged():
+        return np.full(rank + 1, rank, dtype=np.int16)
+
+    @gather_to_all()
+    def mixed(n):
+        return np.arange(n) if n else {"rank": rank}
+
+    @all_to_all()
+    def exchange():
+        return np.arange(size)[:, None] + 10 * rank * np.ones((size, 3))
+
+    assert np.array_equal(table(), np.arange(12, dtype=np.float32).reshape(3, 4))
+    assert np.array_equal(rows(), [2 * rank, 2 * rank + 1])
+    gathered = ragged()
+    if rank == 0:
+        for r, array in enumerate(gathered):
+            assert array.dtype == np.int16 and np.array_equal(array, np.full(r + 1, r))
+    else:
+        assert gathered is None
+    for n in (3, 3, 0, 5):
+        result = mixed(n)
+        expected = [np.arange(n) for _ in range(size)] if n else [{"rank": r} for r in range(size)]
+        assert all(np.array_equal(a, b) if n else a == b for a, b in zip(result, expected))
+    @broadcast_from_main()
+    def masked():
+        return np.ma.masked_array(np.arange(4.0), mask=[False, True, False, True])
+
+    @gather_to_all()
+    def masked_rows():
+        return np.ma.masked_array([rank, -rank], mask=[False, True])
+
+    received = exchange()
+    assert all(np.array_equal(row, rank + 10 * r * np.ones(3)) for r, row in enumerate(received))
+    result = masked()
+    assert isinstance(result, np.ma.MaskedArray) and result.mask.tolist() == [False, True, False, True]
+    assert all(isinstance(row, np.ma.MaskedArray) and row.mask.tolist() == [False, True] and row[0] == r
+               for r, row in enumerate(masked_rows()))
+    main_print("Array fast path passed")
+
+def test_out_of_band():
+    """Protocol 5 transport reconstructs nested arrays from separately sent buffers"""
+    def payload(r):
+        return {"rank": r, "weights": np.arange(1000.0) * r, "meta": [np.ones((2, 3), dtype=np.int8) * r]}
+
+    def same(a, b):
+        return (a["rank"] == b["rank"] and np.array_equal(a["weights"], b["weights"])
+                and np.array_equal(a["meta"][0], b["meta"][0]))
+
+    @broadcast_from_main(oob=True)
+    def model():
+        return payload(0)
+
+    @scatter_from_main(oob=True)
+    def shards():
+        return [payload(r) for r in range(size)]
+
+    @gather_to_main(oob=True)
+    def local():
+        return payload(rank)
+
+    @gather_to_all(oob=True)
+    def everywhere():
+        return payload(rank)
+
+    @all_to_all(oob=True)
+    def exchange():
+        return [payload(rank * size + r) for r in range(size)]
+
+    assert same(model(), payload(0))
+    assert same(shards(), payload(rank))
+    gathered = local()
+    assert gathered is None if rank else all(same(g, payload(r)) for r, g in enumerate(gathered))
+    assert all(same(g, payload(r)) for r, g in enumerate(everywhere()))
+    assert all(same(g, payload(r * size + rank)) for r, g in enumerate(exchange()))
+    main_print("Out-of-band transport passed")
+
+def test_segmented():
+    """Messages above segment_size are split into pipelined segments"""
+    seg = 24  # bytes, so every collective below needs several segments
+    counts = [r + 3 for r in range(size)]
+    offset = sum(counts[:rank])
+
+    @buffered_broadcast_from_main(17, np.float64, segment_size=seg)
+    def table():
+        return np.arange(17.0)
+
+    # Rows of 80 bytes, larger than a segment, from a strided view
+    @buffered_broadcast_from_main((3, 10), np.float64, segment_size=seg)
+    def wide_rows():
+        return np.arange(60.0).reshape(3, 20)[:, ::2]
+
+    @buffered_scatter_from_main((3, 5), np.int32, segment_size=seg)
+    def blocks():
+        return np.arange(size * 15, dtype=np.int32).reshape(size, 3, 5)
+
+    @buffered_gather_to_all(7, np.float32, segment_size=seg)
+    def local():
+        return np.full(7, rank, dtype=np.float32)
+
+    @buffered_all_to_all(9, np.int64, segment_size=seg)
+    def exchange():
+        return np.arange(size * 9).reshape(size, 9) + 100 * rank
+
+    @variable_scatter_from_main(counts, np.float64, segment_size=seg)
+    def ragged():
+        return np.arange(float(sum(counts)))
+
+    @variable_gather_to_main(counts, np.int16, segment_size=seg)
+    def ragged_gather():
+        return np.arange(offset, offset + counts[rank], dtype=np.int16)
+
+    @variable_gather_to_all(counts, np.int16, segment_size=seg)
+    def ragged_allgather():
+        return np.arange(offset, offset + counts[rank], dtype=np.int16)
+
+    # Rank r sends r + d + 1 elements to rank d
+    @variable_all_to_all([rank + d + 1 for d in range(size)], [s + rank + 1 for s in range(size)],
+                         np.float64, segment_size=seg)
+    def ragged_exchange():
+        return np.concatenate([np.full(rank + d + 1, 10.0 * rank + d) for d in range(size)])
+
+    total = np.arange(sum(counts))
+    assert np.array_equal(table(), np.arange(17.0))
+    assert np.array_equal(wide_rows(), np.arange(60.0).reshape(3, 20)[:, ::2])
+    assert np.array_equal(blocks(), np.arange(rank * 15, rank * 15 + 15).reshape(3, 5))
+    assert np.array_equal(local(), np.repeat(np.arange(size, dtype=np.float32)[:, None], 7, axis=1))
+    assert np.array_equal(exchange(), np.arange(rank * 9, rank * 9 + 9) + 100 * np.arange(size)[:, None])
+    assert np.array_equal(ragged(), total[offset:offset + counts[rank]])
+    gathered = ragged_gather()
+    assert gathered is None if rank else np.array_equal(gathered, total)
+    assert np.array_equal(ragged_allgather(), total)
+    expected = np.concatenate([np.full(s + rank + 1, 10.0 * s + rank) for s in range(size)])
+    assert np.array_equal(ragged_exchange(), expected)
+    main_print("Segmented collectives passed")
+
+def test_compression():
+    """Compressed collectives round-trip, whether or not each sender compresses"""
+    def log(r):
+        return {"rank": r, "lines": [f"step {i}: loss ok" for i in range(5000)], "weights": np.zeros(20000)}
+
+    small = Compression('lzma', threshold=0, block_size=4096, threads=2)
+
+    @broadcast_from_main(compress=True)
+    def config():
+        return log(0)
+
+    @scatter_from_main(compress='lzma')
+    def shards():
+        return [log(r) for r in range(size)]
+
+    @gather_to_main(compress=small)
+    def logs():
+        return log(rank) if rank % 2 else rank  # mixes compressed and raw frames
+
+    @gather_to_all(compress='auto')
+    def everywhere():
+        return log(rank)
+
+    @all_to_all(compress=small)
+    def exchange():
+        return [log(rank * size + r) for r in range(size)]
+
+    def same(a, b):
+        return a == b if not isinstance(a, dict) else (
+            a["lines"] == b["lines"] and a["rank"] == b["rank"] and np.array_equal(a["weights"], b["weights"]))
+
+    assert same(config(), log(0))
+    assert same(shards(), log(rank))
+    gathered = logs()
+    assert gathered is None if rank else all(same(g, log(r) if r % 2 else r) for r, g in enumerate(gathered))
+    assert all(same(g, log(r)) for r, g in enumerate(everywhere()))
+    assert all(same(g, log(r * size + rank)) for r, g in enumerate(exchange()))
+
+    frame = small.encode(b"x" * 100000)
+    assert frame.size < 5000 and bytes(small.decode(frame)) == b"x" * 100000
+    small.close()
+
+    # By default the processes of a node share its CPUs instead of each starting its own threads
+    shared = Compression()
+    shared.prepare(comm)
+    node_size = comm_utils.node_comms(comm)[0].Get_size()
+    assert shared.threads == max(1, len(os.sched_getaffinity(0)) // node_size)
+    main_print("Compression passed")
+
+def test_receive_buffers():
+    """Results can land in a reused buffer, a pooled buffer or a caller-provided array"""
+    @buffered_gather_to_all(4, np.int64, reuse=True)
+    def reused(k):
+        return np.full(4, k * size + rank, dtype=np.int64)
+
+    first = reused(1)
+    second = reused(2)
+    assert first is second and np.array_equal(second[:, 0], 2 * size + np.arange(size))
+
+    pool = BufferPool(max_bytes=4096)
+
+    @buffered_reduce_to_all(100, np.float64, pool=pool)
+    def pooled():
+        return np.ones(100)
+
+    a = pooled()
+    assert np.array_equal(a, np.full(100, size))
+    pool.release(a)
+    assert pool.idle_bytes == 1024
+    b = pooled()
+    assert pool.idle_bytes == 0 and np.array_equal(b, np.full(100, size))
+
+    out = np.empty(sum(r + 1 for r in range(size)), dtype=np.int32)
+    @variable_gather_to_all([r + 1 for r in range(size)], np.int32)
+    def ragged():
+        return np.full(rank + 1, rank, dtype=np.int32)
+
+    assert ragged(out=out) is out
+    assert np.array_equal(out, np.repeat(np.arange(size), np.arange(size) + 1))
+    main_print("Receive buffers passed")
+
+def test_persistent():
+    """Persistent collectives give the same results on every call, with or without MPI-4"""
+    @buffered_reduce_to_all(8, np.float64, persistent=True)
+    def gradient(step):
+        return np.full(8, step + rank, dtype=np.float64)
+
+    @buffered_broadcast_from_main(3, np.int32, persistent=True)
+    def params(step):
+        return np.arange(3, dtype=np.int32) * step
+
+    @buffered_all_to_all(2, np.int64, persistent=True)
+    def exchange(step):
+        return np.arange(size * 2).reshape(size, 2) + 100 * rank + step
+
+    for step in range(4):
+        assert np.array_equal(gradient(step), np.full(8, size * step + size * (size - 1) / 2))
+        assert np.array_equal(params(step), np.arange(3) * step)
+        expected = np.arange(rank * 2, rank * 2 + 2) + 100 * np.arange(size)[:, None] + step
+        assert np.array_equal(exchange(step), expected)
+
+    # close() releases the requests, and a later call sets them up again
+    for func in (gradient, params, exchange):
+        func.close()
+        assert func.close.__self__.request == MPI.REQUEST_NULL
+    assert np.array_equal(params(5), np.arange(3) * 5)
+    params.close()
+
+    collective = PersistentCollective(comm, 'Allreduce')
+    send, recv = np.full(4, rank, dtype=np.float64), np.empty(4)
+    for _ in range(2):
+        collective.run([send, MPI.DOUBLE], [recv, MPI.DOUBLE], op=MPI.SUM)
+        assert np.array_equal(recv, np.full(4, size * (size - 1) / 2))
+    collective.free()
+    assert collective.request == MPI.REQUEST_NULL
+    main_print("Persistent collectives passed")
+
+def test_auto_counts():
+    """counts='auto' exchanges result sizes on every call and keeps rows intact"""
+    @variable_gather_to_all('auto', np.float64)
+    def rows(n):
+        return np.full((rank + n, 3), rank, dtype=np.float64)
+
+    @variable_gather_to_main('auto', np.int32, segment_size=16)
+    def ragged(n):
+        return np.arange(rank + n, dtype=np.int32)
+
+    # Rank r sends r + d rows of width 2 to rank d
+    @variable_all_to_all('auto', None, np.int64, reuse=True)
+    def exchange(n):
+        return [np.full((rank + d + n, 2), 10 * rank + d) for d in range(size)]
+
+    # Rank 0 has no rows and returns an empty 1-D array
+    @variable_gather_to_all('auto', np.float64)
+    def some_rows():
+        return np.full((1, 3), rank, dtype=np.float64) if rank else np.empty(0)
+
+    # Everything goes to rank 0, which receives more than any rank sends
+    @variable_all_to_all('auto', None, np.int64, segment_size=64)
+    def to_main():
+        return [np.full((3, 2), rank) if d == 0 else np.empty(0, dtype=np.int64) for d in range(size)]
+
+    gathered = some_rows()
+    if size > 1:
+        assert gathered.shape == (size - 1, 3) and np.array_equal(gathered[:, 0], np.arange(1, size))
+    else:
+        assert gathered.shape == (0,)
+    received = to_main()
+    if rank == 0:
+        assert [part.shape for part in received] == [(3, 2)] * size
+        assert all((part == s).all() for s, part in enumerate(received))
+    else:
+        assert all(part.shape == (0, 2) for part in received)
+
+    for n in (1, 2, 2, 0):
+        gathered = rows(n)
+        assert gathered.shape == (sum(r + n for r in range(size)), 3)
+        assert np.array_equal(gathered[:, 0], np.repeat(np.arange(size), np.arange(size) + n))
+        result = ragged(n)
+        assert result is None if rank else np.array_equal(result, np.concatenate([np.arange(r + n) for r in range(size)]))
+        received = exchange(n)
+        assert [part.shape for part in received] == [(s + rank + n, 2) for s in range(size)]
+        assert all((part == 10 * s + rank).all() for s, part in enumerate(received))
+    main_print("Automatic counts passed")
+
+def test_inplace():
+    """In-place reductions return the reduced data in the function's own array"""
+    local = np.arange(6, dtype=np.float64) + rank
+
+    @buffered_reduce_to_all(6, np.float64, inplace=True)
+    def everywhere():
+        return local.copy()
+
+    @buffered_reduce_to_main(6, np.float64, op='max', inplace=True)
+    def largest():
+        return local.copy()
+
+    @buffered_reduce_to_all(6, np.float64, inplace=True, persistent=True)
+    def repeated():
+        return local.copy()
+
+    total = size * np.arange(6) + size * (size - 1) / 2
+    assert np.array_equal(everywhere(), total)
+    result = largest()
+    assert result is None if rank else np.array_equal(result, np.arange(6) + size - 1)
+    for _ in range(3):
+        assert np.array_equal(repeated(), total)
+    main_print("In-place reductions passed")
+
+
+def test_custom_ops():
+    """Registered vectorized operations reduce plain, structured and whole-array buffers"""
+    register_op('logaddexp', np.logaddexp)
+    pair = np.dtype([('value', np.float64), ('index', np.int64)])
+    register_op('argmax', lambda a, b: np.where(a['value'] > b['value'], a, b), dtype=pair)
+    register_op('top4', lambda a, b: np.sort(np.concatenate([a, b]))[-4:], elementwise=False)
+
+    @buffered_reduce_to_all(5, np.float64, op='logaddexp')
+    def log_total():
+        return np.log(np.arange(1, 6, dtype=np.float64) * (rank + 1))
+
+    @buffered_reduce_to_all(3, pair, op='argmax')
+    def best():
+        out = np.empty(3, dtype=pair)
+        out['value'] = [rank, -rank, -abs(rank - 1)]
+        out['index'] = rank
+        return out
+
+    @buffered_reduce_to_all(4, np.int64, op='top4')
+    def largest():
+        return np.sort(np.arange(4, dtype=np.int64) * size + rank)
+
+    @reduce_to_all(op='logaddexp')
+    def log_object():
+        return float(np.log(rank + 1))
+
+    weights = size * (size + 1) / 2
+    assert np.allclose(log_total(), np.log(np.arange(1, 6) * weights))
+    result = best()
+    assert list(result['index']) == [size - 1, 0, 1 if size > 1 else 0]
+    assert np.array_equal(largest(), np.arange(4 * size)[-4:])
+    assert np.isclose(log_object(), np.log(weights))
+    main_print("Custom reduction operations passed")
+
+
+def test_tree_reduction():
+    """Python combine functions reduce over trees in rank order, with compaction"""
+    @allreduce_with(lambda a, b: a + b)
+    def words():
+        return Counter({"common": 1, f"rank{rank}": rank + 1})
+
+    @reduce_with(lambda a, b: a + b, root=size - 1, commute=False)
+    def ranks_in_order():
+        return [rank]
+
+    @allreduce_with(lambda a, b: a + b)
+    def ranks_everywhere():
+        return [rank]
+
+    @allreduce_with(lambda a, b: list(heapq.merge(a, b)), compact=lambda a: a[-3:])
+    def top3():
+        return sorted([rank, rank + size, rank + 2 * size])
+
+    @allreduce_with(lambda a, b: a + b, compact=lambda a: Counter({k: v for k, v in a.items() if v >= 2}))
+    def frequent():
+        return Counter({"x": 1, "y": 5 + rank, f"rank{rank}": rank % 3})
+
+    counts = words()
+    assert counts["common"] == size
+    assert all(counts[f"rank{r}"] == r + 1 for r in range(size))
+    result = ranks_in_order()
+    assert result == list(range(size)) if rank == size - 1 else result is None
+    assert ranks_everywhere() == list(range(size))
+    assert top3()[-3:] == list(range(3 * size))[-3:]
+    # A lossy compact still leaves every rank with the same result
+    result = frequent()
+    assert all(other == result for other in comm.allgather(result))
+    main_print("Tree reductions passed")
+
+
+def test_sparse_reduction():
+    """Sparse dicts and key/value columns reduce through hash partitions"""
+    @sparse_reduce_to_all(segment_size=100)
+    def term_counts():
+        return Counter({"shared": 2, f"only{rank}": rank + 1, "a" * (rank + 1): 1})
+
+    @sparse_reduce_to_all(op='max', gather=False, columnar=True, segment_size=64)
+    def owned():
+        keys = np.arange(rank, 100, size + 1, dtype=np.int64)
+        return keys, np.full((len(keys), 2), rank, dtype=np.int32)
+
+    @sparse_reduce_to_all(op=np.minimum, columnar=True)
+    def empty_on_main():
+        if rank == 0:
+            return {}
+        return np.array([1.5, -0.0, 0.0]), np.array([rank, rank, rank])
+
+    counts = term_counts()
+    assert counts["shared"] == 2 * size
+    assert all(counts[f"only{r}"] == r + 1 for r in range(size))
+    assert all(counts["a" * (r + 1)] == 1 for r in range(size))
+
+    keys, values = owned()
+    everything = comm.allgather(keys)
+    expected = sorted(set().union(*[range(r, 100, size + 1) for r in range(size)]))
+    assert sorted(np.concatenate(everything).tolist()) == expected
+    assert values.shape == (len(keys), 2)
+    assert all(v == max(r for r in range(size) if (k - r) % (size + 1) == 0 and k >= r) for k, v in zip(keys, values[:, 0]))
+
+    keys, values = empty_on_main()
+    assert keys.tolist() == ([0.0, 1.5] if size > 1 else [])
+    assert values.tolist() == ([1, 1] if size > 1 else [])
+    main_print("Sparse reductions passed")
+
+
+def test_derived_dtypes():
+    """Structured, float16 and bool arrays travel as proper MPI datatypes"""
+    particle = np.dtype([('pos', np.float64, (3,)), ('id', np.int32), ('tag', 'U2'), ('mass', np.float16)])
+
+    def particles(n, offset):
+        out = np.zeros(n, dtype=particle)
+        out['pos'] = np.arange(3 * n).reshape(n, 3) + offset
+        out['id'] = np.arange(n) + offset
+        out['tag'] = 'p'
+        out['mass'] = 0.5
+        return out
+
+    @buffered_scatter_from_main(2, particle)
+    def scatter():
+        return particles(2 * size, 0)
+
+    @variable_gather_to_all('auto', particle)
+    def gather():
+        return particles(rank + 1, 100 * rank)
+
+    @buffered_reduce_to_all(4, np.dtype([('count', np.int64), ('weight', np.float16)]))
+    def totals():
+        out = np.zeros(4, dtype=[('count', np.int64), ('weight', np.float16)])
+        out['count'] = rank + 1
+        out['weight'] = 0.25
+        return out
+
+    @buffered_reduce_to_all(3, np.bool_, op='lor')
+    def seen():
+        return np.arange(3) == rank
+
+    @buffered_reduce_to_all(3, '>f8')
+    def big_endian():
+        return (np.array([1, 2, 3]) * (rank + 1)).astype('>f8')
+
+    chunk = scatter()
+    assert chunk['id'].tolist() == [2 * rank, 2 * rank + 1] and chunk['tag'].tolist() == ['p', 'p']
+    assert np.array_equal(chunk['pos'], particles(2 * size, 0)['pos'][2 * rank:2 * rank + 2])
+    everything = gather()
+    assert everything.dtype == particle and len(everything) == size * (size + 1) // 2
+    assert everything['id'].tolist() == [i + 100 * r for r in range(size) for i in range(r + 1)]
+    assert np.all(everything['mass'] == 0.5)
+    result = totals()
+    assert np.all(result['count'] == size * (size + 1) // 2) and np.all(result['weight'] == 0.25 * size)
+    assert seen().tolist() == [r < size for r in range(3)]
+    result = big_endian()
+    assert result.dtype == np.dtype('>f8') and result.tolist() == [w * size * (size + 1) / 2 for w in (1, 2, 3)]
+    main_print("Derived datatypes passed")
+
+
+def test_strided_views():
+    """Strided views are sent from their own memory without contiguous copies"""
+    grid = np.arange(8 * 10, dtype=np.float64).reshape(8, 10)
+    block = grid[2:6, 3:7]
+
+    @buffered_broadcast_from_main((4, 4), np.float64)
+    def column_block():
+        return block
+
+    @buffered_broadcast_from_main((8, 4), np.float64, segment_size=64)
+    def segmented_columns():
+        return grid[:, ::3][:, :4]
+
+    @buffered_scatter_from_main(3, np.float64)
+    def transposed():
+        return np.arange(3 * size, dtype=np.float64).reshape(3, size).T
+
+    @buffered_all_to_all(2, np.int64)
+    def every_other():
+        return (np.arange(4 * size, dtype=np.int64).reshape(size, 4) + 100 * rank)[:, ::2]
+
+    @variable_gather_to_all('auto', np.float64)
+    def columns():
+        return grid[:rank + 1, rank]
+
+    @buffered_reduce_to_all(4, np.float64)
+    def row_sums():
+        return grid[rank % 8, ::2][:4]
+
+    result = column_block()
+    assert np.array_equal(result, block)
+    assert result is block if rank == 0 else result.flags.c_contiguous
+    assert np.array_equal(segmented_columns(), grid[:, ::3][:, :4])
+    assert np.array_equal(transposed(), np.arange(3 * size).reshape(3, size)[:, rank])
+    exchanged = every_other()
+    assert np.array_equal(exchanged, np.array([np.arange(4 * rank, 4 * rank + 4)[::2] + 100 * r for r in range(size)]))
+    assert np.array_equal(columns(), np.concatenate([grid[:r + 1, r] for r in range(size)]))
+    assert np.allclose(row_sums(), sum(grid[r % 8, ::2][:4] for r in range(size)))
+
+    # Datatypes of many different layouts are freed least recently used first
+    first = next(iter(views._view_dtypes.values()))
+    wide = np.arange(2 * (views._MAX_VIEW_DTYPES + 2), dtype=np.float64).reshape(2, -1)
+    for width in range(1, views._MAX_VIEW_DTYPES + 2):
+        comm.Bcast(views.buffer_spec(wide[:, :width], MPI.DOUBLE), root=0)
+    assert len(views._view_dtypes) == views._MAX_VIEW_DTYPES
+    assert first == MPI.DATATYPE_NULL, "evicted datatype was not freed"
+    main_print("Strided views passed")
+
+
+def test_hierarchical():
+    """Two-level collectives match the flat ones on simulated nodes"""
+    # Pretend even and odd ranks sit on two different nodes
+    nodes = comm.Dup()
+    node_comm = nodes.Split(rank % 2, key=rank)
+    leader_comm = nodes.Split(0 if node_comm.Get_rank() == 0 else MPI.UNDEFINED, key=rank)
+    comm_utils._node_comms[nodes.py2f()] = (node_comm, leader_comm)
+    last = size - 1
+
+    @buffered_broadcast_from_main(5, np.float64, hierarchical=True, comm=nodes)
+    def bcast_main():
+        return np.arange(5, dtype=np.float64)
+
+    @buffered_broadcast_from_process(last, (4, 3), np.int64, segment_size=32, hierarchical=True, comm=nodes)
+    def bcast_last():
+        return np.arange(12, dtype=np.int64).reshape(4, 3) * 7
+
+    @buffered_gather_to_all(2, np.int64, hierarchical=True, comm=nodes)
+    def gather_all():
+        return np.array([rank, 10 * rank], dtype=np.int64)
+
+    @buffered_gather_to_main(3, np.float64, hierarchical=True, comm=nodes)
+    def gather_main():
+        return np.full(3, rank, dtype=np.float64)
+
+    @buffered_gather_to_process(last, 2, np.int32, hierarchical=True, comm=nodes)
+    def gather_last():
+        return np.array([rank, -rank], dtype=np.int32)
+
+    @buffered_reduce_to_all(3, np.float64, op='sum', hierarchical=True, comm=nodes)
+    def sum_all():
+        return np.array([rank, 1.0, rank ** 2], dtype=np.float64)
+
+    @buffered_reduce_to_main(2, np.int64, op='max', inplace=True, hierarchical=True, comm=nodes)
+    def max_main():
+        return np.array([rank, -rank], dtype=np.int64)
+
+    @buffered_reduce_to_process(last, 2, np.int64, op='min', hierarchical=True, comm=nodes)
+    def min_last():
+        return np.array([rank, -rank], dtype=np.int64)
+
+    expected_gather = np.array([[r, 10 * r] for r in range(size)])
+    assert np.array_equal(bcast_main(), np.arange(5))
+    assert np.array_equal(bcast_last(), np.arange(12).reshape(4, 3) * 7)
+    assert np.array_equal(gather_all(), expected_gather)
+    gathered = gather_main()
+    assert np.array_equal(gathered, np.repeat(np.arange(size), 3).reshape(size, 3)) if rank == 0 else gathered is None
+    gathered = gather_last()
+    assert np.array_equal(gathered, np.array([[r, -r] for r in range(size)])) if rank == last else gathered is None
+    assert np.allclose(sum_all(), [size * (size - 1) / 2, size, sum(r ** 2 for r in range(size))])
+    reduced = max_main()
+    assert np.array_equal(reduced, [last, 0]) if rank == 0 else reduced is None
+    reduced = min_last()
+    assert np.array_equal(reduced, [0, -last]) if rank == last else reduced is None
+
+    try:
+        buffered_reduce_to_all(3, np.float64, persistent=True, hierarchical=True, comm=nodes)
+        assert False, "hierarchical with persistent should be rejected"
+    except ValueError:
+        pass
+    main_print("Hierarchical collectives passed")
+
+
+def test_shared_broadcast():
+    """Shared broadcasts leave one read-only copy per node"""
+    @shared_broadcast_from_main((6, 4), np.float64)
+    def table():
+        return np.arange(24, dtype=np.float64).reshape(6, 4)
+
+    @shared_broadcast_from_process(size - 1, 100, np.int32, segment_size=64)
+    def column():
+        return np.arange(100, dtype=np.int32)[::-1]
+
+    with table() as view:
+        assert np.array_equal(view, np.arange(24).reshape(6, 4))
+        assert not view.flags.writeable
+    shared = column()
+    assert np.array_equal(shared.array, np.arange(100)[::-1])
+    shared.free()
+    assert shared.freed
+
+    # Only the node leader holds memory in the window
+    shared = table()
+    node_rank = comm_utils.node_comms(comm)[0].Get_rank()
+    segment, _ = shared._win.Shared_query(node_rank)
+    assert len(segment) == (shared.array.nbytes if node_rank == 0 else 0)
+    shared.free()
+
+    # Leaders broadcast between simulated nodes of even and odd ranks
+    nodes = comm.Dup()
+    node_comm = nodes.Split(rank % 2, key=rank)
+    leader_comm = nodes.Split(0 if node_comm.Get_rank() == 0 else MPI.UNDEFINED, key=rank)
+    comm_utils._node_comms[nodes.py2f()] = (node_comm, leader_comm)
+
+    @shared_broadcast_from_process(size - 1, (50, 3), np.float64, segment_size=256, comm=nodes)
+    def spread():
+        return np.arange(150, dtype=np.float64).reshape(50, 3) / 7
+
+    with spread() as view:
+        assert np.array_equal(view, np.arange(150).reshape(50, 3) / 7)
+    main_print("Shared broadcasts passed")
+
+
+if __name__ == "__main__":
+    test_nonblocking()
+    test_array_fast_path()
+    test_out_of_band()
+    test_segmented()
+    test_compression()
+    test_receive_buffers()
+    test_persistent()
+    test_auto_counts()
+    test_inplace()
+    test_custom_ops()
+    test_tree_reduction()
+    test_sparse_reduction()
+    test_derived_dtypes()
+    test_strided_views()
+    test_hierarchical()
+    test_shared_broadcast()
@@ -1,4 +1,5 @@
-from mpitools import setup_mpi, eval_on_main, eval_on_workers, eval_on_single, eval_on_select
+from mpitools import setup_mpi, eval_on_main, eval_on_workers, eval_on_single, eval_on_select, parallel_for
+from mpitools.divide_work import _guided_bounds
 import time
 
 comm, rank, size = setup_mpi()
@@ -23,6 +24,42 @@ def single_only():
 def select_only():
     print(f"Executing select_only on rank {rank}")
 
+def test_parallel_for(schedule, n=1000):
+    """Every iteration runs exactly once across all processes"""
+    local = parallel_for(n, lambda i: i * i, schedule=schedule, chunk=4 if schedule != 'static' else None)
+    gathered = comm.gather(local, root=0)
+    if rank == 0:
+        merged = {}
+        for part in gathered:
+            assert not merged.keys() & part.keys(), "iteration executed twice"
+            merged.update(part)
+        assert merged == {i: i * i for i in range(n)}, "missing iterations"
+        counts = [len(part) for part in gathered]
+        print(f"parallel_for schedule={schedule}: iterations per rank {counts}")
+
+def test_guided(n=200):
+    """Guided chunks shrink in claim order and move work away from a slow process"""
+    bounds = _guided_bounds(n, size, 1)
+    sizes = [b - a for a, b in zip(bounds, bounds[1:])]
+    assert bounds[0] == 0 and bounds[-1] == n
+    assert all(a >= b for a, b in zip(sizes, sizes[1:])), "guided chunks grow"
+    assert sizes[0] > sizes[-1] == 1
+    floored = _guided_bounds(n, size, 8)
+    assert all(b - a >= 8 for a, b in zip(floored[:-2], floored[1:-1])), "chunk below the minimum"
+
+    # Rank 0 is slow, so a static split would leave everyone waiting for it
+    def body(i):
+        if rank == 0:
+            time.sleep(0.005)
+        return i
+    local = parallel_for(n, body, schedule='guided')
+    counts = comm.gather(len(local), root=0)
+    if rank == 0:
+        assert sum(counts) == n
+        if size > 1:
+            assert counts[0] < n // size, "guided schedule did not rebalance"
+        print(f"guided chunk sizes {sizes[:4]}...{sizes[-4:]}, uneven iterations per rank {counts}")
+
 
 if __name__ == "__main__":
     main_print('Testing Main Only')
@@ -43,4 +80,10 @@ if __name__ == "__main__":
     main_print('\nTesting Select Only')
     select_only()
     comm.barrier()
-    
\ No newline at end of file
+    
+
+    main_print('\nTesting parallel_for')
+    for schedule in ('static', 'dynamic', 'guided'):
+        test_parallel_for(schedule)
+    test_guided()
+    comm.barrier()
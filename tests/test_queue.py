@@ -1,5 +1,6 @@
 from mpitools.queue import MPIQueue, Task
 from mpitools import setup_mpi
+import numpy as np
 import time
 
 comm, rank, size = setup_mpi()
@@ -29,6 +30,35 @@ class ComputeTask(Task):
             return n
         return self._fibonacci(n-1) + self._fibonacci(n-2)
 
+class PolyTask(Task):
+    """Example of a tiny task that is executed in vectorized batches"""
+    batch_dtype = np.dtype([("x", np.float64), ("degree", np.int64)])
+    batch_size = 256
+    
+    def __init__(self, task_id: str, x: float, degree: int):
+        super().__init__(task_id)
+        self.x = x
+        self.degree = degree
+    
+    def execute(self):
+        return self.x ** self.degree
+    
+    @classmethod
+    def execute_batch(cls, params):
+        return params["x"] ** params["degree"]
+
+class VectorTask(Task):
+    """Example task whose array result is received as a raw buffer"""
+    result_dtype = np.float64
+    result_shape = (1000,)
+    
+    def __init__(self, task_id: str, scale: float):
+        super().__init__(task_id)
+        self.scale = scale
+    
+    def execute(self):
+        return np.arange(1000) * self.scale
+
 
 if __name__ == "__main__":
     # Example usage
@@ -55,4 +85,60 @@ if __name__ == "__main__":
         # Print results
         print("\nResults:")
         for task_id, result in results.items():
-            print(f"  {task_id}: {result.result} (worker {result.worker_rank}, {result.execution_time:.3f}s)")
\ No newline at end of file
+            print(f"  {task_id}: {result.result} (worker {result.worker_rank}, {result.execution_time:.3f}s)")
+    # Batched execution of many tiny tasks
+    queue = MPIQueue()
+    if rank == 0:
+        queue.add_tasks([PolyTask(f"poly_{i}", i / 1000, i % 4) for i in range(5000)])
+    results = queue.run(timeout=30)
+
+    if rank == 0:
+        for i in range(5000):
+            assert np.isclose(results[f"poly_{i}"].result, (i / 1000) ** (i % 4))
+        workers = sorted({r.worker_rank for r in results.values()})
+        print(f"\nBatched results: {len(results)} tasks on workers {workers}")
+        
+        # Columnar queries over the result metadata
+        totals = results.per_worker_totals()
+        assert sum(t['tasks'] for t in totals.values()) == len(results)
+        slowest = results.slowest(3)
+        assert slowest[0].execution_time == results.execution_time.max()
+        assert results["poly_0"] is results["poly_0"], "lookups rebuild the TaskResult"
+        as_dict = results.to_dict()
+        assert type(as_dict) is dict and as_dict == dict(results.items())
+        print(f"Per-worker totals: {totals}")
+    
+    # Profiled run with a Chrome trace timeline
+    queue = MPIQueue(profile=True)
+    if rank == 0:
+        queue.add_tasks([ComputeTask(f"fib_{i}", "fibonacci", 18) for i in range(20)])
+    results = queue.run(timeout=30)
+
+    if rank == 0:
+        summary = queue.profile.summary()
+        assert sum(w['tasks'] for w in summary['workers'].values()) == 20
+        assert 0 < summary['mean_utilization'] <= 1
+        # Clocks are aligned on rank 0, so no task starts before it was dispatched
+        assert summary['dispatch_latency']['min'] >= 0
+        trace = queue.profile.chrome_trace()
+        lanes = {event['tid'] for event in trace['traceEvents']}
+        assert lanes == set(range(size))
+        print(f"\nProfile: utilization {summary['mean_utilization']:.2f}, "
+              f"imbalance {summary['load_imbalance']:.2f}, "
+              f"dispatch latency {summary['dispatch_latency']['mean'] * 1e6:.0f}us")
+    else:
+        assert queue.profile is None
+    
+    # Typed array results received without pickling
+    queue = MPIQueue()
+    if rank == 0:
+        queue.add_tasks([VectorTask(f"vec_{i}", i) for i in range(50)])
+        out = np.empty(1000)
+        queue.set_result_buffer("vec_7", out)
+    results = queue.run(timeout=30)
+
+    if rank == 0:
+        for i in range(50):
+            assert np.array_equal(results[f"vec_{i}"].result, np.arange(1000) * i)
+        assert results["vec_7"].result is out
+        print(f"\nReceived {len(results)} typed results")
@@ -0,0 +1,52 @@
+from mpitools.queue import MPIQueue, Task
+from mpitools import setup_mpi
+import numpy as np
+
+comm, rank, size = setup_mpi()
+
+class MakeArray(Task):
+    """Produce a large array that stays on the worker"""
+
+    def __init__(self, task_id: str, n: int, value: float):
+        super().__init__(task_id)
+        self.n = n
+        self.value = value
+
+    def execute(self):
+        return np.full(self.n, self.value)
+
+class SumArrays(Task):
+    """Consume arrays produced by other tasks"""
+
+    def __init__(self, task_id: str, arrays: list):
+        super().__init__(task_id)
+        self.arrays = arrays
+
+    def execute(self):
+        return float(sum(a.sum() for a in self.arrays))
+
+
+if __name__ == "__main__":
+    queue = MPIQueue()
+    n = 100_000
+
+    if rank == 0:
+        refs = [queue.submit(MakeArray(f"make_{i}", n, i)) for i in range(6)]
+        total = queue.submit(SumArrays("sum_all", refs))
+        pair = queue.submit(SumArrays("sum_pair", refs[:2]))
+        queue.add_task(SumArrays("sum_last", [refs[-1]]))
+        kept = refs[0]
+        del refs, pair
+
+    results = queue.run(timeout=30)
+
+    if rank == 0:
+        assert queue.get(total) == n * sum(range(6))
+        assert results["sum_last"].result == n * 5
+        assert np.array_equal(queue.get(kept), np.zeros(n))
+        # Results whose references were dropped never travel to rank 0
+        assert results["make_3"].result is None
+        assert results["sum_pair"].result is None
+        print("Results:")
+        for task_id, result in results.items():
+            print(f"  {task_id}: worker {result.worker_rank}, kept on rank 0: {result.result is not None}")
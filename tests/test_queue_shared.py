@@ -0,0 +1,89 @@
+from mpitools.queue import MPIQueue, Task
+from mpitools import setup_mpi
+import numpy as np
+
+comm, rank, size = setup_mpi()
+
+class RowSumTask(Task):
+    """Sum one row of a large table shared by all tasks"""
+
+    def __init__(self, task_id: str, table, row: int):
+        super().__init__(task_id)
+        self.table = table
+        self.row = row
+
+    def execute(self):
+        assert not self.table.flags.writeable, "shared arrays must be read-only"
+        return float(self.table[self.row].sum())
+
+class RowViewTask(Task):
+    """Return one row of a shared table without copying it"""
+
+    def __init__(self, task_id: str, table, row: int):
+        super().__init__(task_id)
+        self.table = table
+        self.row = row
+
+    def execute(self):
+        return self.table[self.row]
+
+class ScaleRowsTask(Task):
+    """Scale a block of rows of a shared table into the queue output array"""
+
+    def __init__(self, task_id: str, table, start: int, stop: int):
+        super().__init__(task_id)
+        self.table = table
+        self.output_index = slice(start, stop)
+
+    def execute(self):
+        return 2 * self.table[self.output_index]
+
+
+if __name__ == "__main__":
+    table = np.arange(64 * 10_000, dtype=np.float64).reshape(64, 10_000) if rank == 0 else None
+
+    # Shared inputs, results returned through the manager
+    queue = MPIQueue()
+    ref = queue.share("table", table)
+    if rank == 0:
+        queue.add_tasks([RowSumTask(f"row_{i}", ref, i) for i in range(64)])
+    results = queue.run(timeout=30)
+
+    if rank == 0:
+        expected = table.sum(axis=1)
+        for i in range(64):
+            assert results[f"row_{i}"].result == expected[i]
+        workers = sorted({r.worker_rank for r in results.values()})
+        print(f"Summed {len(results)} rows of a shared table on workers {workers}")
+
+    queue.close()
+
+    # Shared inputs, results written straight into the output array
+    with MPIQueue() as queue:
+        ref = queue.share("table", table)
+        output = queue.output_array((64, 10_000), np.float64)
+        if rank == 0:
+            queue.add_tasks([ScaleRowsTask(f"rows_{i}", ref, i, i + 8) for i in range(0, 64, 8)])
+        results = queue.run(timeout=30)
+
+        if rank == 0:
+            assert np.array_equal(output, 2 * table)
+            assert all(r.result is None for r in results.values())
+            print(f"Wrote {len(results)} row blocks into the output array")
+
+    # Results that are views of shared arrays (in serial mode) stay valid until close()
+    with MPIQueue() as queue:
+        ref = queue.share("table", table)
+        if rank == 0:
+            queue.add_tasks([RowViewTask(f"view_{i}", ref, i) for i in range(4)])
+        results = queue.run(timeout=30)
+        # A second run reuses the shared arrays of the first
+        if rank == 0:
+            queue.add_tasks([RowViewTask(f"again_{i}", ref, i) for i in range(4, 8)])
+        again = queue.run(timeout=30)
+
+        if rank == 0:
+            for i in range(4):
+                assert np.array_equal(results[f"view_{i}"].result, table[i])
+                assert np.array_equal(again[f"again_{i + 4}"].result, table[i + 4])
+            print("Shared views stayed valid across runs")